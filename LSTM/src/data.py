@@ -1,13 +1,24 @@
 import json
 import os
 from dataclasses import dataclass
-from typing import Dict, Tuple, List
+from functools import partial
+from datetime import date
+from typing import Dict, Tuple, List, Optional
 
 import numpy as np
 import pandas as pd
+import torch
 from sklearn.preprocessing import StandardScaler
+from sqlalchemy import text
 from torch.utils.data import Dataset
 
+from .kernels import NUMBA_AVAILABLE, build_windows
+
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
 
 @dataclass
 class Artifacts:
@@ -20,7 +31,34 @@ def _ensure_dir(p: str):
     os.makedirs(p, exist_ok=True)
 
 
-def load_raw(engine) -> pd.DataFrame:
+RAW_CHUNKSIZE = 200_000
+RAW_DATE_COLUMNS = ["dep_planned", "arr_planned", "dep_actual", "arr_actual"]
+RAW_COLUMNS = ["service_date", "train_no",
+               "dep_station_code", "arr_station_code"] + RAW_DATE_COLUMNS
+
+
+def encode_segments(dep: pd.Series, arr: pd.Series) -> Tuple[np.ndarray, pd.Series]:
+    """
+    역 코드를 한 번 factorize 해서 segment를 int32 키로 인코딩: (dep_id << 16) | arr_id
+    returns: segment_code (int32), segment ("DEP->ARR" category, 조합마다 한 번만 생성)
+    groupby 등은 segment_code로 하고, 문자열 segment는 결과 라벨/외부 키로만 사용
+    """
+    n = len(dep)
+    codes, stations = pd.factorize(
+        pd.concat([dep, arr], ignore_index=True).astype(str), sort=True)
+    seg_code = (codes[:n].astype(np.int32) << 16) | codes[n:].astype(np.int32)
+
+    uniq, inverse = np.unique(seg_code, return_inverse=True)
+    labels = [f"{stations[c >> 16]}->{stations[c & 0xFFFF]}" for c in uniq.tolist()]
+    segment = pd.Series(pd.Categorical.from_codes(
+        inverse.reshape(-1), categories=labels), index=dep.index)
+    return seg_code, segment
+
+
+def load_raw(engine, since: Optional[date] = None) -> pd.DataFrame:
+    """
+    since: 지정하면 service_date >= since 인 행만 조회 (캐시 증분 갱신용)
+    """
     q = """
     SELECT
       service_date,
@@ -33,11 +71,23 @@ def load_raw(engine) -> pd.DataFrame:
       arr_actual
     FROM actual_trains
     """
-    df = pd.read_sql(q, engine)
-    for c in ["dep_planned", "arr_planned", "dep_actual", "arr_actual"]:
-        df[c] = pd.to_datetime(df[c])
-    df["segment"] = df["dep_station_code"].astype(
-        str) + "->" + df["arr_station_code"].astype(str)
+    params = {}
+    if since is not None:
+        q += " WHERE service_date >= :since"
+        params["since"] = since
+    # server-side cursor로 chunk 단위 스트리밍 (전체 결과를 한 번에 fetch하지 않음)
+    with engine.connect().execution_options(stream_results=True) as conn:
+        chunks = list(pd.read_sql_query(
+            text(q), conn, params=params, chunksize=RAW_CHUNKSIZE,
+            parse_dates=RAW_DATE_COLUMNS,
+        ))
+    if chunks:
+        df = pd.concat(chunks, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=RAW_COLUMNS).astype(
+            {c: "datetime64[ns]" for c in RAW_DATE_COLUMNS})
+    df["segment_code"], df["segment"] = encode_segments(
+        df["dep_station_code"], df["arr_station_code"])
 
     # 타깃: "도착 지연(분)" = arr_actual - arr_planned
     df["arr_delay_min"] = (
@@ -47,27 +97,152 @@ def load_raw(engine) -> pd.DataFrame:
 
 
 def make_bucket_series(df: pd.DataFrame, bucket_minutes: int) -> pd.DataFrame:
+    """
+    df: load_raw 결과 (segment_code로 집계, segment는 라벨로만 붙임)
+    returns: columns [ts, segment, y]  (segment_code, ts 오름차순)
+    polars가 설치되어 있으면 polars(멀티스레드)로, 없으면 pandas로 계산
+    """
+    if pl is not None:
+        return _make_bucket_series_polars(df, bucket_minutes)
+    return _make_bucket_series_pandas(df, bucket_minutes)
+
+
+def _segment_labels(df: pd.DataFrame) -> pd.DataFrame:
+    # segment_code -> segment 라벨 (segment 수만큼의 작은 테이블)
+    return (df[["segment_code", "segment"]]
+            .drop_duplicates("segment_code")
+            .astype({"segment": str}))
+
+
+def _make_bucket_series_polars(df: pd.DataFrame, bucket_minutes: int) -> pd.DataFrame:
+    every = f"{bucket_minutes}m"
+    labels = pl.from_pandas(_segment_labels(df)).lazy()
+    out = (
+        pl.from_pandas(df[["segment_code", "arr_planned", "arr_delay_min"]])
+          .lazy()
+          # 버킷 기준 시각: 계획 도착(arr_planned)
+          .with_columns(ts=pl.col("arr_planned").dt.truncate(every))
+          .group_by(["segment_code", "ts"])
+          .agg(pl.col("arr_delay_min").mean().alias("y"))
+          .sort(["segment_code", "ts"])
+          .collect()
+          # 구간별 결측 버킷은 0으로 채움 (구간마다 자기 [min, max] 범위만)
+          .upsample(time_column="ts", every=every, group_by="segment_code")
+          .with_columns(pl.col("segment_code").forward_fill(), pl.col("y").fill_null(0.0))
+          .sort(["segment_code", "ts"])
+          .lazy()
+          .join(labels, on="segment_code", how="left", maintain_order="left")
+          .select(["ts", "segment", "y"])
+          .collect()
+    )
+    return out.to_pandas()
+
+
+def _make_bucket_series_pandas(df: pd.DataFrame, bucket_minutes: int) -> pd.DataFrame:
     df = df.copy()
 
     # 버킷 기준 시각: 계획 도착(arr_planned)
     df["ts"] = df["arr_planned"].dt.floor(f"{bucket_minutes}min")
 
     g = (
-        df.groupby(["segment", "ts"])["arr_delay_min"]
+        df.groupby(["segment_code", "ts"])["arr_delay_min"]
           .mean()
           .reset_index()
           .rename(columns={"arr_delay_min": "y"})
-          .sort_values(["segment", "ts"])
+          .sort_values(["segment_code", "ts"])
+    )
+
+    # 구간별 결측 버킷은 0으로 채움 (구간마다 자기 [min, max] 범위만)
+    # 전체 (segment, ts) 인덱스를 한 번에 만들고 단일 reindex
+    step = np.timedelta64(bucket_minutes, "m")
+    bounds = g.groupby("segment_code")["ts"].agg(["min", "max"])
+    counts = ((bounds["max"] - bounds["min"]) // pd.Timedelta(step)
+              ).to_numpy().astype(np.int64) + 1
+    starts = np.cumsum(counts) - counts
+    offsets = np.arange(counts.sum()) - np.repeat(starts, counts)
+    full_index = pd.MultiIndex.from_arrays(
+        [
+            np.repeat(bounds.index.to_numpy(), counts),
+            np.repeat(bounds["min"].to_numpy(), counts) + offsets * step,
+        ],
+        names=["segment_code", "ts"],
+    )
+    out = (
+        g.set_index(["segment_code", "ts"])["y"]
+         .reindex(full_index)
+         # 도착 기록이 모두 NULL인 버킷(평균 NaN)도 빈 버킷처럼 0으로
+         .fillna(0.0)
+         .reset_index()
+         .merge(_segment_labels(df), on="segment_code", how="left", sort=False)
     )
+    return out[["ts", "segment", "y"]]
 
-    # 구간별 결측 버킷은 0으로 채움
-    out = []
-    for seg, seg_df in g.groupby("segment"):
-        seg_df = seg_df.set_index("ts").asfreq(
-            f"{bucket_minutes}min").fillna(0.0)
-        seg_df["segment"] = seg
-        out.append(seg_df.reset_index())
-    return pd.concat(out, ignore_index=True)
+
+def _read_cache_meta(cache_dir: str) -> dict:
+    p = os.path.join(cache_dir, "meta.json")
+    if not os.path.exists(p):
+        return {}
+    with open(p, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_cache_meta(cache_dir: str, meta: dict):
+    with open(os.path.join(cache_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+
+
+def load_series_cached(engine, bucket_minutes: int, cache_dir: str) -> pd.DataFrame:
+    """
+    load_raw + make_bucket_series 결과를 parquet로 캐시.
+    - raw.parquet: 마지막 service_date(watermark) 이후 행만 DB에서 증분 조회
+      (watermark 당일은 추가 적재가 있을 수 있어 다시 읽어 교체)
+    - series_{bucket}min.parquet: raw가 그대로면 bucket_minutes별로 재사용
+    """
+    _ensure_dir(cache_dir)
+    meta = _read_cache_meta(cache_dir)
+    raw_path = os.path.join(cache_dir, "raw.parquet")
+    series_path = os.path.join(
+        cache_dir, f"series_{bucket_minutes}min.parquet")
+
+    watermark = meta.get("watermark")
+    unchanged = False
+    if watermark and os.path.exists(raw_path):
+        since = date.fromisoformat(watermark)
+        delta = load_raw(engine, since=since)
+        unchanged = len(delta) == meta.get("watermark_rows")
+        if unchanged and str(bucket_minutes) in meta.get("series_buckets", []) \
+                and os.path.exists(series_path):
+            return pd.read_parquet(series_path, engine="pyarrow")
+
+        cached = pd.read_parquet(raw_path, engine="pyarrow")
+        cached = cached[pd.to_datetime(
+            cached["service_date"]) < pd.Timestamp(since)]
+        raw = pd.concat([cached, delta], ignore_index=True)
+        # 역 factorize 결과가 캐시/증분에서 다르므로 합친 뒤 다시 인코딩
+        raw["segment_code"], raw["segment"] = encode_segments(
+            raw["dep_station_code"], raw["arr_station_code"])
+    else:
+        raw = load_raw(engine)
+
+    service_date = pd.to_datetime(raw["service_date"])
+    new_watermark = service_date.max()
+    if pd.isna(new_watermark):
+        # 데이터가 없으면 캐시하지 않음
+        return make_bucket_series(raw, bucket_minutes)
+
+    series = make_bucket_series(raw, bucket_minutes)
+    raw.to_parquet(raw_path, engine="pyarrow",
+                   compression="zstd", index=False)
+    series.to_parquet(series_path, engine="pyarrow",
+                      compression="zstd", index=False)
+
+    buckets = meta.get("series_buckets", []) if unchanged else []
+    _write_cache_meta(cache_dir, {
+        "watermark": new_watermark.date().isoformat(),
+        "watermark_rows": int((service_date == new_watermark).sum()),
+        "series_buckets": sorted(set(buckets) | {str(bucket_minutes)}),
+    })
+    return series
 
 
 def build_segment_map(series: pd.DataFrame) -> Dict[str, int]:
@@ -98,29 +273,49 @@ def load_artifacts(artifacts_dir: str) -> Artifacts:
     return Artifacts(segment_to_id=seg_map, scaler_mean=float(sc["mean"]), scaler_std=float(sc["std"]))
 
 
-def _time_features(ts: pd.Series) -> np.ndarray:
+def _build_minute_lut() -> np.ndarray:
     """
-    ts: pandas datetime series
-    returns: (N, 4) -> [is_twt, is_peak, hour_sin, hour_cos]
+    하루 중 분(0~1439) -> [is_peak, hour_sin, hour_cos]
     """
-    dow = ts.dt.weekday  # Mon=0 ... Sun=6
-    is_twt = dow.isin([1, 2, 3]).astype(np.float32).to_numpy()  # Tue/Wed/Thu
-
-    t = ts.dt.time
+    minutes = np.arange(24 * 60)
     # 피크: 07:00~09:30 or 17:00~19:30
-    hh = ts.dt.hour.to_numpy()
-    mm = ts.dt.minute.to_numpy()
-    minutes = hh * 60 + mm
     peak = ((minutes >= 7*60) & (minutes <= 9*60 + 30)
             ) | ((minutes >= 17*60) & (minutes <= 19*60 + 30))
-    is_peak = peak.astype(np.float32)
 
     # hour_sin/cos (하루 주기)
     frac_day = minutes / (24.0 * 60.0)
-    hour_sin = np.sin(2 * np.pi * frac_day).astype(np.float32)
-    hour_cos = np.cos(2 * np.pi * frac_day).astype(np.float32)
+    return np.stack([
+        peak.astype(np.float32),
+        np.sin(2 * np.pi * frac_day).astype(np.float32),
+        np.cos(2 * np.pi * frac_day).astype(np.float32),
+    ], axis=1)
+
+
+MINUTE_LUT = _build_minute_lut()                                   # (1440, 3)
+TWT_LUT = np.array([0, 1, 1, 1, 0, 0, 0], dtype=np.float32)        # Tue/Wed/Thu
+
+
+def time_features_from_parts(dow: np.ndarray, minutes: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    dow: 요일 (Mon=0 ... Sun=6), minutes: 자정 기준 분 (hour*60 + minute)
+    out: (N, 4) float32 버퍼를 주면 새로 할당하지 않고 그 안에 기록
+    returns: (N, 4) -> [is_twt, is_peak, hour_sin, hour_cos]
+    """
+    if out is None:
+        out = np.empty((len(minutes), 4), dtype=np.float32)
+    out[:, 0] = TWT_LUT[dow]
+    out[:, 1:] = MINUTE_LUT[minutes]
+    return out
+
 
-    return np.stack([is_twt, is_peak, hour_sin, hour_cos], axis=1)
+def _time_features(ts: pd.Series, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    ts: pandas datetime series
+    returns: (N, 4) -> [is_twt, is_peak, hour_sin, hour_cos]
+    """
+    dow = ts.dt.weekday.to_numpy()  # Mon=0 ... Sun=6
+    minutes = ts.dt.hour.to_numpy() * 60 + ts.dt.minute.to_numpy()
+    return time_features_from_parts(dow, minutes, out=out)
 
 
 def make_windows_for_all_segments(
@@ -136,41 +331,82 @@ def make_windows_for_all_segments(
     meta: segment, target_ts
     """
     Xs, seg_ids, ys = [], [], []
-    meta_rows = []
+    meta_segs, meta_ts = [], []
 
     for seg, seg_df in series.groupby("segment"):
         ts = pd.to_datetime(seg_df["ts"])
         yvals = seg_df["y"].values.astype(np.float32).reshape(-1, 1)
         yscaled = scaler.transform(yvals).reshape(-1).astype(np.float32)
 
-        tf = _time_features(ts)  # (T,4)
-        # feature per step: [delay_norm] + tf
-        feats = np.concatenate([yscaled.reshape(-1, 1), tf], axis=1)  # (T,5)
-
-        for i in range(len(feats) - lookback_steps):
-            x = feats[i:i+lookback_steps, :]         # (lookback,5)
-            y = yscaled[i+lookback_steps]            # next step delay_norm
-            Xs.append(x)
-            seg_ids.append(segment_to_id[seg])
-            ys.append(y)
-            meta_rows.append(
-                {"segment": seg, "target_ts": ts.iloc[i+lookback_steps]})
-
-    X = np.array(Xs, dtype=np.float32)
-    seg_id = np.array(seg_ids, dtype=np.int64)
-    y = np.array(ys, dtype=np.float32)[:, None]
-    meta = pd.DataFrame(meta_rows)
+        n = len(yscaled) - lookback_steps
+        if n <= 0:
+            continue
+
+        # feature per step: [delay_norm] + time features(4), 최종 (T,5) 버퍼에 바로 기록
+        feats = np.empty((len(yscaled), 5), dtype=np.float32)
+        feats[:, 0] = yscaled
+        _time_features(ts, out=feats[:, 1:])
+
+        if NUMBA_AVAILABLE:
+            Xw, yw = build_windows(
+                np.ascontiguousarray(feats, dtype=np.float32), lookback_steps)
+            Xs.append(Xw)
+            ys.append(yw)
+        else:
+            # (T-lookback+1, 5, lookback) zero-copy view -> 마지막 윈도우는 타깃이 없어 제외
+            W = np.lib.stride_tricks.sliding_window_view(
+                feats, window_shape=lookback_steps, axis=0)[:-1]
+            Xs.append(W.transpose(0, 2, 1))             # (n, lookback, 5)
+            ys.append(yscaled[lookback_steps:])         # next step delay_norm
+        seg_ids.append(np.full(n, segment_to_id[seg], dtype=np.int64))
+        meta_segs.append(np.repeat(seg, n))
+        meta_ts.append(ts.to_numpy()[lookback_steps:])
+
+    if not Xs:
+        X = np.empty((0, lookback_steps, 5), dtype=np.float32)
+        return X, np.empty(0, dtype=np.int64), np.empty((0, 1), dtype=np.float32), \
+            pd.DataFrame({"segment": [], "target_ts": []})
+
+    X = np.ascontiguousarray(np.concatenate(Xs), dtype=np.float32)
+    seg_id = np.concatenate(seg_ids)
+    y = np.concatenate(ys).astype(np.float32)[:, None]
+    meta = pd.DataFrame({
+        "segment": np.concatenate(meta_segs),
+        "target_ts": np.concatenate(meta_ts),
+    })
     return X, seg_id, y, meta
 
 
 class WindowDataset(Dataset):
+    """
+    X / y / seg_id를 하나의 연속 float32 블록 (N, lookback*F + 2) 로 보관
+    columns: [X_flat..., y, seg_id]
+    __getitem__은 행 하나만 반환하고, 배치 분리는 collate_windows에서 한 번만 수행
+    """
+
     def __init__(self, X: np.ndarray, seg_id: np.ndarray, y: np.ndarray):
-        self.X = X
-        self.seg_id = seg_id
-        self.y = y
+        N, self.lookback, self.num_features = X.shape
+        buf = np.empty((N, self.lookback * self.num_features + 2), dtype=np.float32)
+        buf[:, :-2] = X.reshape(N, -1)
+        buf[:, -2] = np.asarray(y, dtype=np.float32).reshape(N)
+        buf[:, -1] = seg_id   # segment id 수는 float32로 정확히 표현되는 범위 (< 2^24)
+        self.buf = torch.from_numpy(buf)
 
     def __len__(self):
-        return self.X.shape[0]
+        return self.buf.shape[0]
 
     def __getitem__(self, idx: int):
-        return self.X[idx], self.seg_id[idx], self.y[idx]
+        return self.buf[idx]
+
+    def collate_fn(self):
+        return partial(collate_windows, lookback=self.lookback, num_features=self.num_features)
+
+
+def collate_windows(batch: List[torch.Tensor], lookback: int, num_features: int):
+    """
+    returns: xb (B, lookback, F), sid (B,), yb (B, 1)
+    """
+    t = torch.stack(batch)
+    return (t[:, :-2].reshape(-1, lookback, num_features),
+            t[:, -1].long(),
+            t[:, -2:-1])
@@ -24,10 +24,9 @@
     RISKY bottom-half rate가 0.5보다 크면(예: 0.65) “대부분 하단”임        
         
 """
-import math
-import random
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
 
 import numpy as np
 import pandas as pd
@@ -35,39 +34,28 @@ import torch
 
 from .config import load_config
 from .db import get_engine
-from .data import load_raw, make_bucket_series, load_artifacts
-from .model import LSTMMDN
+from .data import load_series_cached, load_artifacts, time_features_from_parts
+from .model import LSTMMDN, trace_for_inference, compile_for_inference, inference_autocast
 
 RISKY_STATIONS = {"NAT013271", "NAT040257"}  # 동대구, 전주
 
 
-def normal_cdf(z: np.ndarray) -> np.ndarray:
-    return 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
-
-
-def mixture_cdf(x_norm: float, pi: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> float:
-    z = (x_norm - mu) / np.clip(sigma, 1e-6, None)
-    return float(np.sum(pi * normal_cdf(z)))
+def mixture_cdf_torch(x_norm: float, pi: torch.Tensor, mu: torch.Tensor, sigma: torch.Tensor) -> torch.Tensor:
+    """
+    pi, mu, sigma: (B, K) -> (B,)  Σ_k π_k Φ((x-μ_k)/σ_k), device 위에서 계산
+    """
+    z = (x_norm - mu) / sigma.clamp(min=1e-6)
+    return (pi * torch.special.ndtr(z)).sum(dim=-1)
 
 
-def time_features(ts: pd.DatetimeIndex) -> np.ndarray:
+def time_features(ts: pd.DatetimeIndex, out: Optional[np.ndarray] = None) -> np.ndarray:
     """
     ts: DatetimeIndex length T
+    out: (T,4) float32 버퍼 (주면 그 안에 기록)
     returns: (T,4) -> [is_twt, is_peak, hour_sin, hour_cos]
     """
-    dow = ts.weekday  # Mon=0 ... Sun=6
-    is_twt = np.isin(dow, [1, 2, 3]).astype(np.float32)
-
     minutes = ts.hour.to_numpy() * 60 + ts.minute.to_numpy()
-    peak = ((minutes >= 7*60) & (minutes <= 9*60+30)
-            ) | ((minutes >= 17*60) & (minutes <= 19*60+30))
-    is_peak = peak.astype(np.float32)
-
-    frac_day = minutes / (24.0 * 60.0)
-    hour_sin = np.sin(2 * np.pi * frac_day).astype(np.float32)
-    hour_cos = np.cos(2 * np.pi * frac_day).astype(np.float32)
-
-    return np.stack([is_twt, is_peak, hour_sin, hour_cos], axis=1)
+    return time_features_from_parts(np.asarray(ts.weekday), minutes, out=out)
 
 
 def parse_segment(segment: str) -> Tuple[str, str]:
@@ -84,8 +72,8 @@ def is_risky_segment(segment: str) -> bool:
 @dataclass
 class SegmentSeries:
     ts: np.ndarray      # datetime64[ns]
-    y: np.ndarray       # raw delay minutes (float)
     y_norm: np.ndarray  # normalized
+    ts_to_pos: Dict[np.datetime64, int]  # ts -> index (O(1) 위치/포함 여부 조회)
 
 
 def build_series_index(series_df: pd.DataFrame, mean: float, std: float) -> Dict[str, SegmentSeries]:
@@ -93,9 +81,12 @@ def build_series_index(series_df: pd.DataFrame, mean: float, std: float) -> Dict
     for seg, g in series_df.groupby("segment"):
         g = g.sort_values("ts")
         ts = g["ts"].values.astype("datetime64[ns]")
-        y = g["y"].values.astype(np.float32)
-        y_norm = ((y - mean) / max(std, 1e-8)).astype(np.float32)
-        idx[seg] = SegmentSeries(ts=ts, y=y, y_norm=y_norm)
+        # 임시 배열 없이 in-place 정규화 (raw y는 보관하지 않음)
+        y_norm = g["y"].to_numpy(dtype=np.float32, copy=True)
+        y_norm -= np.float32(mean)
+        y_norm /= np.float32(max(std, 1e-8))
+        ts_to_pos = {t: i for i, t in enumerate(ts)}
+        idx[seg] = SegmentSeries(ts=ts, y_norm=y_norm, ts_to_pos=ts_to_pos)
     return idx
 
 
@@ -107,9 +98,10 @@ def recent_window(seg_idx: Dict[str, SegmentSeries], segment: str, target_ts: np
     """
     s = seg_idx[segment]
     # find target position == target_ts
-    pos = np.searchsorted(s.ts, target_ts)
-    # target_ts should exist as a bucket; allow nearest previous
-    if pos == len(s.ts) or s.ts[pos] != target_ts:
+    pos = s.ts_to_pos.get(target_ts)
+    if pos is None:
+        # target_ts should exist as a bucket; allow nearest previous
+        pos = np.searchsorted(s.ts, target_ts)
         pos = max(0, pos - 1)
 
     start = pos - lookback
@@ -121,16 +113,22 @@ def recent_window(seg_idx: Dict[str, SegmentSeries], segment: str, target_ts: np
     return window_norm, ts_window
 
 
-def build_model_input(window_norm: np.ndarray, ts_window: pd.DatetimeIndex) -> np.ndarray:
+@dataclass
+class InputBuffer:
+    X: torch.Tensor    # (capacity, lookback, 5) float32
+    sid: torch.Tensor  # (capacity,) long
+
+
+def alloc_input_buffer(capacity: int, lookback: int, device) -> InputBuffer:
     """
-    window_norm: (lookback,)
-    ts_window: length lookback
-    returns X: (1, lookback, 5)
+    trial마다 재사용하는 입력 버퍼 (cuda면 pinned memory -> non_blocking H2D)
     """
-    tf = time_features(ts_window)  # (lookback,4)
-    x = np.concatenate([window_norm.reshape(-1, 1), tf],
-                       axis=1).astype(np.float32)  # (lookback,5)
-    return x[None, :, :]
+    pin = device.type == "cuda"
+    return InputBuffer(
+        X=torch.empty((capacity, lookback, 5),
+                      dtype=torch.float32, pin_memory=pin),
+        sid=torch.empty(capacity, dtype=torch.long, pin_memory=pin),
+    )
 
 
 def load_model_and_data(cfg_path="config.yaml"):
@@ -138,8 +136,8 @@ def load_model_and_data(cfg_path="config.yaml"):
     device = torch.device(cfg["train"]["device"])
 
     engine = get_engine(cfg["db"]["url"])
-    raw = load_raw(engine)
-    series_df = make_bucket_series(raw, cfg["data"]["bucket_minutes"])
+    series_df = load_series_cached(
+        engine, cfg["data"]["bucket_minutes"], cfg["paths"]["cache_dir"])
 
     art = load_artifacts(cfg["paths"]["artifacts_dir"])
     seg_idx = build_series_index(series_df, art.scaler_mean, art.scaler_std)
@@ -155,6 +153,17 @@ def load_model_and_data(cfg_path="config.yaml"):
     model.load_state_dict(torch.load(
         cfg["paths"]["model_path"], map_location=device))
     model.eval()
+    model.lstm.flatten_parameters()
+
+    infer_cfg = cfg.get("infer", {})
+    if infer_cfg.get("compile", False):
+        model = compile_for_inference(
+            model, infer_cfg.get("compile_mode", "reduce-overhead"))
+    elif infer_cfg.get("torchscript", False):
+        model = trace_for_inference(
+            model, cfg["data"]["lookback_steps"], 5, device)
+    if device.type == "cuda":
+        torch.backends.cudnn.benchmark = True
 
     return cfg, art, seg_idx, model, device
 
@@ -163,23 +172,57 @@ def prob_delay_leq_slack(
     cfg, art, seg_idx, model, device,
     segment: str, target_ts: np.datetime64, slack_min: float
 ) -> float:
+    scored = prob_delay_leq_slack_batch(
+        cfg, art, seg_idx, model, device, [segment], target_ts, slack_min)
+    if not scored:
+        raise ValueError("not enough history")
+    return scored[0][0]
+
+
+def prob_delay_leq_slack_batch(
+    cfg, art, seg_idx, model, device,
+    segments: List[str], target_ts: np.datetime64, slack_min: float,
+    buf: Optional[InputBuffer] = None
+) -> List[Tuple[float, str]]:
+    """
+    후보 세그먼트 전체를 (B, lookback, 5) 한 배치로 묶어 모델을 1회만 호출.
+    history가 부족한 세그먼트는 제외.
+    buf: 미리 할당한 입력 버퍼 (len(segments) 이상). 없으면 새로 할당
+    returns: [(p, segment), ...]  (입력 순서 유지)
+    """
     lookback = cfg["data"]["lookback_steps"]
-    w_norm, ts_window = recent_window(seg_idx, segment, target_ts, lookback)
-    X = build_model_input(w_norm, ts_window)
-    xb = torch.from_numpy(X).to(device)
-    sid = torch.tensor([art.segment_to_id[segment]],
-                       dtype=torch.long, device=device)
+    if buf is None or buf.X.shape[0] < len(segments):
+        buf = alloc_input_buffer(len(segments), lookback, device)
+
+    kept = []
+    for s in segments:
+        try:
+            w_norm, ts_window = recent_window(seg_idx, s, target_ts, lookback)
+        except ValueError:
+            continue
+        i = len(kept)
+        buf.X[i, :, 0] = torch.from_numpy(w_norm)
+        time_features(ts_window, out=buf.X[i, :, 1:].numpy())
+        buf.sid[i] = art.segment_to_id[s]
+        kept.append(s)
+
+    if not kept:
+        return []
+
+    n = len(kept)
+    xb = buf.X[:n].to(device, non_blocking=True)
+    sid = buf.sid[:n].to(device, non_blocking=True)
 
-    with torch.no_grad():
+    with torch.inference_mode(), inference_autocast(device, cfg.get("infer", {}).get("autocast_dtype")):
         pi, mu, sigma = model(xb, sid)
 
-    pi = pi.cpu().numpy()[0]
-    mu = mu.cpu().numpy()[0]
-    sigma = sigma.cpu().numpy()[0]
+        # mixture CDF까지 device에서 계산하고 (B,) 확률만 한 번에 host로 복사
+        # autocast(fp16/bf16) 출력은 CDF 계산 전에 float32로
+        x_norm = (slack_min - art.scaler_mean) / max(art.scaler_std, 1e-8)
+        p = mixture_cdf_torch(x_norm, pi.float(), mu.float(), sigma.float())
 
-    x_norm = (slack_min - art.scaler_mean) / max(art.scaler_std, 1e-8)
-    p = mixture_cdf(float(x_norm), pi, mu, sigma)
-    return float(max(0.0, min(1.0, p)))
+    p = p.clamp(0.0, 1.0).cpu().numpy()
+    return [(float(ps), s) for ps, s in zip(p, kept)]
 
 
 def main():
@@ -190,7 +233,7 @@ def main():
     slack_min = 15.0
     num_trials = 200              # 여러 시점에서 반복
     pool_size = 30                # 각 시점마다 후보 구간 몇 개를 비교할지
-    random.seed(42)
+    rng = np.random.default_rng(42)
 
     # 사용할 세그먼트 목록 (모델이 아는 segment만)
     segments = [s for s in seg_idx.keys() if s in art.segment_to_id]
@@ -209,6 +252,14 @@ def main():
         if len(ts) > lookback + 10:
             seg_valid_ts[s] = ts[lookback+1:]  # history 확보된 시점만
 
+    # ts -> 해당 ts에서 history가 충분한 segment 목록 (risky / safe) 미리 구성
+    ts_to_risky: Dict[np.datetime64, List[str]] = defaultdict(list)
+    ts_to_safe: Dict[np.datetime64, List[str]] = defaultdict(list)
+    for s, valid_ts in seg_valid_ts.items():
+        bucket = ts_to_risky if is_risky_segment(s) else ts_to_safe
+        for t in valid_ts:
+            bucket[t].append(s)
+
     # 통계
     risky_probs, safe_probs = [], []
     risky_avg_rank = []
@@ -216,41 +267,35 @@ def main():
 
     # “같은 시점” 기준 비교: 랜덤 ts를 하나 뽑고, 그 ts가 있는 segment들만 대상으로 pool 구성
     # (엄밀히는 segment마다 ts 범위가 다르므로, 교집합을 완벽히 맞추기보단 대략 맞춤)
-    all_ts = np.unique(np.concatenate([seg_valid_ts[s] for s in random.sample(
-        list(seg_valid_ts.keys()), min(50, len(seg_valid_ts)))]))
+    valid_segs = list(seg_valid_ts.keys())
+    sampled = rng.choice(len(valid_segs), size=min(50, len(valid_segs)), replace=False)
+    all_ts = np.unique(np.concatenate([seg_valid_ts[valid_segs[i]] for i in sampled]))
     all_ts = np.sort(all_ts)
 
-    for _ in range(num_trials):
-        target_ts = random.choice(all_ts)
+    buf = alloc_input_buffer(pool_size, lookback, device)
+
+    # 시행별 ts를 한 번에 샘플링
+    ts_samples = rng.choice(all_ts, size=num_trials, replace=True)
+
+    # 후보 세그먼트 풀 구성: risky와 safe를 섞어서 뽑되, 해당 ts에서 history가 충분한 것만
+    def pick_candidates(eligible, k):
+        k = min(k, len(eligible))
+        return [eligible[i] for i in rng.choice(len(eligible), size=k, replace=False)]
 
-        # 후보 세그먼트 풀 구성: risky와 safe를 섞어서 뽑되, 해당 ts에서 history가 충분한 것만
-        def pick_candidates(cands, k):
-            out = []
-            tries = 0
-            while len(out) < k and tries < k * 20:
-                s = random.choice(cands)
-                if s in seg_valid_ts and target_ts in seg_valid_ts[s]:
-                    out.append(s)
-                tries += 1
-            return out
+    for target_ts in ts_samples:
 
         half = pool_size // 2
-        cand_risky = pick_candidates(risky_segments, half)
-        cand_safe = pick_candidates(safe_segments, pool_size - len(cand_risky))
+        cand_risky = pick_candidates(ts_to_risky.get(target_ts, []), half)
+        cand_safe = pick_candidates(
+            ts_to_safe.get(target_ts, []), pool_size - len(cand_risky))
         cand = cand_risky + cand_safe
 
         if len(cand) < max(10, pool_size // 2):
             # 해당 ts에서 비교 가능한 세그먼트가 너무 적으면 스킵
             continue
 
-        scored = []
-        for s in cand:
-            try:
-                p = prob_delay_leq_slack(
-                    cfg, art, seg_idx, model, device, s, target_ts, slack_min)
-            except ValueError:
-                continue
-            scored.append((p, s))
+        scored = prob_delay_leq_slack_batch(
+            cfg, art, seg_idx, model, device, cand, target_ts, slack_min, buf)
 
         if len(scored) < 10:
             continue
@@ -0,0 +1,47 @@
+"""
+numba가 설치되어 있으면 JIT 컴파일되는 수치 커널 모음.
+설치되어 있지 않으면 NUMBA_AVAILABLE=False 이고, 호출하는 쪽에서 numpy 경로를 사용한다.
+"""
+import math
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    prange = range
+    NUMBA_AVAILABLE = False
+
+
+def _build_windows_py(feats: np.ndarray, lookback: int):
+    """
+    feats: (T, F) float32
+    returns: X (N, lookback, F), y (N,)  where N = T - lookback, y = 다음 스텝의 feats[:, 0]
+    """
+    n = feats.shape[0] - lookback
+    X = np.empty((n, lookback, feats.shape[1]), np.float32)
+    y = np.empty(n, np.float32)
+    for i in prange(n):
+        X[i] = feats[i:i + lookback]
+        y[i] = feats[i + lookback, 0]
+    return X, y
+
+
+def _mixture_cdf_py(x_norm: float, pi: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> float:
+    # Σ_k π_k Φ((x-μ_k)/σ_k), Φ(z) = 0.5 * (1 + erf(z/√2))
+    acc = 0.0
+    for k in range(pi.shape[0]):
+        s = sigma[k] if sigma[k] > 1e-6 else 1e-6
+        z = (x_norm - mu[k]) / s
+        acc += pi[k] * 0.5 * (1.0 + math.erf(z / math.sqrt(2.0)))
+    return acc
+
+
+if NUMBA_AVAILABLE:
+    build_windows = njit(cache=True, fastmath=True, parallel=True)(_build_windows_py)
+    mixture_cdf_kernel = njit(cache=True, fastmath=True)(_mixture_cdf_py)
+else:
+    build_windows = None
+    mixture_cdf_kernel = None
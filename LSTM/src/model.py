@@ -1,3 +1,4 @@
+import contextlib
 import math
 import torch
 import torch.nn as nn
@@ -39,10 +40,45 @@ class LSTMMDN(nn.Module):
 def mdn_nll(y, pi, mu, sigma):
     """
     y: (B, 1)  (normalized)
+    log p(y) = logsumexp_k(log pi_k + log N(y | mu_k, sigma_k))  (underflow 없이 계산)
     """
     y = y.expand_as(mu)
-    coef = 1.0 / (sigma * math.sqrt(2.0 * math.pi))
-    exp_term = torch.exp(-0.5 * ((y - mu) / sigma) ** 2)
-    comp = coef * exp_term
-    mix = torch.sum(pi * comp, dim=-1).clamp(min=1e-12)
-    return -torch.mean(torch.log(mix))
+    z = (y - mu) / sigma
+    log_comp = -0.5 * math.log(2.0 * math.pi) - torch.log(sigma) - 0.5 * z * z
+    log_pi = torch.log(pi.clamp(min=1e-12))
+    return -torch.mean(torch.logsumexp(log_pi + log_comp, dim=-1))
+
+
+def trace_for_inference(model: LSTMMDN, lookback: int, num_features: int, device) -> torch.jit.ScriptModule:
+    """
+    eval 모드 모델을 TorchScript로 trace + freeze (forward의 Python 디스패치 제거).
+    배치 크기는 가변.
+    """
+    model.eval()
+    example_x = torch.zeros(2, lookback, num_features, device=device)
+    example_sid = torch.zeros(2, dtype=torch.long, device=device)
+    with torch.no_grad():
+        traced = torch.jit.trace(model, (example_x, example_sid))
+    return torch.jit.freeze(traced)
+
+
+def compile_for_inference(model: LSTMMDN, mode: str = "reduce-overhead") -> nn.Module:
+    """
+    cuDNN fused LSTM 커널을 쓰도록 가중치를 연속 메모리로 모은 뒤 torch.compile (PyTorch>=2.0).
+    입력 shape가 바뀌면 재컴파일되므로 배치 크기를 고정해서 호출하는 쪽에 적합.
+    torch.compile이 없으면 flatten만 하고 그대로 반환.
+    """
+    model.eval()
+    model.lstm.flatten_parameters()
+    if not hasattr(torch, "compile"):
+        return model
+    return torch.compile(model, mode=mode, dynamic=False)
+
+
+def inference_autocast(device, dtype_name):
+    """
+    dtype_name: "float16" | "bfloat16" | None(비활성)
+    """
+    if not dtype_name:
+        return contextlib.nullcontext()
+    return torch.autocast(device_type=device.type, dtype=getattr(torch, dtype_name))
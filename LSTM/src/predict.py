@@ -21,6 +21,7 @@ def load_model(cfg_path="config.yaml"):
     model.load_state_dict(torch.load(
         cfg["paths"]["model_path"], map_location=device))
     model.eval()
+    model.lstm.flatten_parameters()
     return cfg, art, model, device
 
 
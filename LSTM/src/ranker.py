@@ -1,17 +1,22 @@
-import math
 import numpy as np
 import pandas as pd
+from scipy.special import ndtr
 
+from .kernels import NUMBA_AVAILABLE, mixture_cdf_kernel
 from .predict import predict_delay_distribution, load_model
 
 
 def normal_cdf(z: np.ndarray) -> np.ndarray:
     # Φ(z)
-    return 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
+    return ndtr(z)
 
 
 def mixture_cdf(x, pi, mu, sigma):
     # x: scalar in normalized space
+    if NUMBA_AVAILABLE:
+        return float(mixture_cdf_kernel(
+            float(x), np.asarray(pi, dtype=np.float64),
+            np.asarray(mu, dtype=np.float64), np.asarray(sigma, dtype=np.float64)))
     z = (x - mu) / np.clip(sigma, 1e-6, None)
     return float(np.sum(pi * normal_cdf(z)))
 
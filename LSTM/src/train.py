@@ -7,7 +7,7 @@ from tqdm import tqdm
 from .config import load_config
 from .db import get_engine
 from .data import (
-    load_raw, make_bucket_series, build_segment_map,
+    load_series_cached, build_segment_map,
     fit_scaler, save_artifacts, make_windows_for_all_segments, WindowDataset
 )
 from .model import LSTMMDN, mdn_nll
@@ -24,8 +24,8 @@ def main():
     device = torch.device(cfg["train"]["device"])
 
     engine = get_engine(cfg["db"]["url"])
-    raw = load_raw(engine)
-    series = make_bucket_series(raw, cfg["data"]["bucket_minutes"])
+    series = load_series_cached(
+        engine, cfg["data"]["bucket_minutes"], cfg["paths"]["cache_dir"])
 
     seg_map = build_segment_map(series)
     scaler = fit_scaler(series)
@@ -45,10 +45,21 @@ def main():
     val_ds = WindowDataset(
         X[va_mask.values], seg_id[va_mask.values], y[va_mask.values])
 
+    num_workers = cfg["train"].get("num_workers")
+    if num_workers is None:
+        num_workers = (os.cpu_count() or 2) // 2
+    loader_kwargs = {
+        "batch_size": cfg["train"]["batch_size"],
+        "num_workers": num_workers,
+        "pin_memory": device.type == "cuda",
+    }
+    if num_workers > 0:
+        loader_kwargs.update(persistent_workers=True, prefetch_factor=4)
+
     train_loader = DataLoader(
-        train_ds, batch_size=cfg["train"]["batch_size"], shuffle=True)
+        train_ds, shuffle=True, collate_fn=train_ds.collate_fn(), **loader_kwargs)
     val_loader = DataLoader(
-        val_ds, batch_size=cfg["train"]["batch_size"], shuffle=False)
+        val_ds, shuffle=False, collate_fn=val_ds.collate_fn(), **loader_kwargs)
 
     num_features = X.shape[-1]  # 5
     model = LSTMMDN(
@@ -69,9 +80,9 @@ def main():
         model.train()
         tr_loss = 0.0
         for xb, sid, yb in tqdm(train_loader, desc=f"epoch {epoch} train"):
-            xb = xb.to(device)
-            sid = sid.to(device)
-            yb = yb.to(device)
+            xb = xb.to(device, non_blocking=True)
+            sid = sid.to(device, non_blocking=True)
+            yb = yb.to(device, non_blocking=True)
 
             opt.zero_grad()
             pi, mu, sigma = model(xb, sid)
@@ -85,9 +96,9 @@ def main():
         va_loss = 0.0
         with torch.no_grad():
             for xb, sid, yb in tqdm(val_loader, desc=f"epoch {epoch} val"):
-                xb = xb.to(device)
-                sid = sid.to(device)
-                yb = yb.to(device)
+                xb = xb.to(device, non_blocking=True)
+                sid = sid.to(device, non_blocking=True)
+                yb = yb.to(device, non_blocking=True)
                 pi, mu, sigma = model(xb, sid)
                 loss = mdn_nll(yb, pi, mu, sigma)
                 va_loss += loss.item() * xb.size(0)
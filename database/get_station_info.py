@@ -1,19 +1,37 @@
 from __future__ import annotations
 
+import asyncio
 import os
-import time
 import urllib.parse
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 import mysql.connector
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from aiolimiter import AsyncLimiter
 from dotenv import load_dotenv
 
+try:
+    import orjson
+
+    def json_loads(b: Any) -> Any:
+        return orjson.loads(b)
+except ImportError:
+    import json
+
+    def json_loads(b: Any) -> Any:
+        return json.loads(b)
+
 
 BASE = "https://apis.data.go.kr/1613000/TrainInfoService"
 URL_CITY_CODES = f"{BASE}/getCtyCodeList"
 URL_STATIONS_BY_CITY = f"{BASE}/getCtyAcctoTrainSttnList"
 
+# TAGO 호출 한도에 맞춘 토큰 버킷 (초당 요청 수)
+TAGO_MAX_RATE = 20
+TAGO_RATE_PERIOD_SEC = 1.0
+
 
 def normalize_service_key(key: str) -> str:
     # 인코딩 키(%2F 등)면 requests가 %를 다시 인코딩(%25)해서 깨질 수 있으니 unquote
@@ -23,15 +41,33 @@ def normalize_service_key(key: str) -> str:
     return key
 
 
-def request_json(url: str, params: Dict[str, Any], timeout: float = 10.0) -> dict:
-    headers = {
+def _make_session() -> requests.Session:
+    # 호출마다 DNS 조회/TLS 연결을 새로 하지 않도록 연결 풀 + 재시도를 가진 Session 재사용
+    session = requests.Session()
+    session.headers.update({
         "Accept": "application/json",
         "Accept-Encoding": "gzip, deflate",
         "User-Agent": "train-loader/1.0",
-    }
-    r = requests.get(url, params=params, headers=headers, timeout=timeout)
+    })
+    retry = Retry(
+        total=4,
+        backoff_factor=0.4,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+    )
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=TAGO_MAX_RATE, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_session = _make_session()
+
+
+def request_json(url: str, params: Dict[str, Any], timeout: float = 10.0) -> dict:
+    r = _session.get(url, params=params, timeout=timeout)
     r.raise_for_status()
-    return r.json()
+    return json_loads(r.content)
 
 
 def safe_items(data: dict) -> List[dict]:
@@ -109,27 +145,57 @@ def upsert_stations_mysql(
     user: str,
     password: str,
     database: str,
+    batch_size: int = 1000,
+    conn: Optional[mysql.connector.MySQLConnection] = None,
 ) -> int:
-    conn = mysql.connector.connect(
-        host=host, port=port, user=user, password=password, database=database, autocommit=False
-    )
+    """
+    conn을 주면 그 연결을 재사용하고 닫지 않음 (없으면 새로 연결 후 닫음)
+    """
+    owns_conn = conn is None
+    if owns_conn:
+        conn = mysql.connector.connect(
+            host=host, port=port, user=user, password=password, database=database, autocommit=False
+        )
     try:
         cur = conn.cursor()
-        sql = """
+        head = """
         INSERT INTO train.stations (name, station_code, city_code, city_name)
-        VALUES (%s, %s, %s, %s)
+        VALUES """
+        tail = """
         ON DUPLICATE KEY UPDATE
           station_code = VALUES(station_code),
           city_code = VALUES(city_code),
           city_name = VALUES(city_name),
           updated_at = CURRENT_TIMESTAMP
         """
-        cur.executemany(sql, rows)
-        affected = cur.rowcount
+        # executemany는 행마다 왕복하므로 batch_size 행씩 multi-row INSERT 한 문장으로
+        affected = 0
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            sql = head + ",".join(["(%s, %s, %s, %s)"] * len(batch)) + tail
+            cur.execute(sql, [v for row in batch for v in row])
+            affected += cur.rowcount
         conn.commit()
         return affected
     finally:
-        conn.close()
+        if owns_conn:
+            conn.close()
+
+
+async def fetch_all_stations(
+    service_key: str,
+    city_codes: List[Tuple[int, str]],
+    limiter: AsyncLimiter,
+) -> List[Tuple[int, str, List[dict]]]:
+    """
+    도시별 역 목록을 rate limit 안에서 동시에 조회 (requests는 동기라 스레드로 넘김)
+    """
+    async def one(code: int, cname: str) -> Tuple[int, str, List[dict]]:
+        async with limiter:
+            items = await asyncio.to_thread(fetch_stations_for_city, service_key, code, 1000)
+        return code, cname, items
+
+    return await asyncio.gather(*(one(code, cname) for code, cname in city_codes))
 
 
 def main():
@@ -146,11 +212,14 @@ def main():
     city_codes = fetch_city_codes(service_key)
     print(f"cityCodes={len(city_codes)}")
 
+    # 고정 sleep 대신 토큰 버킷으로 한도 안에서 동시에 호출
+    limiter = AsyncLimiter(TAGO_MAX_RATE, TAGO_RATE_PERIOD_SEC)
+    results = asyncio.run(fetch_all_stations(service_key, city_codes, limiter))
+
     all_rows: List[Tuple[str, Optional[str],
                          Optional[int], Optional[str]]] = []
 
-    for code, cname in city_codes:
-        items = fetch_stations_for_city(service_key, code, num_of_rows=1000)
+    for code, cname, items in results:
         print(f"cityCode={code} {cname}: items={len(items)}")
 
         for it in items:
@@ -161,8 +230,6 @@ def main():
             all_rows.append((str(nodename), str(nodeid)
                             if nodeid else None, int(code), str(cname)))
 
-        time.sleep(0.05)  # 너무 공격적으로 때리지 않게 아주 짧게만
-
     affected = upsert_stations_mysql(
         rows=all_rows,
         host=mysql_host,
@@ -1,24 +1,36 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
 import json
 import os
-import sqlite3
 import time
 from dataclasses import dataclass
 from datetime import datetime, date
-from itertools import product
+from functools import lru_cache
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import httpx
+import aiosqlite
 import mysql.connector
-import requests
+from mysql.connector import pooling
 from dotenv import load_dotenv
 
+try:
+    import orjson
+
+    def json_loads(b: Any) -> Any:
+        return orjson.loads(b)
+except ImportError:
+    def json_loads(b: Any) -> Any:
+        return json.loads(b)
+
 
 # -----------------------
 # TAGO endpoints
 # -----------------------
-BASE_SERVICE_URL = "http://apis.data.go.kr/1613000/TrainInfoService"
+# HTTP/2는 TLS(ALPN)로만 협상되므로 https 필수
+BASE_SERVICE_URL = "https://apis.data.go.kr/1613000/TrainInfoService"
 # 공식 문서 :contentReference[oaicite:1]{index=1}
 URL_TIMETABLE = f"{BASE_SERVICE_URL}/getStrtpntAlocFndTrainInfo"
 URL_CITY_CODES = f"{BASE_SERVICE_URL}/getCtyCodeList"
@@ -30,6 +42,20 @@ URL_STATIONS_BY_CITY = f"{BASE_SERVICE_URL}/getCtyAcctoTrainSttnList"
 # -----------------------
 HUB_NAMES = ["서울", "부산", "대전", "동대구", "경주", "전주"]
 
+# TAGO 동시 요청 수 상한
+MAX_CONCURRENT_REQUESTS = 8
+
+# multi-row INSERT 한 문장에 넣을 행 수
+INSERT_BATCH_SIZE = 1000
+# 시간표 적재 시 이 행 수만큼 모일 때마다 INSERT + commit
+FLUSH_ROWS = 10_000
+
+# MySQL 커넥션 풀 크기
+MYSQL_POOL_SIZE = 8
+
+# HTTP 캐시 유효기간 (시간표/역 목록은 자주 바뀌지 않음)
+CACHE_TTL_SEC = 7 * 24 * 3600
+
 # 필요 날짜(원하면 늘리세요)
 DATES = [date(2025, 12, 16), date(2025, 12, 17), date(2025, 12, 18)]
 
@@ -58,6 +84,7 @@ STATION_TO_CITYNAME_HINTS: Dict[str, List[str]] = {
 # -----------------------
 # Utilities
 # -----------------------
+@lru_cache(maxsize=64)
 def yyyymmdd(d: date) -> str:
     return d.strftime("%Y%m%d")
 
@@ -66,9 +93,13 @@ def parse_dt_yyyymmddhhmmss(s: Any) -> Optional[datetime]:
     if s is None:
         return None
     s = str(s)
+    # 고정 포맷이라 strptime 대신 슬라이싱 (길이/숫자 검증은 strptime과 동일하게)
+    if len(s) != 14 or not s.isdigit():
+        return None
     try:
-        return datetime.strptime(s, "%Y%m%d%H%M%S")
-    except Exception:
+        return datetime(int(s[0:4]), int(s[4:6]), int(s[6:8]),
+                        int(s[8:10]), int(s[10:12]), int(s[12:14]))
+    except ValueError:
         return None
 
 
@@ -79,13 +110,42 @@ def safe_int(x: Any) -> Optional[int]:
         return None
 
 
+def chunked(seq: List[Tuple], size: int) -> Iterable[List[Tuple]]:
+    for i in range(0, len(seq), size):
+        yield seq[i:i + size]
+
+
 # -----------------------
 # SQLite cache for HTTP (minimize traffic)
 # -----------------------
 class SqliteCache:
-    def __init__(self, path: str = "tago_http_cache.sqlite3") -> None:
-        self.conn = sqlite3.connect(path)
-        self.conn.execute(
+    """
+    aiosqlite 기반 비동기 캐시 (sqlite 작업은 aiosqlite 전용 스레드에서 실행되어 event loop를 막지 않음)
+    연결은 event loop 안에서 만들어야 해서 open()/close()로 분리 (TagoClient가 async with에서 호출)
+    """
+
+    def __init__(
+        self,
+        path: str = "tago_http_cache.sqlite3",
+        commit_every: int = 50,
+        ttl_sec: Optional[int] = CACHE_TTL_SEC,
+    ) -> None:
+        self.path = path
+        self.commit_every = commit_every
+        self.ttl_sec = ttl_sec
+        self.pending = 0
+        self.conn: Optional[aiosqlite.Connection] = None
+
+    async def open(self) -> None:
+        if self.conn is not None:
+            return
+        self.conn = await aiosqlite.connect(self.path)
+        # 쓰기마다 fsync 하지 않도록 WAL + synchronous=NORMAL, commit은 commit_every건마다 / flush()
+        await self.conn.execute("PRAGMA journal_mode=WAL")
+        await self.conn.execute("PRAGMA synchronous=NORMAL")
+        await self.conn.execute("PRAGMA temp_store=MEMORY")
+        await self.conn.execute("PRAGMA mmap_size=268435456")
+        await self.conn.execute(
             """
             CREATE TABLE IF NOT EXISTS cache (
               key TEXT PRIMARY KEY,
@@ -94,28 +154,60 @@ class SqliteCache:
             )
             """
         )
-        self.conn.commit()
-
-    def get(self, key: str) -> Optional[dict]:
-        cur = self.conn.execute(
-            "SELECT payload FROM cache WHERE key=?", (key,))
-        row = cur.fetchone()
+        await self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_cache_created_at ON cache(created_at)")
+        await self.conn.commit()
+
+    async def close(self) -> None:
+        if self.conn is None:
+            return
+        await self.flush()
+        await self.conn.close()
+        self.conn = None
+
+    async def get(self, key: str) -> Optional[dict]:
+        # ttl_sec이 지난 항목은 없는 것으로 취급
+        min_created = int(time.time()) - self.ttl_sec if self.ttl_sec else -1
+        async with self.conn.execute(
+                "SELECT payload FROM cache WHERE key=? AND created_at > ?", (key, min_created)) as cur:
+            row = await cur.fetchone()
         if not row:
             return None
-        return json.loads(row[0])
+        return json_loads(row[0])
 
-    def set(self, key: str, payload: dict) -> None:
-        self.conn.execute(
+    async def set(self, key: str, payload: dict) -> None:
+        await self.conn.execute(
             "INSERT OR REPLACE INTO cache(key, created_at, payload) VALUES(?,?,?)",
             (key, int(time.time()), json.dumps(payload, ensure_ascii=False)),
         )
-        self.conn.commit()
+        self.pending += 1
+        if self.pending >= self.commit_every:
+            self.pending = 0
+            await self.conn.commit()
+
+    async def purge_older_than(self, max_age_sec: int) -> int:
+        """
+        created_at 기준으로 max_age_sec 보다 오래된 항목 삭제 (캐시 파일이 계속 커지지 않도록)
+        """
+        async with self.conn.execute(
+                "DELETE FROM cache WHERE created_at <= ?", (int(time.time()) - max_age_sec,)) as cur:
+            deleted = cur.rowcount
+        await self.conn.commit()
+        self.pending = 0
+        return deleted
+
+    async def flush(self) -> None:
+        if self.pending:
+            self.pending = 0
+            await self.conn.commit()
 
 
 def stable_key(url: str, params: Dict[str, Any]) -> str:
-    raw = url + "?" + \
-        "&".join(f"{k}={params[k]}" for k in sorted(params.keys()))
-    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    # 중간 문자열을 만들지 않고 (k, v)를 정렬 순서대로 hasher에 바로 넣음
+    h = hashlib.blake2b(url.encode("utf-8"), digest_size=16)
+    for k, v in sorted(params.items()):
+        h.update(f"\x00{k}={v}".encode("utf-8"))
+    return h.hexdigest()
 
 
 # -----------------------
@@ -128,41 +220,88 @@ class TagoClient:
         cache: Optional[SqliteCache] = None,
         timeout_sec: float = 15.0,
         max_retries: int = 4,
+        max_concurrency: int = MAX_CONCURRENT_REQUESTS,
     ) -> None:
         self.service_key = service_key
         self.cache = cache or SqliteCache()
         self.timeout_sec = timeout_sec
         self.max_retries = max_retries
-
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
+        self.max_concurrency = max_concurrency
+
+        # AsyncClient / Semaphore는 실행 중인 event loop 안에서 만들어야 해서 지연 생성
+        self.session: Optional[httpx.AsyncClient] = None
+        self.sem: Optional[asyncio.Semaphore] = None
+        # 실제로 협상된 HTTP 버전을 첫 응답에서 한 번만 출력
+        self._protocol_logged = False
+
+    async def __aenter__(self) -> "TagoClient":
+        await self.cache.open()
+        if self.cache.ttl_sec:
+            await self.cache.purge_older_than(self.cache.ttl_sec)
+        # HTTP/2로 동시 요청을 하나(또는 소수)의 TLS 연결에 multiplex
+        self.session = httpx.AsyncClient(
+            http2=True,
+            headers={
                 "Accept": "application/json",
                 "Accept-Encoding": "gzip, deflate",
                 "User-Agent": "tago-train-loader/1.0",
-            }
+            },
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            timeout=self.timeout_sec,
         )
+        self.sem = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self.session is not None:
+            await self.session.aclose()
+            self.session = None
+        # 지연된 캐시 쓰기 반영 후 연결 종료
+        await self.cache.close()
 
-    def _get_json(self, url: str, params: Dict[str, Any]) -> dict:
+    async def _get_json(self, url: str, params: Dict[str, Any], use_cache: bool = True) -> dict:
         key = stable_key(url, params)
-        cached = self.cache.get(key)
-        if cached is not None:
-            return cached
+        if use_cache:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
 
+        assert self.session is not None and self.sem is not None, \
+            "TagoClient는 'async with TagoClient(...)' 안에서 사용해야 합니다"
         last_err: Optional[Exception] = None
         for attempt in range(self.max_retries):
             try:
-                r = self.session.get(url, params=params,
-                                     timeout=self.timeout_sec)
+                async with self.sem:
+                    r = await self.session.get(url, params=params)
                 r.raise_for_status()
-                data = r.json()
-                self.cache.set(key, data)
+                if not self._protocol_logged:
+                    self._protocol_logged = True
+                    print(f"[http] negotiated {r.http_version}")
+                # TAGO는 Content-Type을 json으로 주지 않는 경우가 있어 body를 직접 파싱
+                data = json_loads(r.content)
+                if use_cache:
+                    await self.cache.set(key, data)
                 return data
             except Exception as e:
                 last_err = e
-                time.sleep(0.4 * (2 ** attempt))
+                await asyncio.sleep(0.4 * (2 ** attempt))
         raise RuntimeError(f"TAGO request failed: {last_err}")
 
+    @staticmethod
+    def _rows_key(url: str, params: Dict[str, Any]) -> str:
+        # 페이지를 모두 합친 결과 단위 키 (pageNo 제외)
+        return stable_key(url, {k: v for k, v in params.items() if k != "pageNo"})
+
+    async def _cached_rows(self, url: str, params: Dict[str, Any]) -> Optional[List[dict]]:
+        cached = await self.cache.get(self._rows_key(url, params))
+        return None if cached is None else cached["rows"]
+
+    async def _store_rows(self, url: str, params: Dict[str, Any], rows: List[dict]) -> None:
+        await self.cache.set(self._rows_key(url, params), {"rows": rows})
+
     @staticmethod
     def _body(data: dict) -> dict:
         return (data.get("response") or {}).get("body") or {}
@@ -195,35 +334,50 @@ class TagoClient:
             return [item]
         return []
 
+    async def _paginate(self, url: str, params: Dict[str, Any]) -> List[dict]:
+        """
+        첫 페이지로 totalCount를 확인한 뒤 나머지 페이지를 동시에 조회해서 이어붙임
+        (전체 결과는 pageNo를 뺀 키로 캐시)
+        """
+        cached = await self._cached_rows(url, params)
+        if cached is not None:
+            return cached
+
+        first_params = {**params, "pageNo": 1}
+        data = await self._get_json(url, first_params, use_cache=False)
+        rows = self._items_list(data)
+
+        # 페이징 필요 시 (보통 1회로 충분)
+        body = self._body(data)
+        total = safe_int(body.get("totalCount")) or len(rows)
+        if total > len(rows):
+            page_size = safe_int(body.get("numOfRows")) or safe_int(params.get("numOfRows")) or len(rows)
+            pages = (total + page_size - 1) // page_size if page_size else 1
+            rest = await asyncio.gather(*(
+                self._get_json(url, {**params, "pageNo": p}, use_cache=False)
+                for p in range(2, pages + 1)
+            ))
+            for d in rest:
+                rows.extend(self._items_list(d))
+        await self._store_rows(url, params, rows)
+        return rows
+
     # --------
     # City codes
     # --------
-    def fetch_city_codes(self, num_of_rows: int = 1000) -> List[dict]:
+    async def fetch_city_codes(self, num_of_rows: int = 1000) -> List[dict]:
         params = {
             "serviceKey": self.service_key,
             "_type": "json",
             "pageNo": 1,
             "numOfRows": num_of_rows,
         }
-        data = self._get_json(URL_CITY_CODES, params)
-        rows = self._items_list(data)
-
-        # 페이징 필요 시 (보통 1회로 충분)
-        total = safe_int(self._body(data).get("totalCount")) or len(rows)
-        if total > len(rows):
-            page_size = safe_int(self._body(
-                data).get("numOfRows")) or num_of_rows
-            pages = (total + page_size - 1) // page_size
-            for p in range(2, pages + 1):
-                params["pageNo"] = p
-                data2 = self._get_json(URL_CITY_CODES, params)
-                rows.extend(self._items_list(data2))
-        return rows
+        return await self._paginate(URL_CITY_CODES, params)
 
     # --------
     # Stations by cityCode
     # --------
-    def fetch_stations_by_city(self, city_code: str, num_of_rows: int = 1000) -> List[dict]:
+    async def fetch_stations_by_city(self, city_code: str, num_of_rows: int = 1000) -> List[dict]:
         params = {
             "serviceKey": self.service_key,
             "_type": "json",
@@ -231,24 +385,12 @@ class TagoClient:
             "numOfRows": num_of_rows,
             "cityCode": city_code,
         }
-        data = self._get_json(URL_STATIONS_BY_CITY, params)
-        rows = self._items_list(data)
-
-        total = safe_int(self._body(data).get("totalCount")) or len(rows)
-        if total > len(rows):
-            page_size = safe_int(self._body(
-                data).get("numOfRows")) or num_of_rows
-            pages = (total + page_size - 1) // page_size
-            for p in range(2, pages + 1):
-                params["pageNo"] = p
-                data2 = self._get_json(URL_STATIONS_BY_CITY, params)
-                rows.extend(self._items_list(data2))
-        return rows
+        return await self._paginate(URL_STATIONS_BY_CITY, params)
 
     # --------
     # Timetable (min traffic)
     # --------
-    def fetch_timetable_min_traffic(
+    async def fetch_timetable_min_traffic(
         self,
         dep_place_id: str,
         arr_place_id: str,
@@ -265,33 +407,32 @@ class TagoClient:
             "arrPlaceId": arr_place_id,
             "depPlandTime": dep_pland_date_yyyymmdd,
         }
-        data = self._get_json(URL_TIMETABLE, params)
-        rows = self._items_list(data)
-
-        total = safe_int(self._body(data).get("totalCount")) or len(rows)
-        if total > len(rows):
-            page_size = safe_int(self._body(
-                data).get("numOfRows")) or num_of_rows
-            pages = (total + page_size - 1) // page_size
-            for p in range(2, pages + 1):
-                params["pageNo"] = p
-                data2 = self._get_json(URL_TIMETABLE, params)
-                rows.extend(self._items_list(data2))
-        return rows
+        return await self._paginate(URL_TIMETABLE, params)
 
 
 # -----------------------
 # MySQL helpers
 # -----------------------
+_POOL: Optional[pooling.MySQLConnectionPool] = None
+
+
 def mysql_connect_from_env() -> mysql.connector.MySQLConnection:
-    return mysql.connector.connect(
-        host=os.getenv("MYSQL_HOST", "127.0.0.1"),
-        port=int(os.getenv("MYSQL_PORT", "3306")),
-        user=os.getenv("MYSQL_USER", "root"),
-        password=os.getenv("MYSQL_PASSWORD", ""),
-        database=os.getenv("MYSQL_DB", "train"),
-        autocommit=False,
-    )
+    """
+    프로세스 단위 커넥션 풀에서 연결을 꺼냄 (close() 하면 풀로 반환되어 handshake 재사용)
+    """
+    global _POOL
+    if _POOL is None:
+        _POOL = pooling.MySQLConnectionPool(
+            pool_name="train",
+            pool_size=MYSQL_POOL_SIZE,
+            host=os.getenv("MYSQL_HOST", "127.0.0.1"),
+            port=int(os.getenv("MYSQL_PORT", "3306")),
+            user=os.getenv("MYSQL_USER", "root"),
+            password=os.getenv("MYSQL_PASSWORD", ""),
+            database=os.getenv("MYSQL_DB", "train"),
+            autocommit=False,
+        )
+    return _POOL.get_connection()
 
 
 def ensure_tables(conn: mysql.connector.MySQLConnection) -> None:
@@ -343,27 +484,41 @@ def ensure_tables(conn: mysql.connector.MySQLConnection) -> None:
     conn.commit()
 
 
-def upsert_station_by_name(
+def upsert_stations(
     conn: mysql.connector.MySQLConnection,
-    name: str,
-    station_code: Optional[str],
-    city_code: Optional[str],
-    city_name: Optional[str],
+    rows: List[Tuple[str, Optional[str], Optional[str], Optional[str]]],
+    batch_size: int = INSERT_BATCH_SIZE,
 ) -> int:
     """
-    name UNIQUE를 기준으로 UPSERT 하므로, 기존 row의 id는 유지됩니다.
+    rows: (name, station_code, city_code, city_name)
+    name UNIQUE를 기준으로 multi-row UPSERT 하므로, 기존 row의 id는 유지됩니다.
     """
-    sql = """
+    head = """
     INSERT INTO stations (name, station_code, city_code, city_name)
-    VALUES (%s, %s, %s, %s)
+    VALUES """
+    tail = """
     ON DUPLICATE KEY UPDATE
       station_code = VALUES(station_code),
       city_code = VALUES(city_code),
       city_name = VALUES(city_name);
     """
     cur = conn.cursor()
-    cur.execute(sql, (name, station_code, city_code, city_name))
-    return cur.rowcount
+    affected = 0
+    for batch in chunked(rows, batch_size):
+        sql = head + ",".join(["(%s, %s, %s, %s)"] * len(batch)) + tail
+        cur.execute(sql, [v for row in batch for v in row])
+        affected += cur.rowcount
+    return affected
+
+
+def upsert_station_by_name(
+    conn: mysql.connector.MySQLConnection,
+    name: str,
+    station_code: Optional[str],
+    city_code: Optional[str],
+    city_name: Optional[str],
+) -> int:
+    return upsert_stations(conn, [(name, station_code, city_code, city_name)])
 
 
 def fetch_station_code_map(conn: mysql.connector.MySQLConnection, names: List[str]) -> Dict[str, Optional[str]]:
@@ -377,39 +532,62 @@ def fetch_station_code_map(conn: mysql.connector.MySQLConnection, names: List[st
     return res
 
 
-def write_timetables(
-    conn: mysql.connector.MySQLConnection,
-    rows: List[Tuple],
-) -> int:
-    sql = """
-    INSERT INTO train_timetables (
+TIMETABLE_COLUMNS = """
       service_date,
       dep_station_name, arr_station_name,
       dep_station_code, arr_station_code,
       train_type, train_no,
       dep_planned, arr_planned,
       duration_min, adult_charge
-    )
-    VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)
-    ON DUPLICATE KEY UPDATE
-      train_type = VALUES(train_type),
-      duration_min = VALUES(duration_min),
-      adult_charge = VALUES(adult_charge);
+"""
+
+
+def write_timetables(
+    conn: mysql.connector.MySQLConnection,
+    rows: List[Tuple],
+    batch_size: int = INSERT_BATCH_SIZE,
+) -> int:
+    """
+    세션 임시 테이블(tt_stage)에 INSERT IGNORE로 적재한 뒤
+    INSERT ... SELECT ... ON DUPLICATE KEY UPDATE 한 문장으로 train_timetables에 병합
+    (본 테이블 unique index 중복 검사를 배치마다가 아니라 병합 시 한 번만 수행, commit은 호출하는 쪽에서)
     """
     cur = conn.cursor()
-    cur.executemany(sql, rows)
-    return cur.rowcount
+    # 임시 테이블은 연결(세션) 단위로 유지되므로 풀에서 재사용된 연결이면 비우고 다시 사용
+    # (TRUNCATE는 암묵적 commit 우려가 있어 DELETE)
+    cur.execute("CREATE TEMPORARY TABLE IF NOT EXISTS tt_stage LIKE train_timetables")
+    cur.execute("DELETE FROM tt_stage")
+
+    head = f"INSERT IGNORE INTO tt_stage ({TIMETABLE_COLUMNS}) VALUES "
+    group = "(%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s)"
+    for batch in chunked(rows, batch_size):
+        sql = head + ",".join([group] * len(batch))
+        cur.execute(sql, [v for row in batch for v in row])
+
+    cur.execute(
+        f"""
+        INSERT INTO train_timetables ({TIMETABLE_COLUMNS})
+        SELECT {TIMETABLE_COLUMNS} FROM tt_stage
+        ON DUPLICATE KEY UPDATE
+          train_type = VALUES(train_type),
+          duration_min = VALUES(duration_min),
+          adult_charge = VALUES(adult_charge)
+        """
+    )
+    affected = cur.rowcount
+    cur.execute("DELETE FROM tt_stage")
+    return affected
 
 
 # -----------------------
 # Station sync (cityCode list -> station list -> update train.stations)
 # -----------------------
-def sync_hub_station_codes(
+async def sync_hub_station_codes(
     client: TagoClient,
     conn: mysql.connector.MySQLConnection,
     hub_names: List[str],
 ) -> None:
-    city_rows = client.fetch_city_codes(num_of_rows=1000)
+    city_rows = await client.fetch_city_codes(num_of_rows=1000)
 
     # cityname -> citycode 매핑 만들기
     cityname_to_code: Dict[str, str] = {}
@@ -420,42 +598,52 @@ def sync_hub_station_codes(
         if cn and cc:
             cityname_to_code[cn] = cc
 
+    # 힌트 -> (cityname, citycode) 매칭 결과를 힌트당 한 번만 계산
+    # 정확히 일치 없으면 포함 검색도 허용
+    @lru_cache(maxsize=None)
+    def match_cities(hint: str) -> Tuple[Tuple[str, str], ...]:
+        if hint in cityname_to_code:
+            return ((hint, cityname_to_code[hint]),)
+        if not hint:
+            return ()
+        return tuple((k, v) for k, v in cityname_to_code.items() if hint in k)
+
     # 필요한 city만 골라서 호출 수 최소화
     needed_city_codes: Dict[str, str] = {}
     for station_name in hub_names:
-        hints = STATION_TO_CITYNAME_HINTS.get(station_name, [])
-        for h in hints:
-            # 정확히 일치 없으면 포함 검색도 허용
-            if h in cityname_to_code:
-                needed_city_codes[h] = cityname_to_code[h]
-            else:
-                for k, v in cityname_to_code.items():
-                    if h and h in k:
-                        needed_city_codes[k] = v
-
-    # cityCode 별 역목록 조회 -> hub_names에 해당하는 nodename만 반영
-    updated = 0
-    for city_name, city_code in needed_city_codes.items():
-        stations = client.fetch_stations_by_city(
-            city_code=city_code, num_of_rows=1000)
+        for h in STATION_TO_CITYNAME_HINTS.get(station_name, []):
+            needed_city_codes.update(match_cities(h))
 
-        by_name: Dict[str, str] = {}
+    # 여러 힌트(서울/서울특별시 등)가 같은 cityCode로 모일 수 있으니 cityCode 기준으로 중복 제거
+    city_items: Dict[str, str] = {}
+    for city_name, city_code in needed_city_codes.items():
+        city_items.setdefault(city_code, city_name)
+
+    # cityCode 별 역목록 동시 조회 -> hub_names에 해당하는 nodename만 반영
+    station_lists = await asyncio.gather(*(
+        client.fetch_stations_by_city(city_code=city_code, num_of_rows=1000)
+        for city_code in city_items
+    ))
+
+    remaining = set(hub_names)
+    station_rows: List[Tuple[str, Optional[str], Optional[str], Optional[str]]] = []
+    for (city_code, city_name), stations in zip(city_items.items(), station_lists):
+        # 찾을 허브를 모두 찾으면 남은 역 목록은 보지 않음
         for s in stations:
+            if not remaining:
+                break
             nodename = str(s.get("nodename") or "").strip()
+            if nodename not in remaining:
+                continue
             nodeid = str(s.get("nodeid") or "").strip()
-            if nodename and nodeid:
-                by_name[nodename] = nodeid
-
-        for hub in hub_names:
-            if hub in by_name:
-                updated += upsert_station_by_name(
-                    conn,
-                    name=hub,
-                    station_code=by_name[hub],
-                    city_code=city_code,
-                    city_name=city_name,
-                )
-
+            if nodeid:
+                station_rows.append((nodename, nodeid, city_code, city_name))
+                remaining.discard(nodename)
+        if not remaining:
+            break
+
+    # 모은 행을 한 번에 UPSERT
+    updated = upsert_stations(conn, station_rows)
     conn.commit()
     print(f"[stations] upsert affected={updated}")
 
@@ -463,13 +651,15 @@ def sync_hub_station_codes(
 # -----------------------
 # Timetable loading for all ordered hub pairs and dates
 # -----------------------
-def iter_ordered_pairs(names: List[str]) -> Iterable[Tuple[str, str]]:
-    for a, b in product(names, names):
-        if a != b:
-            yield a, b
+def iter_ordered_pairs(names: List[str]) -> List[Tuple[str, str]]:
+    return [(a, b) for a in names for b in names if a != b]
 
 
-def load_all_hub_timetables(
+# 기본 허브의 (출발, 도착) 전체 방향 조합 - 한 번만 계산
+HUB_PAIRS = iter_ordered_pairs(HUB_NAMES)
+
+
+async def load_all_hub_timetables(
     client: TagoClient,
     conn: mysql.connector.MySQLConnection,
     hub_names: List[str],
@@ -486,46 +676,65 @@ def load_all_hub_timetables(
     total_items = 0
     total_rows_written = 0
 
-    for d in dates:
+    # (date, dep, arr) 전체 조회를 동시에 보내고 (동시성은 client의 Semaphore로 제한) 순서대로 적재
+    pairs = HUB_PAIRS if hub_names == HUB_NAMES else iter_ordered_pairs(hub_names)
+    jobs = [(d, dep_name, arr_name) for d in dates for dep_name, arr_name in pairs]
+    results = await asyncio.gather(*(
+        client.fetch_timetable_min_traffic(
+            code_map[dep_name], code_map[arr_name], yyyymmdd(d), num_of_rows=1000)
+        for d, dep_name, arr_name in jobs
+    ))
+
+    # 행을 버퍼에 흘려 넣고 FLUSH_ROWS 마다 multi-row INSERT + commit (메모리 상한 유지)
+    buffer: List[Tuple] = []
+
+    def flush() -> None:
+        nonlocal total_rows_written
+        if not buffer:
+            return
+        affected = write_timetables(conn, buffer)
+        conn.commit()
+        total_rows_written += affected
+        print(f"[flush] rows={len(buffer)} affected={affected}")
+        buffer.clear()
+
+    for (d, dep_name, arr_name), items in zip(jobs, results):
         d_str = yyyymmdd(d)
-
-        for dep_name, arr_name in iter_ordered_pairs(hub_names):
-            dep_code = code_map[dep_name]
-            arr_code = code_map[arr_name]
-            assert dep_code and arr_code
-
-            items = client.fetch_timetable_min_traffic(
-                dep_code, arr_code, d_str, num_of_rows=1000)
-            total_queries += 1
-            total_items += len(items)
-
-            rows: List[Tuple] = []
-            for it in items:
-                dep_dt = parse_dt_yyyymmddhhmmss(it.get("depplandtime"))
-                arr_dt = parse_dt_yyyymmddhhmmss(it.get("arrplandtime"))
-                if not dep_dt or not arr_dt:
-                    continue
-
-                duration_min = int((arr_dt - dep_dt).total_seconds() // 60)
-                rows.append(
-                    (
-                        d,                         # service_date
-                        dep_name, arr_name,
-                        dep_code, arr_code,
-                        (it.get("traingradename") or None),
-                        str(it.get("trainno") or ""),
-                        dep_dt,
-                        arr_dt,
-                        duration_min,
-                        safe_int(it.get("adultcharge")),
-                    )
+        dep_code = code_map[dep_name]
+        arr_code = code_map[arr_name]
+        assert dep_code and arr_code
+
+        total_queries += 1
+        total_items += len(items)
+
+        n_rows = 0
+        for it in items:
+            dep_dt = parse_dt_yyyymmddhhmmss(it.get("depplandtime"))
+            arr_dt = parse_dt_yyyymmddhhmmss(it.get("arrplandtime"))
+            if not dep_dt or not arr_dt:
+                continue
+
+            duration_min = int((arr_dt - dep_dt).total_seconds() // 60)
+            buffer.append(
+                (
+                    d,                         # service_date
+                    dep_name, arr_name,
+                    dep_code, arr_code,
+                    (it.get("traingradename") or None),
+                    str(it.get("trainno") or ""),
+                    dep_dt,
+                    arr_dt,
+                    duration_min,
+                    safe_int(it.get("adultcharge")),
                 )
+            )
+            n_rows += 1
+            if len(buffer) >= FLUSH_ROWS:
+                flush()
 
-            affected = write_timetables(conn, rows)
-            conn.commit()
-            total_rows_written += affected
+        print(f"[{d_str}] {dep_name}({dep_code}) -> {arr_name}({arr_code}) : items={len(items)} rows={n_rows}")
 
-            print(f"[{d_str}] {dep_name}({dep_code}) -> {arr_name}({arr_code}) : items={len(items)} rows={len(rows)} affected={affected}")
+    flush()
 
     print(
         f"[done] queries={total_queries} items={total_items} mysql_affected={total_rows_written}")
@@ -534,27 +743,30 @@ def load_all_hub_timetables(
 # -----------------------
 # Main
 # -----------------------
-def main() -> None:
-    load_dotenv()
-
-    service_key = os.getenv("TAGO_SERVICE_KEY")
-    if not service_key:
-        raise RuntimeError("TAGO_SERVICE_KEY 가 필요합니다 (.env 또는 환경변수)")
-
-    client = TagoClient(service_key=service_key)
-
+async def run(service_key: str) -> None:
     conn = mysql_connect_from_env()
     try:
         ensure_tables(conn)
 
-        # 1) stations를 name 기준으로 nodeid(station_code) / city_code / city_name 채우기
-        sync_hub_station_codes(client, conn, HUB_NAMES)
+        async with TagoClient(service_key=service_key) as client:
+            # 1) stations를 name 기준으로 nodeid(station_code) / city_code / city_name 채우기
+            await sync_hub_station_codes(client, conn, HUB_NAMES)
 
-        # 2) 거점 간 (모든 방향) + 날짜별 시간표 적재
-        load_all_hub_timetables(client, conn, HUB_NAMES, DATES)
+            # 2) 거점 간 (모든 방향) + 날짜별 시간표 적재
+            await load_all_hub_timetables(client, conn, HUB_NAMES, DATES)
     finally:
         conn.close()
 
 
+def main() -> None:
+    load_dotenv()
+
+    service_key = os.getenv("TAGO_SERVICE_KEY")
+    if not service_key:
+        raise RuntimeError("TAGO_SERVICE_KEY 가 필요합니다 (.env 또는 환경변수)")
+
+    asyncio.run(run(service_key))
+
+
 if __name__ == "__main__":
     main()
@@ -1,16 +1,34 @@
 # app/api/travel.py
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
+from pydantic import BaseModel, ValidationError
 from typing import List, Optional, Dict, Any
+from urllib.parse import parse_qsl, urlsplit
+from datetime import datetime, timezone
+import asyncio
 import logging
 
 from app.schemas.travel import UserRequest, RecommendedPlace
 from app.services.recommendation import get_travel_recommendations, recommendation_service
 from app.core.config import settings
-from app.schemas.search import LocationBasedRequest, HybridSearchResponse
+from app.core.cache import TTLCache
+from app.core.responses import FastJSONResponse, json_dumps
+from app.services.rag_cache import rag_cache, normalize_query
+from app.schemas.search import (
+    LocationBasedRequest,
+    HybridSearchResponse,
+    BatchRequest,
+    BatchResponse,
+    BatchSubRequest,
+    BatchSubResponse
+)
+
+# 시작 후 바뀌지 않는 값이라 모듈 상수로 고정
+KTO_ENABLED = settings.is_kto_enabled
+OPENAI_ENABLED = bool(settings.OPENAI_API_KEY)
 
 # 조건부 import - KTO 기능이 활성화된 경우에만 Vector 검색 기능 로드
 try:
-    if settings.is_kto_enabled:
+    if KTO_ENABLED:
         from app.schemas.search import (
             TourismSearchRequest,
             TourismSearchResponse,
@@ -29,13 +47,14 @@ except ImportError as e:
     tourism_search = None
     print(f"Vector 검색 모듈 로드 실패: {e}")
 
-# 로거 설정
+# 로거 설정 (요청 경로의 info 로그는 %-포맷 인자로 넘겨, 레벨이 꺼져 있으면 문자열 포맷 자체를 생략)
 logger = logging.getLogger(__name__)
 
 # APIRouter 인스턴스 생성 - 일관된 URL 구조 제공
 router = APIRouter(
     prefix="/travel",
     tags=["Travel"],
+    default_response_class=FastJSONResponse,
     responses={
         500: {"description": "Internal server error"},
         404: {"description": "Not found"},
@@ -44,6 +63,17 @@ router = APIRouter(
 )
 
 
+def recommend_travel_cache_key(request: UserRequest) -> str:
+    """약 100m 단위로 좌표를 묶어 근접 위치 요청끼리 같은 캐시 항목을 사용"""
+    digits = settings.RESPONSE_CACHE_COORD_DECIMALS
+    return rag_cache.make_key({
+        "endpoint": "recommend-travel",
+        "lat": round(request.latitude, digits),
+        "lon": round(request.longitude, digits),
+        "type": request.travel_type
+    })
+
+
 # ==================== 1. 기존 API 엔드포인트 (완벽한 하위 호환성 보장) ====================
 
 @router.post(
@@ -71,10 +101,18 @@ router = APIRouter(
       - `"relaxation"` - 휴양/힐링
     """
 )
-async def recommend_travel_places(request: UserRequest):
+async def recommend_travel_places(
+    request: UserRequest,
+    cache_key: str = Depends(recommend_travel_cache_key)
+):
     """
     기존 여행지 추천 API - 인터페이스 완전 동일, 내부 로직만 RAG로 강화
     """
+    cached = await rag_cache.get(cache_key)
+    if cached is not None:
+        logger.info("추천 캐시 적중: %s", cache_key)
+        return cached
+
     try:
         recommendations = await get_travel_recommendations(request)
 
@@ -84,8 +122,9 @@ async def recommend_travel_places(request: UserRequest):
                 detail="현재 조건에 맞는 추천 장소를 찾을 수 없습니다. 다른 여행 타입이나 위치로 시도해보세요."
             )
 
-        logger.info(
-            f"추천 완료: {len(recommendations)}개 장소 (위치: {request.latitude}, {request.longitude})")
+        logger.info("추천 완료: %d개 장소 (위치: %s, %s)",
+                    len(recommendations), request.latitude, request.longitude)
+        await rag_cache.set(cache_key, recommendations)
         return recommendations
 
     except HTTPException:
@@ -133,7 +172,7 @@ if VECTOR_SEARCH_AVAILABLE:
     async def search_tourism_places(request: TourismSearchRequest):
         """상세 관광지 검색 (POST 방식)"""
         try:
-            results = tourism_search.search(
+            results = await tourism_search.asearch(
                 query=request.query,
                 n_results=request.n_results,
                 area_code=request.area_code,
@@ -141,8 +180,8 @@ if VECTOR_SEARCH_AVAILABLE:
                 include_distances=request.include_similarity
             )
 
-            logger.info(
-                f"검색 완료: '{request.query}' -> {results.get('total_results', 0)}개 결과")
+            logger.info("검색 완료: '%s' -> %s개 결과",
+                        request.query, results.get('total_results', 0))
             return TourismSearchResponse(**results)
 
         except Exception as e:
@@ -174,15 +213,15 @@ if VECTOR_SEARCH_AVAILABLE:
     ):
         """간단한 GET 방식 검색"""
         try:
-            results = tourism_search.search(
+            results = await tourism_search.asearch(
                 query=q,
                 n_results=limit,
                 area_code=area,
                 content_type=type
             )
 
-            logger.info(
-                f"간단 검색: '{q}' -> {results.get('total_results', 0)}개 결과")
+            logger.info("간단 검색: '%s' -> %s개 결과",
+                        q, results.get('total_results', 0))
             return results
 
         except Exception as e:
@@ -215,6 +254,21 @@ if VECTOR_SEARCH_AVAILABLE:
         limit: int = Query(10, ge=1, le=30, description="결과 개수")
     ):
         """자연어 기반 AI 추천 (RAG 모드)"""
+        # 같은 필터(scope) 안에서 정확 일치 -> 의미 유사 쿼리 순으로 캐시 조회
+        normalized = normalize_query(query)
+        scope_params = {
+            "endpoint": "recommend/query",
+            "area": area_code,
+            "type": content_type,
+            "limit": limit
+        }
+        scope = rag_cache.make_key(scope_params)
+        cache_key = rag_cache.make_key({**scope_params, "q": normalized})
+        cached = await rag_cache.get(cache_key, query=normalized, scope=scope)
+        if cached is not None:
+            logger.info("AI 추천 캐시 적중: '%s'", query)
+            return cached
+
         try:
             preferences = {}
             if area_code:
@@ -224,13 +278,15 @@ if VECTOR_SEARCH_AVAILABLE:
             if limit != 10:
                 preferences["n_results"] = limit
 
-            result = recommendation_service.get_travel_recommendations_by_query(
+            result = await recommendation_service.aget_travel_recommendations_by_query(
                 user_query=query,
                 preferences=preferences if preferences else None
             )
 
-            logger.info(
-                f"AI 추천 완료: '{query}' -> {result.get('total_found', 0)}개 결과")
+            logger.info("AI 추천 완료: '%s' -> %s개 결과",
+                        query, result.get('total_found', 0))
+            if "error" not in result:
+                await rag_cache.set(cache_key, result, query=normalized, scope=scope)
             return result
 
         except Exception as e:
@@ -261,11 +317,11 @@ if VECTOR_SEARCH_AVAILABLE:
             if area_code:
                 filters["area_code"] = area_code
 
-            results = recommendation_service.search_similar_places(
+            results = await recommendation_service.asearch_similar_places(
                 query, filters)
 
-            logger.info(
-                f"유사 장소 검색: '{query}' -> {results.get('total_results', 0)}개 결과")
+            logger.info("유사 장소 검색: '%s' -> %s개 결과",
+                        query, results.get('total_results', 0))
             return results
 
         except Exception as e:
@@ -297,21 +353,10 @@ if VECTOR_SEARCH_AVAILABLE:
                 }
             )
 
+        # 가중치 합계는 LocationBasedRequest 검증 단계에서 확인됨 (위반 시 422)
         try:
-            # 가중치 합계 검증
-            total_weight = (
-                request.distance_weight +
-                request.similarity_weight +
-                request.preference_weight
-            )
-            if abs(total_weight - 1.0) > 0.01:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"가중치 합계는 1.0이어야 합니다. 현재: {total_weight:.3f}"
-                )
-
-            # 하이브리드 검색 실행
-            results = hybrid_search_service.search(request)
+            # 하이브리드 검색 실행 (거리 필터와 Vector 검색을 서비스 내부에서 동시 실행)
+            results = await hybrid_search_service.search(request)
 
             return {
                 "search_metadata": {
@@ -325,7 +370,8 @@ if VECTOR_SEARCH_AVAILABLE:
                         "preference": request.preference_weight
                     }
                 },
-                "results": [r.dict() for r in results],
+                # HybridSearchResult(dataclass)는 응답 클래스(orjson)가 직접 직렬화
+                "results": results,
                 "total_results": len(results),
                 "search_quality": {
                     "excellent": len(results) >= 8,
@@ -334,8 +380,6 @@ if VECTOR_SEARCH_AVAILABLE:
                 }
             }
 
-        except HTTPException:
-            raise
         except Exception as e:
             logger.error(f"하이브리드 검색 오류: {e}")
             raise HTTPException(
@@ -365,30 +409,91 @@ else:
 
 # ==================== 3. 시스템 정보 및 통계 ====================
 
+# Vector DB 통계 캐시: 로드밸런서가 /health를 자주 폴링해도 TTL 동안은 DB를 조회하지 않음
+vector_stats_cache = TTLCache(maxsize=1, ttl_sec=settings.STATS_CACHE_TTL_SEC)
+vector_stats_lock = asyncio.Lock()
+
+
+async def get_vector_db_stats(fresh: bool = False) -> Dict:
+    """캐시된 Vector DB 통계 반환 (만료 시 동시 요청 중 하나만 다시 조회)"""
+    if not fresh:
+        cached = vector_stats_cache.get("stats")
+        if cached is not None:
+            return cached
+    async with vector_stats_lock:
+        if not fresh:
+            # 락을 기다리는 동안 다른 요청이 갱신했으면 그 값을 사용
+            cached = vector_stats_cache.get("stats")
+            if cached is not None:
+                return cached
+        stats = await asyncio.to_thread(tourism_search.get_stats)
+        vector_stats_cache.set("stats", stats)
+        return stats
+
+
+# VECTOR_SEARCH_AVAILABLE은 시작 후 바뀌지 않으므로 /stats, /health는 import 시점에
+# 해당하는 핸들러 하나만 등록 (요청마다 분기하지 않음)
+if VECTOR_SEARCH_AVAILABLE:
 
-@router.get(
-    "/stats",
-    response_model=StatsResponse if VECTOR_SEARCH_AVAILABLE else Dict,
-    summary="서비스 통계 정보",
-    description="Vector DB 저장 데이터 통계 및 서비스 상태 정보"
-)
-async def get_service_stats():
-    """서비스 통계 및 상태 정보"""
-    if VECTOR_SEARCH_AVAILABLE:
+    @router.get(
+        "/stats",
+        response_model=StatsResponse,
+        summary="서비스 통계 정보",
+        description="Vector DB 저장 데이터 통계 및 서비스 상태 정보"
+    )
+    async def get_service_stats(
+        fresh: bool = Query(False, description="캐시를 무시하고 Vector DB에서 다시 조회")
+    ):
+        """서비스 통계 및 상태 정보"""
         try:
-            stats = tourism_search.get_stats()
-            return StatsResponse(**stats)
+            stats = await get_vector_db_stats(fresh=fresh)
+            return StatsResponse(**stats, response_cache=rag_cache.get_stats())
         except Exception as e:
             logger.error(f"통계 조회 중 오류: {e}")
             raise HTTPException(status_code=500, detail=str(e))
-    else:
+else:
+
+    @router.get(
+        "/stats",
+        response_model=Dict,
+        summary="서비스 통계 정보",
+        description="Vector DB 저장 데이터 통계 및 서비스 상태 정보"
+    )
+    async def get_service_stats(
+        fresh: bool = Query(False, description="캐시를 무시하고 Vector DB에서 다시 조회")
+    ):
+        """서비스 통계 및 상태 정보 (Vector DB 비활성화)"""
         return {
             "message": "Vector DB 통계를 사용할 수 없습니다.",
             "reason": "KTO 데이터가 활성화되지 않음",
-            "available_features": ["기본 OpenAI 추천"]
+            "available_features": ["기본 OpenAI 추천"],
+            "response_cache": rag_cache.get_stats()
         }
 
 
+# 추천 서비스 상태 함수는 싱글톤 메서드라 요청마다 hasattr로 찾지 않고 시작 시 한 번만 조회
+rec_status_fn = getattr(recommendation_service, "get_service_status", None)
+
+# /status 의 기능 목록 / 엔드포인트 맵 (시작 시 한 번만 구성)
+STATUS_AVAILABLE_FEATURES = {
+    "location_based_recommendation": True,  # 항상 사용 가능
+    "vector_search": VECTOR_SEARCH_AVAILABLE,
+    "semantic_search": VECTOR_SEARCH_AVAILABLE,
+    "rag_recommendation": VECTOR_SEARCH_AVAILABLE,
+    "similarity_search": VECTOR_SEARCH_AVAILABLE,
+    "hybrid_search": VECTOR_SEARCH_AVAILABLE
+}
+
+STATUS_ENDPOINTS = {
+    "legacy_recommend": "/travel/recommend-travel",
+    "vector_search": "/travel/search" if VECTOR_SEARCH_AVAILABLE else None,
+    "simple_search": "/travel/search/simple" if VECTOR_SEARCH_AVAILABLE else None,
+    "ai_recommend": "/travel/recommend/query" if VECTOR_SEARCH_AVAILABLE else None,
+    "similar_search": "/travel/similar" if VECTOR_SEARCH_AVAILABLE else None,
+    "hybrid_search": "/travel/search/location-hybrid" if VECTOR_SEARCH_AVAILABLE else None
+}
+
+
 @router.get(
     "/status",
     summary="서비스 상태 확인",
@@ -410,35 +515,20 @@ async def get_service_status():
         }
 
         # 추천 서비스 상태
-        if hasattr(recommendation_service, 'get_service_status'):
-            rec_status = recommendation_service.get_service_status()
+        if rec_status_fn is not None:
+            # 내부에서 Vector DB count를 조회하므로 워커 스레드에서 실행
+            rec_status = await asyncio.to_thread(rec_status_fn)
             status_info.update(rec_status)
         else:
             status_info.update({
-                "openai_enabled": bool(settings.OPENAI_API_KEY),
+                "openai_enabled": OPENAI_ENABLED,
                 "vector_search_enabled": VECTOR_SEARCH_AVAILABLE,
-                "kto_data_available": settings.is_kto_enabled
+                "kto_data_available": KTO_ENABLED
             })
 
-        # 사용 가능한 기능 목록
-        status_info["available_features"] = {
-            "location_based_recommendation": True,  # 항상 사용 가능
-            "vector_search": VECTOR_SEARCH_AVAILABLE,
-            "semantic_search": VECTOR_SEARCH_AVAILABLE,
-            "rag_recommendation": VECTOR_SEARCH_AVAILABLE,
-            "similarity_search": VECTOR_SEARCH_AVAILABLE,
-            "hybrid_search": VECTOR_SEARCH_AVAILABLE
-        }
-
-        # API 엔드포인트 맵
-        status_info["endpoints"] = {
-            "legacy_recommend": "/travel/recommend-travel",
-            "vector_search": "/travel/search" if VECTOR_SEARCH_AVAILABLE else None,
-            "simple_search": "/travel/search/simple" if VECTOR_SEARCH_AVAILABLE else None,
-            "ai_recommend": "/travel/recommend/query" if VECTOR_SEARCH_AVAILABLE else None,
-            "similar_search": "/travel/similar" if VECTOR_SEARCH_AVAILABLE else None,
-            "hybrid_search": "/travel/search/location-hybrid" if VECTOR_SEARCH_AVAILABLE else None
-        }
+        # 사용 가능한 기능 목록 / API 엔드포인트 맵
+        status_info["available_features"] = STATUS_AVAILABLE_FEATURES
+        status_info["endpoints"] = STATUS_ENDPOINTS
 
         return status_info
 
@@ -453,6 +543,94 @@ async def get_service_status():
 
 
 # ==================== 4. 참조 정보 API ====================
+# 바뀌지 않는 참조표라 import 시점에 JSON bytes로 한 번만 직렬화해 두고 그대로 응답
+# (요청마다 dict 생성 + 검증 + 직렬화 생략)
+
+AREA_CODES: Dict[str, str] = {
+    # 특별시/광역시
+    "1": "서울특별시",
+    "2": "인천광역시",
+    "3": "대전광역시",
+    "4": "대구광역시",
+    "5": "광주광역시",
+    "6": "부산광역시",
+    "7": "울산광역시",
+    "8": "세종특별자치시",
+
+    # 도 지역
+    "31": "경기도",
+    "32": "강원특별자치도",
+    "33": "충청북도",
+    "34": "충청남도",
+    "35": "경상북도",
+    "36": "경상남도",
+    "37": "전북특별자치도",
+    "38": "전라남도",
+    "39": "제주특별자치도"
+}
+
+
+CONTENT_TYPES: Dict[str, str] = {
+    "12": "관광지",
+    "14": "문화시설",
+    "15": "축제공연행사",
+    "25": "여행코스",
+    "28": "레포츠",
+    "32": "숙박",
+    "38": "쇼핑",
+    "39": "음식점"
+}
+
+
+TRAVEL_TYPES: Dict[str, Any] = {
+    "available_types": [
+        {
+            "value": "nature",
+            "label": "자연",
+            "description": "산, 바다, 공원, 자연 관광지",
+            "examples": ["국립공원", "해변", "산책로", "자연휴양림"]
+        },
+        {
+            "value": "culture",
+            "label": "문화",
+            "description": "박물관, 궁궐, 유적지, 문화시설",
+            "examples": ["경복궁", "국립박물관", "문화재", "전통마을"]
+        },
+        {
+            "value": "food",
+            "label": "음식",
+            "description": "맛집, 카페, 레스토랑, 특산물",
+            "examples": ["전통음식", "카페거리", "시장", "맛집"]
+        },
+        {
+            "value": "shopping",
+            "label": "쇼핑",
+            "description": "시장, 백화점, 쇼핑몰, 거리",
+            "examples": ["명동", "홍대", "전통시장", "아울렛"]
+        },
+        {
+            "value": "activity",
+            "label": "액티비티",
+            "description": "레저, 스포츠, 체험 활동",
+            "examples": ["테마파크", "수상스포츠", "등산", "체험관"]
+        },
+        {
+            "value": "relaxation",
+            "label": "휴양",
+            "description": "온천, 리조트, 힐링 장소",
+            "examples": ["온천", "스파", "리조트", "휴양지"]
+        }
+    ],
+    "usage_note": "이 값들을 /travel/recommend-travel API의 travel_type 필드에 사용하세요."
+}
+
+
+# 참조표 엔드포인트는 미리 직렬화한 bytes를 그대로 돌려주기만 해서 event loop를 막지 않음
+# (sync def로 두면 응답마다 스레드풀 왕복만 추가되므로 async def 유지)
+AREA_CODES_JSON = json_dumps(AREA_CODES)
+CONTENT_TYPES_JSON = json_dumps(CONTENT_TYPES)
+TRAVEL_TYPES_JSON = json_dumps(TRAVEL_TYPES)
+
 
 @router.get(
     "/area-codes",
@@ -466,28 +644,7 @@ async def get_area_codes():
 
     Vector 검색이나 필터링에서 사용할 수 있는 지역 코드 목록입니다.
     """
-    return {
-        # 특별시/광역시
-        "1": "서울특별시",
-        "2": "인천광역시",
-        "3": "대전광역시",
-        "4": "대구광역시",
-        "5": "광주광역시",
-        "6": "부산광역시",
-        "7": "울산광역시",
-        "8": "세종특별자치시",
-
-        # 도 지역
-        "31": "경기도",
-        "32": "강원특별자치도",
-        "33": "충청북도",
-        "34": "충청남도",
-        "35": "경상북도",
-        "36": "경상남도",
-        "37": "전북특별자치도",
-        "38": "전라남도",
-        "39": "제주특별자치도"
-    }
+    return Response(content=AREA_CODES_JSON, media_type="application/json")
 
 
 @router.get(
@@ -502,16 +659,7 @@ async def get_content_types():
 
     Vector 검색에서 특정 유형의 장소만 필터링할 때 사용합니다.
     """
-    return {
-        "12": "관광지",
-        "14": "문화시설",
-        "15": "축제공연행사",
-        "25": "여행코스",
-        "28": "레포츠",
-        "32": "숙박",
-        "38": "쇼핑",
-        "39": "음식점"
-    }
+    return Response(content=CONTENT_TYPES_JSON, media_type="application/json")
 
 
 @router.get(
@@ -525,85 +673,55 @@ async def get_travel_types():
 
     /recommend-travel API의 travel_type 파라미터에서 사용할 수 있는 값들입니다.
     """
-    return {
-        "available_types": [
-            {
-                "value": "nature",
-                "label": "자연",
-                "description": "산, 바다, 공원, 자연 관광지",
-                "examples": ["국립공원", "해변", "산책로", "자연휴양림"]
-            },
-            {
-                "value": "culture",
-                "label": "문화",
-                "description": "박물관, 궁궐, 유적지, 문화시설",
-                "examples": ["경복궁", "국립박물관", "문화재", "전통마을"]
-            },
-            {
-                "value": "food",
-                "label": "음식",
-                "description": "맛집, 카페, 레스토랑, 특산물",
-                "examples": ["전통음식", "카페거리", "시장", "맛집"]
-            },
-            {
-                "value": "shopping",
-                "label": "쇼핑",
-                "description": "시장, 백화점, 쇼핑몰, 거리",
-                "examples": ["명동", "홍대", "전통시장", "아울렛"]
-            },
-            {
-                "value": "activity",
-                "label": "액티비티",
-                "description": "레저, 스포츠, 체험 활동",
-                "examples": ["테마파크", "수상스포츠", "등산", "체험관"]
-            },
-            {
-                "value": "relaxation",
-                "label": "휴양",
-                "description": "온천, 리조트, 힐링 장소",
-                "examples": ["온천", "스파", "리조트", "휴양지"]
-            }
-        ],
-        "usage_note": "이 값들을 /travel/recommend-travel API의 travel_type 필드에 사용하세요."
-    }
+    return Response(content=TRAVEL_TYPES_JSON, media_type="application/json")
 
 
 # ==================== 5. 헬스 체크 ====================
 
-@router.get(
-    "/health",
+# 요청마다 바뀌지 않는 부분은 import 시점에 한 번만 구성하고 timestamp만 채움
+HEALTH_BASE = {
+    "status": "healthy",
+    "service": "AI Travel Recommendation API",
+    "version": "1.0.0",
+}
+HEALTH_OPENAI_STATUS = "connected" if OPENAI_ENABLED else "not_configured"
+
+
+def _base_health_info() -> Dict[str, Any]:
+    return {
+        **HEALTH_BASE,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "dependencies": {"openai": HEALTH_OPENAI_STATUS}
+    }
+
+
+HEALTH_ROUTE = dict(
     summary="헬스 체크",
     description="서비스 및 의존성 상태 확인 (로드밸런서/모니터링용)",
     tags=["Health"]
 )
-async def health_check():
-    """
-    헬스 체크 엔드포인트
 
-    서비스 상태와 주요 의존성들의 연결 상태를 확인합니다.
-    """
-    health_info = {
-        "status": "healthy",
-        "service": "AI Travel Recommendation API",
-        "version": "1.0.0",
-        "timestamp": "2024-01-01T00:00:00Z"  # 실제로는 현재 시간 사용
-    }
+if VECTOR_SEARCH_AVAILABLE:
 
-    # OpenAI 연결 상태
-    try:
-        health_info["dependencies"] = {
-            "openai": "connected" if settings.OPENAI_API_KEY else "not_configured"
-        }
-    except Exception:
-        health_info["dependencies"] = {"openai": "error"}
+    @router.get("/health", **HEALTH_ROUTE)
+    async def health_check(
+        fresh: bool = Query(False, description="캐시를 무시하고 Vector DB에서 다시 조회")
+    ):
+        """
+        헬스 체크 엔드포인트
+
+        서비스 상태와 주요 의존성들의 연결 상태를 확인합니다.
+        """
+        health_info = _base_health_info()
 
-    # Vector DB 연결 상태 (활성화된 경우에만)
-    if VECTOR_SEARCH_AVAILABLE:
+        # Vector DB 연결 상태
         try:
-            stats = tourism_search.get_stats()
+            stats = await get_vector_db_stats(fresh=fresh)
             health_info["dependencies"]["vector_db"] = {
                 "status": "connected",
-                "total_items": stats.get("total_items", 0)
+                "total_items": stats.get("total_items", 0),
+                "index_type": stats.get("index_type"),
+                "index_ready": stats.get("num_vectors", 0) > 0
             }
         except Exception as e:
             health_info["dependencies"]["vector_db"] = {
@@ -611,7 +729,135 @@ async def health_check():
                 "message": str(e)
             }
             health_info["status"] = "degraded"
-    else:
+
+        return health_info
+else:
+
+    @router.get("/health", **HEALTH_ROUTE)
+    async def health_check(
+        fresh: bool = Query(False, description="캐시를 무시하고 Vector DB에서 다시 조회")
+    ):
+        """
+        헬스 체크 엔드포인트 (Vector DB 비활성화)
+
+        서비스 상태와 주요 의존성들의 연결 상태를 확인합니다.
+        """
+        health_info = _base_health_info()
         health_info["dependencies"]["vector_db"] = "disabled"
+        return health_info
+
+
+# ==================== 6. 배치 API ====================
+# 하위 요청을 HTTP를 다시 타지 않고 기존 핸들러 함수로 직접 호출해 동시에 처리
+
+BATCH_MAX_CONCURRENCY = 8
+
 
-    return health_info
+def _int_param(params: Dict[str, str], name: str, default: int, lo: int, hi: int) -> int:
+    try:
+        value = int(params.get(name, default))
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"{name}는 정수여야 합니다")
+    if not lo <= value <= hi:
+        raise HTTPException(status_code=422, detail=f"{name}는 {lo}~{hi} 사이여야 합니다")
+    return value
+
+
+def _required_param(params: Dict[str, str], name: str) -> str:
+    if not params.get(name):
+        raise HTTPException(status_code=422, detail=f"{name} 파라미터가 필요합니다")
+    return params[name]
+
+
+if VECTOR_SEARCH_AVAILABLE:
+    BATCH_ROUTES = {
+        ("POST", "/search"): lambda p, body: search_tourism_places(
+            TourismSearchRequest(**(body or {}))),
+        ("GET", "/search/simple"): lambda p, body: simple_search(
+            q=_required_param(p, "q"),
+            limit=_int_param(p, "limit", 10, 1, 50),
+            area=p.get("area"),
+            type=p.get("type")),
+        ("GET", "/recommend/query"): lambda p, body: get_ai_recommendations_by_query(
+            query=_required_param(p, "query"),
+            area_code=p.get("area_code"),
+            content_type=p.get("content_type"),
+            limit=_int_param(p, "limit", 10, 1, 30)),
+        ("GET", "/similar"): lambda p, body: find_similar_places(
+            query=_required_param(p, "query"),
+            area_code=p.get("area_code"),
+            limit=_int_param(p, "limit", 10, 1, 30)),
+    }
+else:
+    BATCH_ROUTES = {
+        route: lambda p, body: vector_search_unavailable()
+        for route in [("POST", "/search"), ("GET", "/search/simple"),
+                      ("GET", "/recommend/query"), ("GET", "/similar")]
+    }
+BATCH_ROUTES.update({
+    ("GET", "/stats"): lambda p, body: get_service_stats(
+        fresh=p.get("fresh", "").lower() in ("1", "true")),
+    ("GET", "/status"): lambda p, body: get_service_status(),
+})
+
+
+def _route_path(path: str) -> str:
+    """'/api/v1/travel/similar' 처럼 prefix가 붙어 와도 라우터 기준 경로로 맞춤"""
+    for prefix in ("/api/v1", router.prefix):
+        if path.startswith(prefix + "/"):
+            path = path[len(prefix):]
+    return path
+
+
+async def _run_sub_request(sub: BatchSubRequest, sem: asyncio.Semaphore) -> BatchSubResponse:
+    parsed = urlsplit(sub.url)
+    params = dict(parse_qsl(parsed.query))
+    handler = BATCH_ROUTES.get((sub.method.upper(), _route_path(parsed.path)))
+    if handler is None:
+        return BatchSubResponse(id=sub.id, status=404, body={"detail": f"지원하지 않는 요청: {sub.method} {sub.url}"})
+
+    try:
+        async with sem:
+            result = await handler(params, sub.body)
+        if isinstance(result, BaseModel):
+            result = result.model_dump()
+        return BatchSubResponse(id=sub.id, status=200, body=result)
+    except HTTPException as e:
+        return BatchSubResponse(id=sub.id, status=e.status_code, body={"detail": e.detail})
+    except ValidationError as e:
+        return BatchSubResponse(id=sub.id, status=422, body={"detail": e.errors(include_url=False)})
+    except Exception as e:
+        logger.error(f"배치 하위 요청 오류 ({sub.id}): {e}")
+        return BatchSubResponse(id=sub.id, status=500, body={"detail": str(e)})
+
+
+@router.post(
+    "/batch",
+    response_model=BatchResponse,
+    summary="배치 요청",
+    description="""
+    **여러 조회 요청을 한 번의 왕복으로 처리**
+
+    `/search`, `/search/simple`, `/recommend/query`, `/similar`, `/stats`, `/status` 를
+    하위 요청으로 묶어 동시에 실행하고, 각 결과를 `{id, status, body}` 로 돌려줍니다.
+    하위 요청 하나가 실패해도 나머지 결과는 정상 반환됩니다.
+
+    ### 예시:
+    ```json
+    {
+      "requests": [
+        {"id": "1", "method": "GET", "url": "/similar?query=경복궁&limit=5"},
+        {"id": "2", "method": "POST", "url": "/search", "body": {"query": "서울 카페"}},
+        {"id": "3", "method": "GET", "url": "/stats"}
+      ]
+    }
+    ```
+    """
+)
+async def batch_requests(request: BatchRequest):
+    """하위 요청들을 동시에 실행 (Vector DB 부하를 고려해 동시 실행 수 제한)"""
+    sem = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+    responses = await asyncio.gather(
+        *(_run_sub_request(sub, sem) for sub in request.requests)
+    )
+    return BatchResponse(responses=responses)
@@ -0,0 +1,48 @@
+# app/core/cache.py
+"""
+프로세스 내 TTL + LRU 캐시
+- 반복되는 요청(같은 위치/타입 추천 등)의 응답을 재사용해 OpenAI/Vector DB 호출을 줄임
+- 만료(ttl_sec) 또는 용량 초과(maxsize, LRU) 시 제거
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """스레드 안전 TTL + LRU 캐시 (asyncio.to_thread 워커에서 호출돼도 안전)"""
+
+    def __init__(self, maxsize: int = 1024, ttl_sec: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl_sec = ttl_sec
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """만료되지 않은 값 반환 (없으면 None)"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_sec, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
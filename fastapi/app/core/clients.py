@@ -0,0 +1,34 @@
+# app/core/clients.py
+"""
+공유 OpenAI 클라이언트
+- 서비스마다 클라이언트를 따로 만들면 커넥션 풀도 따로 생겨 TLS 핸드셰이크를 중복으로 치름
+- 프로세스당 sync/async 클라이언트 하나씩만 만들어 keep-alive 커넥션을 모든 엔드포인트가 재사용
+"""
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from app.core.config import settings
+
+OPENAI_HTTP_LIMITS = httpx.Limits(
+    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+# 동기 호출용 (asyncio.to_thread 워커에서 사용, httpx.Client는 스레드 안전)
+openai_client = OpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    http_client=DefaultHttpxClient(limits=OPENAI_HTTP_LIMITS),
+)
+
+# async 엔드포인트용 (event loop를 막지 않음)
+async_openai_client = AsyncOpenAI(
+    api_key=settings.OPENAI_API_KEY,
+    http_client=DefaultAsyncHttpxClient(limits=OPENAI_HTTP_LIMITS),
+)
+
+
+async def aclose_clients() -> None:
+    """앱 종료 시 커넥션 풀 정리"""
+    await async_openai_client.close()
+    openai_client.close()
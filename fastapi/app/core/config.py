@@ -1,8 +1,13 @@
 
+import atexit
 import os
 import logging
+import queue
 import sys
-from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+from functools import cached_property, lru_cache
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
@@ -26,6 +31,10 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: str = Field(..., env="OPENAI_API_KEY")
     OPENAI_MODEL: str = Field(default="gpt-4o-mini", env="OPENAI_MODEL")
     OPENAI_TEMPERATURE: float = Field(default=0.7, env="OPENAI_TEMPERATURE")
+    # 모든 서비스가 공유하는 OpenAI HTTP 커넥션 풀 크기
+    OPENAI_MAX_CONNECTIONS: int = Field(default=200, env="OPENAI_MAX_CONNECTIONS")
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = Field(
+        default=100, env="OPENAI_MAX_KEEPALIVE_CONNECTIONS")
 
     # ==================== KTO API 설정 ====================
     KTO_SERVICE_KEY: Optional[str] = Field(default=None, env="KTO_SERVICE_KEY")
@@ -33,6 +42,9 @@ class Settings(BaseSettings):
         default="https://apis.data.go.kr/B551011/KorService2",
         env="KTO_API_BASE_URL"
     )
+    # 적재 시 동시 페이지 요청 수 / 초당 최대 요청 수 (재시도 포함, KTO API rate limit 대응)
+    KTO_FETCH_WORKERS: int = Field(default=8, env="KTO_FETCH_WORKERS")
+    KTO_FETCH_RATE_PER_SEC: float = Field(default=5.0, env="KTO_FETCH_RATE_PER_SEC")
 
     # ==================== Vector DB 설정 ====================
     VECTOR_DB_PATH: str = Field(
@@ -41,20 +53,80 @@ class Settings(BaseSettings):
         default="kto_tourism", env="VECTOR_DB_COLLECTION")
     # korean, openai, default
     EMBEDDING_TYPE: str = Field(default="korean", env="EMBEDDING_TYPE")
+    # 한국어 임베딩 모델을 INT8 양자화 ONNX Runtime으로 실행 (onnx/onnxruntime 필요)
+    # 켜고 끌 때는 저장된 벡터와 맞도록 데이터를 다시 적재해야 함
+    EMBEDDING_ONNX_INT8: bool = Field(default=False, env="EMBEDDING_ONNX_INT8")
+    EMBEDDING_ONNX_DIR: str = Field(
+        default="./data/onnx/ko-sroberta-multitask", env="EMBEDDING_ONNX_DIR")
+    # PyTorch 임베딩 모델 정밀도: float32, float16(CUDA 전용), bfloat16(AVX-512 BF16/AMX CPU 또는 GPU)
+    # 반정밀도는 FP32 대비 코사인 유사도 차이를 확인한 뒤 사용 (ONNX INT8 사용 시 무시)
+    EMBEDDING_DTYPE: str = Field(default="float32", env="EMBEDDING_DTYPE")
+    # HNSW ANN 인덱스 파라미터 (Chroma는 컬렉션 생성 시점에만 적용)
+    VECTOR_DB_HNSW_M: int = Field(default=16, env="VECTOR_DB_HNSW_M")
+    VECTOR_DB_HNSW_CONSTRUCTION_EF: int = Field(
+        default=200, env="VECTOR_DB_HNSW_CONSTRUCTION_EF")
+    VECTOR_DB_HNSW_SEARCH_EF: int = Field(
+        default=100, env="VECTOR_DB_HNSW_SEARCH_EF")
 
     # ==================== 성능 설정 ====================
     BATCH_SIZE: int = Field(default=50, env="BATCH_SIZE")
     MAX_RETRIES: int = Field(default=3, env="MAX_RETRIES")
     REQUEST_TIMEOUT: int = Field(default=30, env="REQUEST_TIMEOUT")
+    # 임베딩 모델 연산 스레드 수 (0 = 라이브러리 기본값 = 코어 수)
+    # 여러 요청이 asyncio.to_thread로 동시에 encode하면 요청마다 코어 수만큼 스레드를 써서 과구독됨
+    EMBEDDING_NUM_THREADS: int = Field(default=0, env="EMBEDDING_NUM_THREADS")
+    # 동시에 들어온 검색 쿼리 임베딩을 묶어서 한 번에 계산 (최대 개수 / 최대 대기 시간)
+    EMBEDDING_BATCH_MAX_SIZE: int = Field(default=32, env="EMBEDDING_BATCH_MAX_SIZE")
+    EMBEDDING_BATCH_MAX_WAIT_MS: float = Field(
+        default=10.0, env="EMBEDDING_BATCH_MAX_WAIT_MS")
+    # 쿼리 임베딩 캐시 (선호도 기본 쿼리 등 같은 문자열이 반복되므로 재계산 생략)
+    EMBEDDING_CACHE_MAXSIZE: int = Field(default=2048, env="EMBEDDING_CACHE_MAXSIZE")
+    EMBEDDING_CACHE_TTL_SEC: int = Field(default=86400, env="EMBEDDING_CACHE_TTL_SEC")
+    # 디스크 임베딩 캐시 (재적재/재시작 시 같은 텍스트 재임베딩 생략, 빈 값이면 비활성화)
+    EMBEDDING_DISK_CACHE_PATH: str = Field(
+        default="./data/embedding_cache.sqlite3", env="EMBEDDING_DISK_CACHE_PATH")
+    # 이 크기(bytes) 이상 응답만 gzip 압축 (/health 같은 작은 응답은 그대로)
+    GZIP_MINIMUM_SIZE: int = Field(default=1024, env="GZIP_MINIMUM_SIZE")
+    GZIP_COMPRESS_LEVEL: int = Field(default=5, env="GZIP_COMPRESS_LEVEL")
 
     # ==================== 검색 설정 ====================
     DEFAULT_SEARCH_RESULTS: int = Field(
         default=10, env="DEFAULT_SEARCH_RESULTS")
     MAX_SEARCH_RESULTS: int = Field(default=50, env="MAX_SEARCH_RESULTS")
+    # 위치 인덱스가 컬렉션 변경(재적재)을 확인하는 주기
+    GEO_INDEX_REFRESH_SEC: float = Field(default=60.0, env="GEO_INDEX_REFRESH_SEC")
+
+    # ==================== 응답 캐시 설정 ====================
+    RESPONSE_CACHE_TTL_SEC: int = Field(default=300, env="RESPONSE_CACHE_TTL_SEC")
+    RESPONSE_CACHE_MAXSIZE: int = Field(default=4096, env="RESPONSE_CACHE_MAXSIZE")
+    # 위/경도 반올림 자릿수 (3 = 약 100m, 가까운 위치끼리 캐시 공유)
+    RESPONSE_CACHE_COORD_DECIMALS: int = Field(
+        default=3, env="RESPONSE_CACHE_COORD_DECIMALS")
+    # /stats, /health 의 Vector DB 통계 캐시 (헬스체크 폴링마다 DB 조회하지 않도록)
+    STATS_CACHE_TTL_SEC: float = Field(default=10.0, env="STATS_CACHE_TTL_SEC")
+    # 의미 캐시: 같은 필터에서 쿼리 임베딩 코사인 유사도가 이 값 이상이면 캐시 응답 재사용
+    RAG_CACHE_SIMILARITY_THRESHOLD: float = Field(
+        default=0.93, env="RAG_CACHE_SIMILARITY_THRESHOLD")
+    RAG_CACHE_SEMANTIC_INDEX_SIZE: int = Field(
+        default=256, env="RAG_CACHE_SEMANTIC_INDEX_SIZE")
+    # 하이브리드 검색 3단계(OpenAI 지식 기반 추천) 결과 디스크 캐시
+    OPENAI_RESULT_CACHE_PATH: str = Field(
+        default="./data/openai_result_cache.sqlite3", env="OPENAI_RESULT_CACHE_PATH")
+    OPENAI_RESULT_CACHE_TTL_SEC: int = Field(
+        default=7 * 86400, env="OPENAI_RESULT_CACHE_TTL_SEC")
+    # 위/경도 반올림 자릿수 (2 = 약 1km)
+    OPENAI_RESULT_CACHE_COORD_DECIMALS: int = Field(
+        default=2, env="OPENAI_RESULT_CACHE_COORD_DECIMALS")
+    # 쿼리 의도 분석(QueryAnalyzer) 결과 캐시 (정규화 쿼리 + 반올림 좌표)
+    QUERY_ANALYSIS_CACHE_TTL_SEC: int = Field(default=3600, env="QUERY_ANALYSIS_CACHE_TTL_SEC")
+    QUERY_ANALYSIS_CACHE_MAXSIZE: int = Field(default=10000, env="QUERY_ANALYSIS_CACHE_MAXSIZE")
+    QUERY_ANALYSIS_CACHE_COORD_DECIMALS: int = Field(
+        default=2, env="QUERY_ANALYSIS_CACHE_COORD_DECIMALS")
 
     # ==================== 로깅 설정 ====================
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
     LOG_FILE: Optional[str] = Field(default="app.log", env="LOG_FILE")
+    LOG_FILE_LEVEL: str = Field(default="INFO", env="LOG_FILE_LEVEL")
 
     class Config:
         env_file = ".env"
@@ -98,6 +170,18 @@ class Settings(BaseSettings):
             )
         return v
 
+    @field_validator("EMBEDDING_DTYPE")
+    @classmethod
+    def validate_embedding_dtype(cls, v: str) -> str:
+        """임베딩 모델 정밀도 검증"""
+        valid_dtypes = ["float32", "float16", "bfloat16"]
+        if v not in valid_dtypes:
+            raise ValueError(
+                f"잘못된 EMBEDDING_DTYPE: {v}. "
+                f"허용된 값: {', '.join(valid_dtypes)}"
+            )
+        return v
+
     @field_validator("BATCH_SIZE")
     @classmethod
     def validate_batch_size(cls, v: int) -> int:
@@ -117,30 +201,44 @@ class Settings(BaseSettings):
         """프로덕션 환경 여부"""
         return not self.DEBUG
 
-    def get_openai_config(self) -> dict:
+    # Settings는 시작 후 바뀌지 않으므로 설정 묶음은 한 번만 만들고 읽기 전용 뷰로 공유
+    @cached_property
+    def openai_config(self) -> Mapping[str, Any]:
         """OpenAI 클라이언트 설정"""
-        return {
+        return MappingProxyType({
             "api_key": self.OPENAI_API_KEY,
             "model": self.OPENAI_MODEL,
             "temperature": self.OPENAI_TEMPERATURE
-        }
+        })
 
-    def get_kto_config(self) -> dict:
+    @cached_property
+    def kto_config(self) -> Mapping[str, Any]:
         """KTO API 설정"""
-        return {
+        return MappingProxyType({
             "service_key": self.KTO_SERVICE_KEY,
             "base_url": self.KTO_API_BASE_URL,
             "timeout": self.REQUEST_TIMEOUT,
             "max_retries": self.MAX_RETRIES
-        }
+        })
 
-    def get_vector_db_config(self) -> dict:
+    @cached_property
+    def vector_db_config(self) -> Mapping[str, Any]:
         """Vector DB 설정"""
-        return {
+        return MappingProxyType({
             "path": self.VECTOR_DB_PATH,
             "collection": self.VECTOR_DB_COLLECTION,
             "embedding_type": self.EMBEDDING_TYPE
-        }
+        })
+
+    # 기존 호출 호환
+    def get_openai_config(self) -> Mapping[str, Any]:
+        return self.openai_config
+
+    def get_kto_config(self) -> Mapping[str, Any]:
+        return self.kto_config
+
+    def get_vector_db_config(self) -> Mapping[str, Any]:
+        return self.vector_db_config
 
     def display_config(self):
         """현재 설정 출력 (개발용)"""
@@ -175,33 +273,50 @@ OPENAI_API_KEY = settings.OPENAI_API_KEY
 
 
 # ==================== 로깅 설정 ====================
+LOG_FORMATTER = logging.Formatter(
+    '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+
 def setup_logging():
-    """로깅 시스템 초기화"""
+    """
+    로깅 시스템 초기화
+    - 요청 처리 스레드는 QueueHandler로 큐에 넣기만 하고,
+      콘솔/파일 쓰기는 QueueListener 백그라운드 스레드가 처리
+    """
     # 기본 로거 설정
     logger = logging.getLogger()
     logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper()))
 
-    # 포맷터
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
-
     # 콘솔 핸들러
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    console_handler.setFormatter(LOG_FORMATTER)
+    handlers = [console_handler]
 
     # 파일 핸들러 (선택적)
+    file_error = None
     if settings.LOG_FILE:
         try:
             file_handler = logging.FileHandler(
                 settings.LOG_FILE, encoding='utf-8')
-            file_handler.setLevel(logging.DEBUG)
-            file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            file_handler.setLevel(
+                getattr(logging, settings.LOG_FILE_LEVEL.upper()))
+            file_handler.setFormatter(LOG_FORMATTER)
+            handlers.append(file_handler)
         except Exception as e:
-            logger.warning(f"파일 로깅 설정 실패: {e}")
+            file_error = e
+
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(QueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers,
+                             respect_handler_level=True)
+    listener.start()
+    # 종료 시 큐에 남은 로그까지 모두 기록
+    atexit.register(listener.stop)
+
+    if file_error is not None:
+        logger.warning(f"파일 로깅 설정 실패: {file_error}")
 
     return logger
 
@@ -216,6 +331,7 @@ if settings.DEBUG:
 
 
 # ==================== 유틸리티 함수 ====================
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """FastAPI 의존성 주입용 설정 반환"""
     return settings
@@ -278,9 +394,9 @@ if __name__ == "__main__":
         settings.display_config()
 
         # 설정 그룹 테스트
-        print(f"\n OpenAI 설정: {settings.get_openai_config()}")
-        print(f"KTO 설정: {settings.get_kto_config()}")
-        print(f"Vector DB 설정: {settings.get_vector_db_config()}")
+        print(f"\n OpenAI 설정: {dict(settings.openai_config)}")
+        print(f"KTO 설정: {dict(settings.kto_config)}")
+        print(f"Vector DB 설정: {dict(settings.vector_db_config)}")
 
         print("\n설정 로드 완료!")
 
@@ -0,0 +1,86 @@
+# app/core/embedding_cache.py
+"""
+디스크 임베딩 캐시 (SQLite)
+- 키: sha1(모델 식별자 + 텍스트) -> float32 벡터 bytes
+- 재적재/증분 적재/중복 설명 텍스트, 서버 재시작 후 반복 쿼리에서 임베딩 모델 호출 생략
+- 캐시는 최선 노력: SQLite 오류는 경고만 남기고 미스로 처리
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SQLite 바인딩 변수 개수 제한(구버전 999) 안에서 IN 조회
+SELECT_CHUNK_SIZE = 500
+
+
+class EmbeddingCache:
+    """텍스트 해시 -> 임베딩 SQLite 캐시 (스레드 안전)"""
+
+    def __init__(self, path: str, namespace: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # asyncio.to_thread 워커 여러 개에서 접근하므로 연결 하나를 락으로 보호
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache ("
+            "key BLOB PRIMARY KEY, dim INTEGER NOT NULL, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        # 모델(또는 실행 백엔드)이 바뀌면 다른 키가 되도록 식별자를 키에 포함
+        self._prefix = namespace.encode("utf-8") + b"\0"
+
+    def make_key(self, text: str) -> bytes:
+        return hashlib.sha1(self._prefix + text.encode("utf-8")).digest()
+
+    def get_many(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """캐시에 있는 텍스트만 {텍스트: 벡터}로 반환"""
+        keys = {self.make_key(text): text for text in texts}
+        found: Dict[str, np.ndarray] = {}
+        key_list = list(keys)
+        try:
+            with self._lock:
+                for start in range(0, len(key_list), SELECT_CHUNK_SIZE):
+                    chunk = key_list[start:start + SELECT_CHUNK_SIZE]
+                    rows = self._conn.execute(
+                        "SELECT key, dim, vec FROM embedding_cache WHERE key IN "
+                        f"({','.join('?' * len(chunk))})",
+                        chunk,
+                    ).fetchall()
+                    for key, dim, vec in rows:
+                        found[keys[key]] = np.frombuffer(vec, dtype=np.float32, count=dim)
+        except sqlite3.Error as e:
+            logger.warning(f"임베딩 캐시 조회 실패: {e}")
+        return found
+
+    def set_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        rows = [
+            (self.make_key(text), int(vec.shape[0]), np.asarray(vec, dtype=np.float32).tobytes())
+            for text, vec in items
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (key, dim, vec) VALUES (?, ?, ?)",
+                    rows,
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"임베딩 캐시 저장 실패: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
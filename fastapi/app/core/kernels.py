@@ -0,0 +1,146 @@
+# app/core/kernels.py
+"""
+검색 경로의 수치 커널
+- numba가 설치되어 있으면 JIT 컴파일된 루프, 없으면 NumPy 벡터 연산으로 같은 결과 계산
+- 입력은 후보별 값을 모은 평평한 배열 (후보 dict를 하나씩 도는 Python 루프 대신)
+- 단건 거리 계산(haversine_km_scalar)도 JIT 컴파일해 math 모듈 호출/인터프리터 오버헤드를 없앰
+"""
+
+import math
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    NUMBA_AVAILABLE = False
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def haversine_km(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """한 지점에서 여러 지점까지의 Haversine 거리(km)를 NumPy 벡터 연산으로 계산"""
+    lat1 = np.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlon = np.radians(lons) - np.radians(lon)
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def _haversine_scalar_py(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """두 지점 사이 Haversine 거리(km) 단건 계산"""
+    lat1_rad = math.radians(lat1)
+    lat2_rad = math.radians(lat2)
+    dlat = lat2_rad - lat1_rad
+    dlon = math.radians(lon2) - math.radians(lon1)
+
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2) ** 2
+    return EARTH_RADIUS_KM * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+
+
+def _hybrid_scores_py(
+    distance_km: np.ndarray,
+    vector_distance: np.ndarray,
+    preference_match: np.ndarray,
+    max_distance: float,
+    distance_weight: float,
+    similarity_weight: float,
+    preference_weight: float,
+) -> np.ndarray:
+    """
+    returns: (4, N) float64 = [hybrid, distance_score, similarity_score, preference_score]
+    """
+    n = distance_km.shape[0]
+    out = np.empty((4, n), np.float64)
+    scale = max_distance / 3.0
+    for i in range(n):
+        r = distance_km[i] / scale
+        d = 1.0 / (1.0 + r * r)
+        s = 1.0 / (1.0 + vector_distance[i] / 20.0)
+        p = 1.0 if preference_match[i] else 0.6
+        out[0, i] = d * distance_weight + s * similarity_weight + p * preference_weight
+        out[1, i] = d
+        out[2, i] = s
+        out[3, i] = p
+    return out
+
+
+def _hybrid_scores_np(
+    distance_km: np.ndarray,
+    vector_distance: np.ndarray,
+    preference_match: np.ndarray,
+    max_distance: float,
+    distance_weight: float,
+    similarity_weight: float,
+    preference_weight: float,
+) -> np.ndarray:
+    d = 1.0 / (1.0 + (distance_km / (max_distance / 3.0)) ** 2)
+    s = 1.0 / (1.0 + vector_distance / 20.0)
+    p = np.where(preference_match, 1.0, 0.6)
+    hybrid = d * distance_weight + s * similarity_weight + p * preference_weight
+    return np.stack([hybrid, d, s, p])
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    점수 상위 k개 인덱스 (내림차순, 동점이면 앞 인덱스 우선)
+    전체 정렬 대신 argpartition으로 k개만 고른 뒤 그 안에서만 정렬
+    """
+    n = scores.shape[0]
+    if k <= 0 or n == 0:
+        return np.empty(0, np.int64)
+    if k < n:
+        # k번째 점수보다 큰 것은 모두, 같은 점수는 앞 인덱스부터 (안정 정렬 후 slice와 같은 결과)
+        kth = np.partition(-scores, k - 1)[k - 1]
+        above = np.flatnonzero(-scores < kth)
+        ties = np.flatnonzero(-scores == kth)[:k - above.size]
+        top = np.concatenate([above, ties])
+    else:
+        top = np.arange(n)
+    return top[np.lexsort((top, -scores[top]))]
+
+
+if NUMBA_AVAILABLE:
+    _hybrid_scores_kernel = njit(cache=True)(_hybrid_scores_py)
+    _haversine_scalar = njit(cache=True)(_haversine_scalar_py)
+else:
+    _hybrid_scores_kernel = _hybrid_scores_np
+    _haversine_scalar = _haversine_scalar_py
+
+
+def haversine_km_scalar(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """두 지점 사이 Haversine 거리(km)"""
+    return _haversine_scalar(float(lat1), float(lon1), float(lat2), float(lon2))
+
+
+def hybrid_scores(
+    distance_km: np.ndarray,
+    vector_distance: np.ndarray,
+    preference_match: np.ndarray,
+    max_distance: float,
+    weights: Tuple[float, float, float],
+) -> np.ndarray:
+    """
+    거리/유사도/선호도 점수와 가중 합(하이브리드 점수)을 후보 전체에 대해 한 번에 계산
+    weights: (distance_weight, similarity_weight, preference_weight)
+    """
+    return _hybrid_scores_kernel(
+        np.ascontiguousarray(distance_km, dtype=np.float64),
+        np.ascontiguousarray(vector_distance, dtype=np.float64),
+        np.ascontiguousarray(preference_match, dtype=np.bool_),
+        float(max_distance),
+        float(weights[0]),
+        float(weights[1]),
+        float(weights[2]),
+    )
+
+
+if NUMBA_AVAILABLE:
+    # 첫 요청이 JIT 컴파일(또는 캐시 로드)을 기다리지 않도록 import 시점에 한 번 실행
+    hybrid_scores(np.zeros(1), np.zeros(1), np.zeros(1, np.bool_), 1.0, (0.4, 0.4, 0.2))
+    haversine_km_scalar(0.0, 0.0, 0.0, 0.0)
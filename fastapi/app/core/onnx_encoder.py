@@ -0,0 +1,115 @@
+# app/core/onnx_encoder.py
+"""
+SentenceTransformer 임베딩 모델의 INT8 ONNX Runtime 실행기
+- 최초 1회: Transformer 본체를 ONNX로 export -> 가중치 INT8 동적 양자화 -> 디스크에 저장
+- 이후: ONNX Runtime(CPU) 세션으로 추론 + NumPy mean pooling (SentenceTransformer와 같은 pooling)
+- onnx / onnxruntime 이 설치되지 않은 환경에서는 ONNX_AVAILABLE=False 이고 PyTorch 모델을 그대로 사용
+"""
+
+import inspect
+import os
+from typing import List
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    ONNX_AVAILABLE = True
+except ImportError:
+    ort = None
+    ONNX_AVAILABLE = False
+
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model.int8.onnx"
+
+
+class OnnxSentenceEncoder:
+    """SentenceTransformer.encode 호환 래퍼 (Transformer + mean pooling 구성 모델용)"""
+
+    def __init__(self, model, model_dir: str, num_threads: int = 0):
+        self.tokenizer = model.tokenizer
+        self.max_seq_length = model.max_seq_length
+        self.dimension = model.get_sentence_embedding_dimension()
+
+        int8_path = os.path.join(model_dir, INT8_MODEL_FILE)
+        if not os.path.exists(int8_path):
+            self._export(model, model_dir, int8_path)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # 0이면 onnxruntime 기본값(물리 코어 수)
+        options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            int8_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _export(self, model, model_dir: str, int8_path: str) -> None:
+        import torch
+
+        os.makedirs(model_dir, exist_ok=True)
+        fp32_path = os.path.join(model_dir, FP32_MODEL_FILE)
+
+        sample = self.tokenizer(["임베딩 모델 변환용 문장"], return_tensors="pt")
+        names = list(sample.keys())
+        auto_model = model[0].auto_model.eval()
+
+        class _LastHiddenState(torch.nn.Module):
+            # 토크나이저 출력 순서와 forward 인자 순서가 달라도 이름으로 전달
+            def __init__(self):
+                super().__init__()
+                self.model = auto_model
+
+            def forward(self, *inputs):
+                return self.model(**dict(zip(names, inputs))).last_hidden_state
+
+        dynamic_axes = {name: {0: "batch", 1: "seq"} for name in names}
+        dynamic_axes["last_hidden_state"] = {0: "batch", 1: "seq"}
+        # 최신 torch는 dynamo exporter(onnxscript 필요)가 기본이라 TorchScript exporter를 명시
+        export_kwargs = {}
+        if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs["dynamo"] = False
+        with torch.no_grad():
+            # 새 Module은 training 모드라 export 후 그 모드로 복원되며 원본 모델까지 dropout이 켜짐
+            torch.onnx.export(
+                _LastHiddenState().eval(),
+                tuple(sample[name] for name in names),
+                fp32_path,
+                input_names=names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=14,
+                **export_kwargs,
+            )
+
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        os.remove(fp32_path)
+
+    def encode(self, sentences: List[str], batch_size: int = 32, **kwargs) -> np.ndarray:
+        """(N, dim) float32 임베딩 반환 (항상 NumPy 배열, 입력 순서 유지)"""
+        # 길이순으로 정렬해 비슷한 길이끼리 배치 -> 패딩 토큰 계산 감소 (SentenceTransformer와 동일)
+        order = np.argsort([-len(sentence) for sentence in sentences], kind="stable")
+        sorted_sentences = [sentences[i] for i in order]
+
+        outputs = []
+        for start in range(0, len(sorted_sentences), batch_size):
+            encoded = self.tokenizer(
+                sorted_sentences[start:start + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np",
+            )
+            feeds = {k: v.astype(np.int64) for k, v in encoded.items() if k in self.input_names}
+            hidden = self.session.run(None, feeds)[0]
+
+            # mean pooling: 패딩 토큰을 제외한 토큰 임베딩 평균
+            mask = encoded["attention_mask"][..., None].astype(np.float32)
+            summed = (hidden * mask).sum(axis=1)
+            outputs.append(summed / np.clip(mask.sum(axis=1), 1e-9, None))
+
+        if not outputs:
+            return np.empty((0, self.dimension), np.float32)
+        embeddings = np.empty((len(sentences), self.dimension), np.float32)
+        embeddings[order] = np.concatenate(outputs)
+        return embeddings
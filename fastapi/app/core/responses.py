@@ -0,0 +1,90 @@
+# app/core/responses.py
+"""
+JSON 직렬화/파싱 헬퍼
+- orjson이 설치되어 있으면 사용 (stdlib json 대비 빠르고, 한글을 이스케이프하지 않음)
+- 없으면 stdlib json으로 동작
+"""
+
+import dataclasses
+from typing import Any, List
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+
+    def json_dumps(obj: Any) -> bytes:
+        # numpy 배열/스칼라(하이브리드 검색 점수 등)와 dataclass(검색 결과 항목)도 그대로 직렬화
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    # orjson.JSONDecodeError는 json.JSONDecodeError의 하위 클래스라 기존 예외 처리 그대로 동작
+    json_loads = orjson.loads
+except ImportError:
+    import json
+
+    def _default(obj: Any) -> Any:
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return dataclasses.asdict(obj)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"),
+                          default=_default).encode("utf-8")
+
+    json_loads = json.loads
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson 기반 JSONResponse (FastAPI의 ORJSONResponse는 deprecated라 직접 정의)"""
+
+    def render(self, content: Any) -> bytes:
+        return json_dumps(content)
+
+
+class JSONObjectStreamParser:
+    """
+    스트리밍으로 들어오는 JSON 텍스트에서 지정 깊이의 객체가 닫히는 즉시 파싱
+    예: item_depth=3 -> {"recommendations": [{...}, {...}]} 의 각 항목
+    (깊이는 { 와 [ 를 모두 셈, 문자열 안의 괄호/이스케이프는 무시)
+    """
+
+    def __init__(self, item_depth: int = 3):
+        self.item_depth = item_depth
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._item: List[str] = []
+        self._capturing = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """chunk까지 받은 시점에 새로 완성된 객체 목록"""
+        items = []
+        for ch in chunk:
+            if self._capturing:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "{" and self._depth == self.item_depth and not self._capturing:
+                    self._capturing = True
+                    self._item = [ch]
+            elif ch in "}]":
+                if self._capturing and self._depth == self.item_depth:
+                    self._capturing = False
+                    try:
+                        items.append(json_loads("".join(self._item)))
+                    except ValueError:
+                        pass
+                self._depth -= 1
+        return items
@@ -1,10 +1,24 @@
+import logging
 import os
+import threading
 import chromadb
+import numpy as np
 from chromadb.config import Settings as ChromaSettings
-from typing import Optional
+from typing import Dict, Optional
 from sentence_transformers import SentenceTransformer
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.embedding_cache import EmbeddingCache
+from app.core.onnx_encoder import ONNX_AVAILABLE, OnnxSentenceEncoder
+
+logger = logging.getLogger(__name__)
+
+# Chroma 컬렉션은 항상 HNSW 인덱스를 사용 (파라미터는 metadata의 hnsw:* 키)
+INDEX_TYPE = "hnsw"
+HNSW_METADATA_PREFIX = "hnsw:"
+
+KOREAN_MODEL_NAME = "jhgan/ko-sroberta-multitask"
 
 
 class VectorDBManager:
@@ -13,6 +27,19 @@ class VectorDBManager:
     _instance: Optional['VectorDBManager'] = None
     _client: Optional[chromadb.PersistentClient] = None
     _model: Optional[SentenceTransformer] = None
+    _disk_cache: Optional[EmbeddingCache] = None
+    # 모델 + 실행 백엔드/정밀도 식별자 (디스크 캐시 네임스페이스, 적재 메타데이터에 사용)
+    _embedding_model_id: Optional[str] = None
+    # 여러 스레드(to_thread 워커 등)가 동시에 초기화에 들어와도 모델은 한 번만 로드
+    _init_lock = threading.Lock()
+    # 컬렉션 이름 -> 컬렉션 객체 (서비스/스크립트가 같은 핸들을 공유, 매번 Chroma 조회하지 않음)
+    _collections: Dict[str, chromadb.Collection] = {}
+    _collections_lock = threading.Lock()
+    # 텍스트 -> float32 임베딩 (모델이 고정이라 같은 텍스트는 같은 벡터)
+    _embedding_cache = TTLCache(
+        maxsize=settings.EMBEDDING_CACHE_MAXSIZE,
+        ttl_sec=settings.EMBEDDING_CACHE_TTL_SEC
+    )
 
     def __new__(cls):
         if cls._instance is None:
@@ -24,7 +51,15 @@ class VectorDBManager:
             self._initialize()
 
     def _initialize(self):
-        """DB 클라이언트와 임베딩 모델 초기화"""
+        """DB 클라이언트와 임베딩 모델 초기화 (이미 로드된 것은 건너뜀)"""
+        with self._init_lock:
+            if self._client is None:
+                self._initialize_client()
+            if self._model is None and settings.EMBEDDING_TYPE == "korean":
+                self._initialize_model()
+
+    def _initialize_client(self):
+        """ChromaDB 클라이언트 초기화"""
         print("Vector DB 초기화 중...")
 
         # 디렉토리 생성
@@ -40,14 +75,76 @@ class VectorDBManager:
             )
         )
 
-        # 임베딩 모델 초기화 (한 번만 로딩)
-        if settings.EMBEDDING_TYPE == "korean":
-            print("한국어 임베딩 모델 로딩 중...")
-            self._model = SentenceTransformer('jhgan/ko-sroberta-multitask')
-            print("한국어 모델 로딩 완료")
-
         print("Vector DB 초기화 완료")
 
+    def _initialize_model(self):
+        """한국어 임베딩 모델 로딩 (프로세스당 한 번)"""
+        print("한국어 임베딩 모델 로딩 중...")
+        if settings.EMBEDDING_NUM_THREADS > 0:
+            import torch
+            torch.set_num_threads(settings.EMBEDDING_NUM_THREADS)
+        model = SentenceTransformer(KOREAN_MODEL_NAME)
+        print("한국어 모델 로딩 완료")
+
+        if settings.EMBEDDING_ONNX_INT8:
+            model = self._load_onnx_encoder(model)
+
+        if isinstance(model, OnnxSentenceEncoder):
+            backend = "onnx-int8"
+        else:
+            model, dtype = self._apply_dtype(model, settings.EMBEDDING_DTYPE)
+            backend = "torch" if dtype == "float32" else f"torch-{dtype}"
+
+        self._embedding_model_id = f"{KOREAN_MODEL_NAME}:{backend}"
+        if settings.EMBEDDING_DISK_CACHE_PATH:
+            # 실행 백엔드/정밀도에 따라 벡터가 조금 달라지므로 캐시 네임스페이스를 분리
+            self._disk_cache = EmbeddingCache(
+                settings.EMBEDDING_DISK_CACHE_PATH, self._embedding_model_id)
+
+        # 로딩이 끝난 뒤에 할당 (다른 스레드가 반쯤 초기화된 모델을 보지 않도록)
+        self._model = model
+
+    @staticmethod
+    def _load_onnx_encoder(model: SentenceTransformer):
+        """INT8 ONNX 실행기로 교체 (실패 시 PyTorch 모델 유지)"""
+        if not ONNX_AVAILABLE:
+            print("⚠️ onnxruntime 미설치 - PyTorch 임베딩 모델 사용")
+            return model
+        try:
+            encoder = OnnxSentenceEncoder(
+                model, settings.EMBEDDING_ONNX_DIR, num_threads=settings.EMBEDDING_NUM_THREADS)
+        except Exception as e:
+            print(f"⚠️ ONNX 변환/로딩 실패 - PyTorch 임베딩 모델 사용: {e}")
+            return model
+        print("INT8 ONNX 임베딩 모델 사용")
+        return encoder
+
+    @staticmethod
+    def _apply_dtype(model: SentenceTransformer, dtype: str):
+        """
+        반정밀도(FP16/BF16)로 변환 -> (모델, 실제 적용된 dtype)
+        FP16은 CUDA에서만 사용 (CPU FP16 GEMM은 FP32보다 느림)
+        """
+        if dtype == "float32":
+            return model, dtype
+
+        import torch
+
+        if dtype == "float16" and not torch.cuda.is_available():
+            print("⚠️ CUDA 미사용 - FP32 임베딩 모델 사용")
+            return model, "float32"
+
+        class _Float32Output(torch.nn.Module):
+            # sentence-transformers는 BF16 텐서를 NumPy로 바꾸지 못하므로 pooling 결과만 FP32로 변환
+            def forward(self, features):
+                features["sentence_embedding"] = features["sentence_embedding"].float()
+                return features
+
+        model = model.to(getattr(torch, dtype))
+        model.append(_Float32Output())
+        print(f"{dtype} 임베딩 모델 사용")
+        return model, dtype
+
     @property
     def client(self) -> chromadb.PersistentClient:
         """클라이언트 인스턴스 반환"""
@@ -55,42 +152,121 @@ class VectorDBManager:
             self._initialize()
         return self._client
 
+    @property
+    def embedding_model_id(self) -> str:
+        """저장된 벡터를 만든 모델 식별자 (한국어 모델이 아니면 EMBEDDING_TYPE)"""
+        return self._embedding_model_id or settings.EMBEDDING_TYPE
+
     @property
     def model(self) -> Optional[SentenceTransformer]:
         """임베딩 모델 반환"""
         return self._model
 
     def get_collection(self, name: Optional[str] = None):
-        """컬렉션 가져오기 또는 생성"""
+        """컬렉션 가져오기 또는 생성 (생성 시 HNSW 인덱스 파라미터 지정, 프로세스 내 캐시)"""
         collection_name = name or settings.VECTOR_DB_COLLECTION
+        collection = self._collections.get(collection_name)
+        if collection is not None:
+            return collection
+
+        with self._collections_lock:
+            collection = self._collections.get(collection_name)
+            if collection is None:
+                collection = self._open_collection(collection_name)
+                self._collections[collection_name] = collection
+        return collection
+
+    def _open_collection(self, collection_name: str):
+        # 한국어 모델은 항상 임베딩을 직접 넘기므로 Chroma 기본 임베딩 함수를 만들지 않음
+        # (그 외 타입은 query_texts / 임베딩 없는 upsert에 기본 임베딩 함수 사용)
+        ef_kwargs = {"embedding_function": None} if settings.EMBEDDING_TYPE == "korean" else {}
+        try:
+            # 기존 컬렉션은 metadata를 덮어쓰지 않음 (HNSW 파라미터는 생성 후 변경 불가)
+            return self.client.get_collection(name=collection_name, **ef_kwargs)
+        except Exception:
+            pass
         return self.client.get_or_create_collection(
             name=collection_name,
+            **ef_kwargs,
             metadata={
                 "source": "KTO_API",
                 "embedding_type": settings.EMBEDDING_TYPE,
-                "version": "1.0"
+                "version": "1.0",
+                "hnsw:M": settings.VECTOR_DB_HNSW_M,
+                "hnsw:construction_ef": settings.VECTOR_DB_HNSW_CONSTRUCTION_EF,
+                "hnsw:search_ef": settings.VECTOR_DB_HNSW_SEARCH_EF,
             }
         )
 
+    @staticmethod
+    def describe_index(collection) -> dict:
+        """컬렉션의 ANN 인덱스 종류/벡터 수/파라미터"""
+        metadata = collection.metadata or {}
+        return {
+            "index_type": INDEX_TYPE,
+            "num_vectors": collection.count(),
+            "index_params": {
+                key[len(HNSW_METADATA_PREFIX):]: value
+                for key, value in metadata.items()
+                if key.startswith(HNSW_METADATA_PREFIX)
+            },
+        }
+
     def reset_collection(self, name: Optional[str] = None) -> bool:
         """컬렉션 초기화"""
         collection_name = name or settings.VECTOR_DB_COLLECTION
         try:
             self.client.delete_collection(name=collection_name)
+            # 삭제된 컬렉션 핸들은 더 이상 쓸 수 없으므로 캐시에서도 제거
+            with self._collections_lock:
+                self._collections.pop(collection_name, None)
             return True
         except Exception as e:
             print(f"컬렉션 삭제 실패: {e}")
             return False
 
+    def warmup(self) -> None:
+        """
+        캐시를 거치지 않고 한 번 encode (첫 요청이 지연 초기화 비용을 치르지 않도록)
+        앱 시작(lifespan)에서 워커 스레드로 호출
+        """
+        if settings.EMBEDDING_TYPE == "korean" and self._model:
+            self._model.encode(
+                ["워밍업 문장"], batch_size=1, convert_to_numpy=True, show_progress_bar=False)
+
     def generate_embedding(self, text: str) -> list:
-        """텍스트 임베딩 생성"""
+        """텍스트 임베딩 생성 (캐시 적중 시 모델 호출 생략)"""
         if settings.EMBEDDING_TYPE == "korean" and self._model:
-            return self._model.encode([text])[0].tolist()
+            return self.generate_embeddings([text])[0]
         elif settings.EMBEDDING_TYPE == "openai":
             # OpenAI 임베딩 로직 추가 가능
             pass
         return []
 
+    def generate_embeddings(self, texts: list, batch_size: int = 32) -> list:
+        """여러 텍스트 임베딩을 한 번의 encode 호출로 생성 (입력 순서 유지, 캐시 미스만 계산)"""
+        if not (settings.EMBEDDING_TYPE == "korean" and self._model):
+            return [self.generate_embedding(text) for text in texts]
+
+        vectors = {text: self._embedding_cache.get(text) for text in texts}
+        misses = [text for text, vec in vectors.items() if vec is None]
+
+        if misses and self._disk_cache is not None:
+            for text, vec in self._disk_cache.get_many(misses).items():
+                self._embedding_cache.set(text, vec)
+                vectors[text] = vec
+            misses = [text for text in misses if vectors[text] is None]
+
+        if misses:
+            encoded = self._model.encode(
+                misses, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False).astype(np.float32)
+            for text, vec in zip(misses, encoded):
+                self._embedding_cache.set(text, vec)
+                vectors[text] = vec
+            if self._disk_cache is not None:
+                self._disk_cache.set_many(zip(misses, encoded))
+        return [vectors[text].tolist() for text in texts]
+
 
 # 전역 싱글톤 인스턴스
 vector_db = VectorDBManager()
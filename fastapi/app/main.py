@@ -1,12 +1,48 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from starlette.middleware.gzip import GZipMiddleware
 from app.api import travel
+from app.services.recommendation import recommendation_service
+from app.core.clients import aclose_clients
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+
+# uvloop이 있으면 기본 asyncio 루프 대신 사용 (없는 개발 환경에서는 기본 루프)
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 시작 시 검색 쿼리 임베딩 배처 기동
+    await recommendation_service.astart()
+    yield
+    # 종료 시 임베딩 배처 / 공유 OpenAI 클라이언트(커넥션 풀) 정리
+    await recommendation_service.aclose()
+    await aclose_clients()
+
 
 # FastAPI 앱 인스턴스 생성
 app = FastAPI(
     title="Travel Recommender API",
     description="사용자 위치와 선호도 기반 여행지 추천 API",
-    version="1.0.0"
+    version="1.0.0",
+    # 라우터에 지정하지 않은 엔드포인트도 orjson으로 직렬화
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan
+)
+
+# 검색/추천 결과(한국어 JSON)는 수십~수백 KB라 압축 효과가 큼 (Accept-Encoding: gzip 요청만)
+app.add_middleware(
+    GZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_COMPRESS_LEVEL
 )
 
 # travel.py에서 정의한 라우터를 메인 앱에 포함
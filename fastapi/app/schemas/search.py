@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field, field_validator
+from dataclasses import dataclass
+from pydantic import BaseModel, Field, field_validator, model_validator
 from typing import List, Optional, Dict, Any
 from enum import Enum
 
@@ -105,6 +106,14 @@ class LocationBasedRequest(BaseModel):
 
         return v
 
+    @model_validator(mode="after")
+    def validate_weights(self):
+        """가중치 합계 검증 (핸들러 진입 전에 잘못된 요청 거절)"""
+        total_weight = self.distance_weight + self.similarity_weight + self.preference_weight
+        if abs(total_weight - 1.0) > 0.01:
+            raise ValueError(f"가중치 합계는 1.0이어야 합니다. 현재: {total_weight:.3f}")
+        return self
+
     def copy(self, update: Optional[Dict[str, Any]] = None):
         """Pydantic v2 호환 copy 메서드"""
         data = self.model_dump()
@@ -113,8 +122,13 @@ class LocationBasedRequest(BaseModel):
         return LocationBasedRequest(**data)
 
 
-class HybridSearchResult(BaseModel):
-    """하이브리드 검색 결과 항목"""
+@dataclass(slots=True, kw_only=True)
+class HybridSearchResult:
+    """
+    하이브리드 검색 결과 항목
+    서비스 내부에서 신뢰할 수 있는 값으로만 생성하므로 Pydantic 검증 없이 dataclass로 정의
+    (응답 직렬화는 orjson이 dataclass를 직접 처리)
+    """
     id: str
     title: str
     address: Optional[str] = None
@@ -160,3 +174,31 @@ class StatsResponse(BaseModel):
     total_items: int
     dimension: int
     collections: List[str]
+    index_type: Optional[str] = None
+    num_vectors: Optional[int] = None
+    index_params: Optional[Dict[str, Any]] = None
+    response_cache: Optional[Dict[str, int]] = None
+
+
+# 배치 API: 여러 하위 요청을 한 번의 왕복으로 처리
+
+
+class BatchSubRequest(BaseModel):
+    id: str
+    method: str = "GET"
+    url: str = Field(..., description="라우터 기준 경로 + 쿼리스트링", example="/similar?query=경복궁&limit=5")
+    body: Optional[Dict[str, Any]] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=20)
+
+
+class BatchSubResponse(BaseModel):
+    id: str
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
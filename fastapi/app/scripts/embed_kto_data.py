@@ -22,11 +22,10 @@ def main():
     print("=" * 60)
 
     try:
-        # 서비스 초기화
-        ingestion_service = KTOIngestionService()
-
-        # 전체 임베딩 실행
-        ingestion_service.run_full_ingestion()
+        # 서비스 초기화 (종료 시 HTTP 세션 정리)
+        with KTOIngestionService() as ingestion_service:
+            # 전체 임베딩 실행
+            ingestion_service.run_full_ingestion()
 
         print("\n모든 작업이 성공적으로 완료되었습니다!")
         print(f"데이터가 {settings.VECTOR_DB_PATH}에 저장되었습니다.")
@@ -0,0 +1,183 @@
+# app/services/geo_index.py
+"""
+관광지 좌표 인메모리 공간 인덱스
+- 컬렉션 전체 좌표를 한 번만 읽어 위도 기준으로 정렬한 배열(SoA: id / lat / lon)로 보관
+- 반경 검색: 위도 구간을 이분 탐색으로 잘라내고 경도 범위로 한 번 더 거른 뒤 그 안에서만 Haversine 계산
+- 요청마다 Chroma에서 메타데이터를 읽고 문자열 좌표를 파싱하지 않음
+- 적재는 별도 프로세스(embed_kto_data)에서 일어나므로 주기적으로 컬렉션 개수와 좌표 버전 파일을 확인해 재구성
+  (같은 id의 좌표만 고쳐 upsert하면 개수는 그대로라 적재 측이 버전 파일을 갱신)
+- 좌표는 적재 시 검증/변환한 float 메타데이터(mapy_f / mapx_f)를 그대로 사용
+"""
+
+import logging
+import math
+import os
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.kernels import EARTH_RADIUS_KM, haversine_km
+
+logger = logging.getLogger(__name__)
+
+# 적재 시 함께 저장하는 숫자 좌표 메타데이터 키
+LAT_KEY = "mapy_f"
+LON_KEY = "mapx_f"
+
+
+def geo_version_path(db_path: str, collection_name: str) -> str:
+    """컬렉션 좌표 버전 파일 경로 (Vector DB 디렉터리 안, 적재/검색 프로세스가 공유)"""
+    return os.path.join(db_path, f"{collection_name}.geo_version")
+
+
+def mark_coordinates_changed(path: str) -> None:
+    """적재 측: 좌표가 바뀌었을 수 있음을 기록 (내용 = 새 버전)"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(str(time.time_ns()))
+
+
+def read_coordinates_version(path: Optional[str]) -> str:
+    """검색 측: 현재 좌표 버전 (파일이 없으면 빈 문자열)"""
+    if not path:
+        return ""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return ""
+
+
+def parse_coordinate(value, limit: float) -> Optional[float]:
+    """KTO 좌표 문자열 -> float (숫자가 아니거나 범위(±limit)를 벗어나면 None)"""
+    if value is None or value == "":
+        return None
+    try:
+        coord = float(value)
+    except (ValueError, TypeError):
+        return None
+    if not math.isfinite(coord) or abs(coord) > limit:
+        return None
+    return coord
+
+
+class GeoIndex:
+    """위도 정렬 배열 기반 반경 검색 인덱스 (스레드 안전, 최초 검색 시 구성)"""
+
+    def __init__(self, collection, refresh_sec: float = 60.0, version_path: Optional[str] = None):
+        self.collection = collection
+        self.refresh_sec = refresh_sec
+        self.version_path = version_path
+        self._lock = threading.Lock()
+        # (ids, lats, lons, rows) 튜플을 통째로 교체해 재구성 중에도 읽기가 일관됨
+        # rows: 컬렉션 조회 순서 (동일 거리일 때 기존 정렬 순서 유지용)
+        self._data: Tuple[List[str], np.ndarray, np.ndarray, np.ndarray] = (
+            [], np.empty(0), np.empty(0), np.empty(0, np.int64))
+        self._count = -1
+        self._version: Optional[str] = None
+        self._checked_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._data[0])
+
+    def invalidate(self) -> None:
+        """다음 검색 시 다시 구성"""
+        self._count = -1
+
+    def _build(self) -> None:
+        all_results = self.collection.get(include=['metadatas'])
+        ids, lats, lons = [], [], []
+
+        for item_id, metadata in zip(all_results.get('ids') or [], all_results.get('metadatas') or []):
+            place_lat = metadata.get(LAT_KEY)
+            place_lon = metadata.get(LON_KEY)
+
+            if place_lat is None or place_lon is None:
+                # 숫자 좌표 키가 생기기 전에 적재된 항목은 문자열 좌표를 파싱
+                place_lat = parse_coordinate(metadata.get('mapy'), 90.0)
+                place_lon = parse_coordinate(metadata.get('mapx'), 180.0)
+                if place_lat is None or place_lon is None:
+                    continue
+
+            ids.append(item_id)
+            lats.append(place_lat)
+            lons.append(place_lon)
+
+        lat_arr = np.asarray(lats, dtype=np.float64)
+        order = np.argsort(lat_arr, kind="stable")
+        self._data = (
+            [ids[i] for i in order.tolist()],
+            lat_arr[order],
+            np.asarray(lons, dtype=np.float64)[order],
+            order,
+        )
+        logger.info(f"🗺️ 위치 인덱스 구성: {len(ids)}개 좌표")
+
+    def _ensure_fresh(self) -> None:
+        if self._count >= 0 and time.monotonic() - self._checked_at < self.refresh_sec:
+            return
+        with self._lock:
+            # 락을 기다리는 동안 다른 스레드가 갱신했으면 그대로 사용
+            if self._count >= 0 and time.monotonic() - self._checked_at < self.refresh_sec:
+                return
+            count = self.collection.count()
+            version = read_coordinates_version(self.version_path)
+            if count != self._count or version != self._version:
+                self._build()
+                self._count = count
+                self._version = version
+            self._checked_at = time.monotonic()
+
+    def query_radius(
+        self,
+        lat: float,
+        lon: float,
+        max_distance_km: float
+    ) -> List[Tuple[str, float, float, float]]:
+        """반경 내 (id, lat, lon, distance_km) 목록 (컬렉션 조회 순서)"""
+        self._ensure_fresh()
+        ids, lats, lons, rows = self._data
+
+        # 두 지점의 Haversine 거리는 위도 차이만큼의 자오선 거리보다 항상 크거나 같음
+        dlat = np.degrees(max_distance_km / EARTH_RADIUS_KM)
+        lo = int(np.searchsorted(lats, lat - dlat, side="left"))
+        hi = int(np.searchsorted(lats, lat + dlat, side="right"))
+        if lo >= hi:
+            return []
+
+        # 경도 구간(bounding box)으로 한 번 더 걸러서 Haversine은 박스 안 좌표만 계산
+        band = np.arange(lo, hi)
+        dlon = self._max_lon_delta(lat, lon, max_distance_km)
+        if dlon is not None:
+            band = band[np.abs(lons[lo:hi] - lon) <= dlon]
+            if band.size == 0:
+                return []
+
+        distances = haversine_km(lat, lon, lats[band], lons[band])
+        inside = distances <= max_distance_km
+        hits, distances = band[inside], distances[inside]
+        order = np.argsort(rows[hits], kind="stable")
+
+        return [
+            (ids[i], float(lats[i]), float(lons[i]), float(d))
+            for i, d in zip(hits[order].tolist(), distances[order].tolist())
+        ]
+
+    @staticmethod
+    def _max_lon_delta(lat: float, lon: float, max_distance_km: float):
+        """
+        반경 안의 점이 가질 수 있는 최대 경도 차이(도) = asin(sin(r/R) / cos(lat))
+        극지방/너무 큰 반경이거나 날짜 변경선(±180°)을 넘으면 None (경도 필터 생략)
+        """
+        ratio = np.sin(max_distance_km / EARTH_RADIUS_KM) / np.cos(np.radians(lat))
+        if not 0.0 <= ratio < 1.0:
+            return None
+        # 경계 좌표가 부동소수점 오차로 빠지지 않도록 약간 여유를 둠
+        dlon = float(np.degrees(np.arcsin(ratio))) + 1e-9
+        if lon - dlon < -180.0 or lon + dlon > 180.0:
+            return None
+        return dlon
@@ -3,31 +3,47 @@
 RAG 데이터 부족 시 AI 쿼리 재해석 및 OpenAI 지식 기반 추천 자동 실행
 """
 
-import math
-import json
-from typing import List, Dict, Optional, Tuple
+import asyncio
+import heapq
+from typing import List, Dict, Optional
 import logging
-from functools import lru_cache
-from openai import OpenAI
+import numpy as np
 
 from app.core.config import settings
+from app.core.clients import async_openai_client
+from app.core.responses import JSONObjectStreamParser, json_loads
+from app.core.kernels import (
+    haversine_km_scalar, hybrid_scores, top_k_indices)
 from app.core.vector_db import vector_db
 from app.schemas.search import LocationBasedRequest, HybridSearchResult, TravelPreference
+from app.services.geo_index import GeoIndex, geo_version_path
+from app.services.openai_result_cache import OpenAIResultCache
 from app.services.query_analyzer import query_analyzer
 
 logger = logging.getLogger(__name__)
 
+# 위치 후보 id를 Chroma where 필터로 넘기는 최대 개수 (SQLite 바인딩 변수 제한 고려)
+# 후보가 이보다 많으면 상위 VECTOR_QUERY_MAX_RESULTS개를 받아 후보와 교집합
+CHROMA_WHERE_IDS_MAX = 500
+VECTOR_QUERY_MAX_RESULTS = 100
+
 
 class HybridSearchService:
     """위치 + 선호도 통합 검색 서비스 (3단계 스마트 Fallback)"""
 
     def __init__(self):
         self.collection = vector_db.get_collection()
+        # 위치 후보 추출용 좌표 인덱스 (최초 검색 시 구성, 컬렉션 변경 시 재구성)
+        self.geo_index = GeoIndex(
+            self.collection,
+            settings.GEO_INDEX_REFRESH_SEC,
+            version_path=geo_version_path(settings.VECTOR_DB_PATH, settings.VECTOR_DB_COLLECTION),
+        )
 
         # OpenAI 클라이언트 초기화
         try:
             if settings.OPENAI_API_KEY:
-                self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+                self.openai_client = async_openai_client
                 self.openai_available = True
             else:
                 self.openai_client = None
@@ -38,6 +54,17 @@ class HybridSearchService:
             self.openai_client = None
             self.openai_available = False
 
+        # 3단계 OpenAI 추천 캐시 (임베딩 모델이 있으면 의미 일치까지)
+        embed_fn = (vector_db.generate_embedding
+                    if settings.EMBEDDING_TYPE == "korean" and vector_db.model else None)
+        self.openai_result_cache = OpenAIResultCache(
+            settings.OPENAI_RESULT_CACHE_PATH,
+            ttl_sec=settings.OPENAI_RESULT_CACHE_TTL_SEC,
+            similarity_threshold=settings.RAG_CACHE_SIMILARITY_THRESHOLD,
+            coord_decimals=settings.OPENAI_RESULT_CACHE_COORD_DECIMALS,
+            embed_fn=embed_fn,
+        )
+
         # 선호도 → 검색 키워드 매핑
         self.preference_keywords = {
             TravelPreference.NATURE: "자연 산 바다 공원 숲 계곡 해변 힐링",
@@ -58,7 +85,7 @@ class HybridSearchService:
             TravelPreference.RELAXATION: ["32", "12"]
         }
 
-    def search(self, request: LocationBasedRequest) -> List[HybridSearchResult]:
+    async def search(self, request: LocationBasedRequest) -> List[HybridSearchResult]:
         """
         3단계 스마트 Fallback 검색 실행
 
@@ -73,25 +100,25 @@ class HybridSearchService:
         logger.info(f"  - 선호도: {request.travel_preference}")
 
         # ===== 1단계: 기존 RAG 검색 =====
-        base_results = self._search_with_current_params(request)
+        base_results = await self._search_with_current_params(request)
 
         if len(base_results) >= max(3, request.n_results * 0.5):
             logger.info(f"✅ 1단계(기본 RAG) 성공: {len(base_results)}개 결과")
-            return base_results[:request.n_results]
+            return base_results
 
         logger.warning(f"⚠️ 1단계 결과 부족 ({len(base_results)}개) → AI 쿼리 재해석 시도")
 
         # ===== 2단계: AI 쿼리 재해석 + RAG 재검색 =====
         ai_rag_results = []
         if request.query and self.openai_available:
-            ai_rag_results = self._search_with_ai_reinterpretation(request)
+            ai_rag_results = await self._search_with_ai_reinterpretation(request)
 
-        combined_results = self._merge_unique_results(
-            base_results, ai_rag_results)
+        combined_results = self._merge_top_by_id(
+            base_results, ai_rag_results, k=request.n_results)
 
         if len(combined_results) >= max(2, request.n_results * 0.3):
             logger.info(f"✅ 2단계(AI 재해석) 성공: {len(combined_results)}개 결과")
-            return combined_results[:request.n_results]
+            return combined_results
 
         logger.warning(
             f"⚠️ 2단계도 부족 ({len(combined_results)}개) → OpenAI 순수 생성 시도")
@@ -99,29 +126,22 @@ class HybridSearchService:
         # ===== 3단계: 순수 OpenAI 생성 =====
         ai_only_results = []
         if self.openai_available:
-            ai_only_results = self._generate_with_openai_knowledge(request)
+            ai_only_results = await self._generate_with_openai_knowledge(request)
 
-        final_results = self._merge_unique_results(
-            combined_results, ai_only_results)
+        final_results = self._merge_top_by_id(
+            combined_results, ai_only_results, k=request.n_results)
 
         logger.info(
             f"✅ 최종 결과: {len(final_results)}개 "
             f"(RAG: {len(combined_results)}, AI생성: {len(ai_only_results)})"
         )
-        return final_results[:request.n_results]
-
-    def _search_with_current_params(self, request: LocationBasedRequest) -> List[HybridSearchResult]:
-        """1단계: 현재 파라미터로 RAG 검색"""
-        candidates = self.get_location_candidates(
-            request.latitude,
-            request.longitude,
-            request.max_distance_km
-        )
-
-        if not candidates:
-            logger.warning("📍 반경 내 후보 없음")
-            return []
+        return final_results
 
+    async def _search_with_current_params(self, request: LocationBasedRequest) -> List[HybridSearchResult]:
+        """
+        1단계: 현재 파라미터로 RAG 검색
+        위치 후보(인메모리 인덱스)를 먼저 구한 뒤 Vector 검색 범위를 그 후보로 제한
+        """
         enhanced_query = self.build_enhanced_query(
             request.query,
             request.travel_preference
@@ -133,35 +153,48 @@ class HybridSearchService:
                 request.travel_preference, []
             )
 
-        vector_results = self.vector_search_in_candidates(
+        # 동기 Chroma/임베딩 호출이라 워커 스레드에서 실행
+        candidates = await asyncio.to_thread(
+            self.get_location_candidates,
+            request.latitude,
+            request.longitude,
+            request.max_distance_km
+        )
+
+        if not candidates:
+            logger.warning("📍 반경 내 후보 없음")
+            return []
+
+        vector_results = await asyncio.to_thread(
+            self.vector_search_in_candidates,
             enhanced_query,
             candidates,
             request.n_results * 2,
             content_types
         )
 
+        # 후보 전체의 점수를 배열 커널 한 번으로 계산 (후보별 Python 루프 대신)
+        check_preference = bool(request.travel_preference and content_types)
+        scores = hybrid_scores(
+            np.fromiter((r['distance_km'] for r in vector_results),
+                        np.float64, len(vector_results)),
+            np.fromiter((r.get('vector_distance', 0.0) for r in vector_results),
+                        np.float64, len(vector_results)),
+            np.fromiter((check_preference and r['metadata'].get('contenttypeid') in content_types
+                         for r in vector_results), np.bool_, len(vector_results)),
+            request.max_distance_km,
+            (request.distance_weight, request.similarity_weight, request.preference_weight)
+        )
+        # 상위 n_results개만 골라 결과 객체 생성 (점수 내림차순)
+        top = top_k_indices(scores[0], request.n_results).tolist()
+        scores = scores.tolist()
+
         final_results = []
 
-        for result in vector_results:
+        for i in top:
+            result = vector_results[i]
             metadata = result['metadata']
 
-            preference_match = False
-            if request.travel_preference and content_types:
-                content_type = metadata.get('contenttypeid')
-                preference_match = content_type in content_types
-
-            hybrid_score, score_breakdown = self.calculate_hybrid_score(
-                result['distance_km'],
-                result.get('vector_distance', 0.0),
-                preference_match,
-                request.max_distance_km,
-                {
-                    'distance_weight': request.distance_weight,
-                    'similarity_weight': request.similarity_weight,
-                    'preference_weight': request.preference_weight
-                }
-            )
-
             search_result = HybridSearchResult(
                 id=str(result['id']),
                 title=metadata.get('title', 'N/A'),
@@ -172,10 +205,10 @@ class HybridSearchService:
                 latitude=result['latitude'],
                 longitude=result['longitude'],
                 distance_km=result['distance_km'],
-                hybrid_score=round(hybrid_score, 3),
-                distance_score=score_breakdown['distance_score'],
-                similarity_score=score_breakdown['similarity_score'],
-                preference_score=score_breakdown['preference_score'],
+                hybrid_score=round(scores[0][i], 3),
+                distance_score=round(scores[1][i], 3),
+                similarity_score=round(scores[2][i], 3),
+                preference_score=round(scores[3][i], 3),
                 phone=metadata.get('tel'),
                 image_url=metadata.get('firstimage'),
                 category=metadata.get('cat2')
@@ -183,16 +216,14 @@ class HybridSearchService:
 
             final_results.append(search_result)
 
-        final_results.sort(key=lambda x: x.hybrid_score, reverse=True)
-
         logger.info(f"🔎 1단계 RAG 검색 완료: {len(final_results)}개")
         return final_results
 
-    def _search_with_ai_reinterpretation(self, request: LocationBasedRequest) -> List[HybridSearchResult]:
-        """2단계: AI 쿼리 재해석 후 RAG 재검색"""
+    async def _search_with_ai_reinterpretation(self, request: LocationBasedRequest) -> List[HybridSearchResult]:
+        """2단계: AI 쿼리 재해석 후 RAG 재검색 (최적화 쿼리별 검색은 동시 실행)"""
         logger.info("🤖 AI 쿼리 재해석 시작")
 
-        analysis = query_analyzer.analyze_travel_intent(
+        analysis = await query_analyzer.analyze_travel_intent(
             user_query=request.query,
             current_location={
                 "latitude": request.latitude,
@@ -218,30 +249,50 @@ class HybridSearchService:
             except ValueError:
                 preference = request.travel_preference
 
-        all_results = []
-
-        for query in optimized_queries[:3]:
-            optimized_request = request.copy(update={
+        optimized_requests = [
+            request.copy(update={
                 "query": query,
                 "max_distance_km": min(float(suggested_radius), 100.0),
                 "travel_preference": preference or request.travel_preference,
                 "content_types": suggested_content_types or getattr(request, 'content_types', None)
             })
+            for query in optimized_queries[:3]
+        ]
 
-            sub_results = self._search_with_current_params(optimized_request)
-            all_results.extend(sub_results)
+        # 최적화 쿼리들의 임베딩을 encode 한 번으로 미리 계산 (하위 검색은 캐시 적중)
+        if settings.EMBEDDING_TYPE == "korean" and vector_db.model and optimized_requests:
+            await asyncio.to_thread(vector_db.generate_embeddings, [
+                self.build_enhanced_query(r.query, r.travel_preference)
+                for r in optimized_requests
+            ])
 
-        unique_results = self._deduplicate_by_id(all_results)
+        all_results = []
+        for sub_results in await asyncio.gather(
+            *(self._search_with_current_params(r) for r in optimized_requests)
+        ):
+            all_results.extend(sub_results)
 
-        logger.info(f"✅ AI 재해석 검색 완료: {len(unique_results)}개")
-        return unique_results
+        # ID 중복 제거는 기본 결과와 병합할 때(_merge_top_by_id) 한 번에 처리
+        logger.info(f"✅ AI 재해석 검색 완료: {len(all_results)}개 (중복 포함)")
+        return all_results
 
-    def _generate_with_openai_knowledge(self, request: LocationBasedRequest) -> List[HybridSearchResult]:
+    async def _generate_with_openai_knowledge(self, request: LocationBasedRequest) -> List[HybridSearchResult]:
         """3단계: 순수 OpenAI 지식 기반 추천"""
         if not self.openai_available:
             logger.warning("OpenAI 클라이언트 미구성 → AI 생성 불가")
             return []
 
+        preference = request.travel_preference.value if request.travel_preference else None
+        cache_scope = self.openai_result_cache.make_scope(
+            request.latitude, request.longitude, preference,
+            request.max_distance_km, min(request.n_results, 8))
+        # 캐시 조회/저장은 SQLite + 임베딩 계산이라 워커 스레드에서 실행
+        recommendations = await asyncio.to_thread(
+            self.openai_result_cache.get, cache_scope, request.query)
+        if recommendations is not None:
+            logger.info(f"💾 OpenAI 추천 캐시 적중: {len(recommendations)}개")
+            return self._build_openai_results(request, recommendations)
+
         logger.warning("🤖 RAG 데이터 부족 → OpenAI 지식 기반 추천 생성")
 
         system_prompt = """당신은 한국 여행 전문 가이드입니다.
@@ -275,49 +326,43 @@ class HybridSearchService:
 """
 
         try:
-            response = self.openai_client.chat.completions.create(
+            stream = await self.openai_client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.3,
-                response_format={"type": "json_object"}
+                response_format={"type": "json_object"},
+                stream=True
             )
 
-            content = response.choices[0].message.content
-            data = json.loads(content)
-            recommendations = data.get("recommendations", [])
-
+            # 추천 항목이 닫히는 즉시 파싱/결과 객체 생성 (나머지 토큰 수신과 겹침)
+            parser = JSONObjectStreamParser(item_depth=3)
+            chunks = []
+            recommendations = []
             openai_results = []
-            for i, rec in enumerate(recommendations):
-                lat = rec.get("latitude", request.latitude)
-                lon = rec.get("longitude", request.longitude)
-
-                distance = self.calculate_distance_km(
-                    request.latitude, request.longitude,
-                    lat, lon
-                )
-
-                result = HybridSearchResult(
-                    id=f"openai_generated_{i}",
-                    title=rec.get("name", "AI 추천 장소"),
-                    address=rec.get("address", "주소 정보 없음"),
-                    content_type="12",
-                    content_type_name="AI 추천",
-                    latitude=lat,
-                    longitude=lon,
-                    distance_km=round(distance, 1),
-                    hybrid_score=0.65,
-                    distance_score=0.5,
-                    similarity_score=0.9,
-                    preference_score=0.6,
-                    phone=None,
-                    image_url=None,
-                    category=f"AI 추천 ({rec.get('category', '기타')})"
-                )
-                openai_results.append(result)
-
+            async for chunk in stream:
+                if not chunk.choices or not chunk.choices[0].delta.content:
+                    continue
+                delta = chunk.choices[0].delta.content
+                chunks.append(delta)
+                items = parser.feed(delta)
+                if items:
+                    openai_results.extend(self._build_openai_results(
+                        request, items, start=len(recommendations)))
+                    recommendations.extend(items)
+
+            # 전체 응답 기준으로 확인 (예상과 다른 구조면 전체 파싱 결과로 다시 생성)
+            data = json_loads("".join(chunks))
+            full_recommendations = data.get("recommendations", [])
+            if full_recommendations != recommendations:
+                recommendations = full_recommendations
+                openai_results = self._build_openai_results(request, recommendations)
+
+            if openai_results:
+                await asyncio.to_thread(
+                    self.openai_result_cache.set, cache_scope, request.query, recommendations)
             logger.info(f"🤖 OpenAI 추천 생성: {len(openai_results)}개")
             return openai_results
 
@@ -325,6 +370,43 @@ class HybridSearchService:
             logger.error(f"❌ OpenAI 추천 생성 실패: {e}")
             return []
 
+    def _build_openai_results(
+        self,
+        request: LocationBasedRequest,
+        recommendations: List[Dict],
+        start: int = 0
+    ) -> List[HybridSearchResult]:
+        """OpenAI 추천 목록 -> 결과 객체 (거리는 요청 좌표 기준으로 계산, start: id 번호 시작값)"""
+        openai_results = []
+        for i, rec in enumerate(recommendations, start):
+            lat = rec.get("latitude", request.latitude)
+            lon = rec.get("longitude", request.longitude)
+
+            distance = self.calculate_distance_km(
+                request.latitude, request.longitude,
+                lat, lon
+            )
+
+            result = HybridSearchResult(
+                id=f"openai_generated_{i}",
+                title=rec.get("name", "AI 추천 장소"),
+                address=rec.get("address", "주소 정보 없음"),
+                content_type="12",
+                content_type_name="AI 추천",
+                latitude=lat,
+                longitude=lon,
+                distance_km=round(distance, 1),
+                hybrid_score=0.65,
+                distance_score=0.5,
+                similarity_score=0.9,
+                preference_score=0.6,
+                phone=None,
+                image_url=None,
+                category=f"AI 추천 ({rec.get('category', '기타')})"
+            )
+            openai_results.append(result)
+        return openai_results
+
     # ===== 유틸리티 메서드 =====
 
     def calculate_distance_km(
@@ -332,27 +414,9 @@ class HybridSearchService:
         lat1: float, lon1: float,
         lat2: float, lon2: float
     ) -> float:
-        """Haversine 공식으로 두 좌표 간 거리(km) 계산"""
-        R = 6371.0
-
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
-
-        dlat = lat2_rad - lat1_rad
-        dlon = lon2_rad - lon1_rad
+        """Haversine 공식으로 두 좌표 간 거리(km) 계산 (JIT 커널)"""
+        return haversine_km_scalar(lat1, lon1, lat2, lon2)
 
-        a = (math.sin(dlat / 2) ** 2 +
-             math.cos(lat1_rad) * math.cos(lat2_rad) *
-             math.sin(dlon / 2) ** 2)
-
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        distance = R * c
-
-        return distance
-
-    @lru_cache(maxsize=50)
     def get_location_candidates(
         self,
         user_lat: float,
@@ -363,47 +427,17 @@ class HybridSearchService:
         logger.info(
             f"📍 위치 후보 추출: ({user_lat}, {user_lon}) 반경 {max_distance_km}km")
 
-        area_code = self._estimate_area_code(user_lat, user_lon)
-        where_filter = {"areacode": area_code} if area_code else None
-
-        all_results = self.collection.get(
-            limit=1000,
-            where=where_filter,
-            include=['metadatas']
-        )
-
-        logger.info(f"📊 DB에서 가져온 데이터: {len(all_results.get('ids', []))}개")
-
-        candidates = []
-
-        if all_results and all_results.get('metadatas'):
-            for i, metadata in enumerate(all_results['metadatas']):
-                lat_str = metadata.get('mapy')
-                lon_str = metadata.get('mapx')
-
-                if not lat_str or not lon_str:
-                    continue
-
-                try:
-                    place_lat = float(lat_str)
-                    place_lon = float(lon_str)
-
-                    distance = self.calculate_distance_km(
-                        user_lat, user_lon,
-                        place_lat, place_lon
-                    )
-
-                    if distance <= max_distance_km:
-                        candidates.append({
-                            'id': all_results['ids'][i],
-                            'metadata': metadata,
-                            'distance_km': round(distance, 2),
-                            'latitude': place_lat,
-                            'longitude': place_lon
-                        })
-
-                except (ValueError, TypeError):
-                    continue
+        # 인메모리 위치 인덱스에서 반경 검색 (메타데이터는 필요한 결과만 나중에 조회)
+        candidates = [
+            {
+                'id': item_id,
+                'distance_km': round(distance, 2),
+                'latitude': place_lat,
+                'longitude': place_lon
+            }
+            for item_id, place_lat, place_lon, distance in self.geo_index.query_radius(
+                user_lat, user_lon, max_distance_km)
+        ]
 
         candidates.sort(key=lambda x: x['distance_km'])
 
@@ -440,22 +474,37 @@ class HybridSearchService:
         n_results: int,
         content_types: Optional[List[str]] = None
     ) -> List[Dict]:
-        """후보군 내에서 Vector 검색"""
+        """후보군 내에서 Vector 검색 (후보/콘텐츠 타입 필터는 Chroma where로 전달)"""
         if not candidates:
             return []
 
-        if settings.EMBEDDING_TYPE == "korean" and vector_db.model:
-            query_embedding = vector_db.generate_embedding(query)
-        else:
+        if not (settings.EMBEDDING_TYPE == "korean" and vector_db.model):
             logger.warning("한국어 임베딩 모델 미사용")
-            return candidates[:n_results]
+            return self._hydrate_metadata(candidates[:n_results])
+
+        query_embedding = vector_db.generate_embedding(query)
 
-        candidate_ids = [c['id'] for c in candidates]
         candidates_dict = {c['id']: c for c in candidates}
+        where_clauses = []
+        if content_types:
+            where_clauses.append({"contenttypeid": {"$in": list(content_types)}})
+
+        if len(candidates) <= CHROMA_WHERE_IDS_MAX:
+            # HNSW 검색 자체를 위치 후보 안에서만 수행
+            where_clauses.append({"contentid": {"$in": list(candidates_dict)}})
+            query_n_results = min(n_results, len(candidates))
+        else:
+            query_n_results = VECTOR_QUERY_MAX_RESULTS
+
+        if len(where_clauses) > 1:
+            where = {"$and": where_clauses}
+        else:
+            where = where_clauses[0] if where_clauses else None
 
         search_results = self.collection.query(
             query_embeddings=[query_embedding],
-            n_results=min(len(candidates) * 2, 100),
+            n_results=query_n_results,
+            where=where,
             include=['metadatas', 'distances']
         )
 
@@ -463,99 +512,47 @@ class HybridSearchService:
 
         if search_results.get('ids') and search_results['ids'][0]:
             for i, result_id in enumerate(search_results['ids'][0]):
-                if result_id in candidates_dict:
-                    candidate = candidates_dict[result_id]
-                    metadata = search_results['metadatas'][0][i]
-                    vector_distance = search_results['distances'][0][i]
-
-                    if content_types:
-                        content_type = metadata.get('contenttypeid')
-                        if content_type not in content_types:
-                            continue
-
-                    filtered_results.append({
-                        **candidate,
-                        'vector_distance': vector_distance,
-                        'metadata': metadata
-                    })
+                candidate = candidates_dict.get(result_id)
+                if candidate is None:
+                    continue
+
+                filtered_results.append({
+                    **candidate,
+                    'vector_distance': search_results['distances'][0][i],
+                    'metadata': search_results['metadatas'][0][i]
+                })
 
         logger.info(f"🔎 Vector 검색 결과: {len(filtered_results)}개")
         return filtered_results[:n_results]
 
-    def calculate_hybrid_score(
-        self,
-        distance_km: float,
-        vector_distance: float,
-        preference_match: bool,
-        max_distance: float,
-        weights: Dict[str, float]
-    ) -> Tuple[float, Dict[str, float]]:
-        """하이브리드 점수 계산"""
-        distance_score = 1 / (1 + (distance_km / (max_distance / 3)) ** 2)
-        similarity_score = 1 / (1 + vector_distance / 20)
-        preference_score = 1.0 if preference_match else 0.6
-
-        hybrid_score = (
-            distance_score * weights['distance_weight'] +
-            similarity_score * weights['similarity_weight'] +
-            preference_score * weights['preference_weight']
+    def _hydrate_metadata(self, candidates: List[Dict]) -> List[Dict]:
+        """위치 후보에 Vector DB 메타데이터 채우기 (최종 결과에 필요한 id만 조회)"""
+        if not candidates:
+            return []
+        fetched = self.collection.get(
+            ids=[c['id'] for c in candidates],
+            include=['metadatas']
         )
+        metadata_by_id = dict(zip(fetched.get('ids') or [], fetched.get('metadatas') or []))
+        return [{**c, 'metadata': metadata_by_id.get(c['id']) or {}} for c in candidates]
 
-        return hybrid_score, {
-            'distance_score': round(distance_score, 3),
-            'similarity_score': round(similarity_score, 3),
-            'preference_score': round(preference_score, 3)
-        }
-
-    def _merge_unique_results(
+    def _merge_top_by_id(
         self,
-        results1: List[HybridSearchResult],
-        results2: List[HybridSearchResult]
+        *result_lists: List[HybridSearchResult],
+        k: int
     ) -> List[HybridSearchResult]:
-        """두 결과 리스트 병합 (중복 제거, 점수 기준 정렬)"""
-        merged = {r.id: r for r in results1}
-
-        for r in results2:
-            if r.id not in merged:
-                merged[r.id] = r
-            elif r.hybrid_score > merged[r.id].hybrid_score:
-                merged[r.id] = r
-
-        sorted_results = sorted(
-            merged.values(),
-            key=lambda x: x.hybrid_score,
-            reverse=True
-        )
-
-        return sorted_results
-
-    def _deduplicate_by_id(self, results: List[HybridSearchResult]) -> List[HybridSearchResult]:
-        """ID 기준 중복 제거"""
-        seen = {}
-        for result in results:
-            if result.id not in seen or result.hybrid_score > seen[result.id].hybrid_score:
-                seen[result.id] = result
-        return list(seen.values())
-
-    def _estimate_area_code(self, latitude: float, longitude: float) -> Optional[str]:
-        """위도/경도 기반 지역 코드 추정 (성능 최적화용)"""
-        regions = {
-            "1": {"lat_range": (37.428, 37.701), "lon_range": (126.764, 127.183)},
-            "6": {"lat_range": (35.000, 35.362), "lon_range": (128.850, 129.300)},
-            "39": {"lat_range": (33.100, 33.570), "lon_range": (126.150, 126.950)},
-            "2": {"lat_range": (37.260, 37.650), "lon_range": (126.400, 126.850)},
-            "4": {"lat_range": (35.650, 36.000), "lon_range": (128.450, 128.750)},
-            "3": {"lat_range": (36.200, 36.450), "lon_range": (127.300, 127.550)},
-        }
-
-        for area_code, bounds in regions.items():
-            lat_min, lat_max = bounds["lat_range"]
-            lon_min, lon_max = bounds["lon_range"]
-
-            if lat_min <= latitude <= lat_max and lon_min <= longitude <= lon_max:
-                return area_code
-
-        return None
+        """
+        여러 결과 리스트를 한 번에 병합 -> ID별 최고 점수만 남기고 점수 상위 k개
+        (동점이면 먼저 나온 결과 우선, sorted(...)[:k]와 같은 순서)
+        """
+        merged: Dict[str, HybridSearchResult] = {}
+        for results in result_lists:
+            for r in results:
+                best = merged.setdefault(r.id, r)
+                if r.hybrid_score > best.hybrid_score:
+                    merged[r.id] = r
+
+        return heapq.nlargest(k, merged.values(), key=lambda x: x.hybrid_score)
 
     def _get_content_type_name(self, content_type: str) -> str:
         """콘텐츠 타입 코드 → 이름 변환"""
@@ -1,11 +1,101 @@
 import math
+import threading
 import time
 import requests
-from typing import List, Dict, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
 from tqdm import tqdm
 
 from app.core.config import settings
+from app.core.responses import json_loads
 from app.core.vector_db import vector_db
+from app.services.geo_index import (
+    LAT_KEY, LON_KEY, geo_version_path, mark_coordinates_changed, parse_coordinate)
+
+# 저장 벡터를 만든 임베딩 모델 식별자 메타데이터 키
+EMBEDDING_MODEL_KEY = "embedding_model"
+
+# 적재 시 encode 배치 크기 (검색 쿼리보다 문서가 길고 한 번에 많이 들어옴)
+EMBEDDING_BATCH_SIZE = 64
+
+# 메타데이터로 저장하는 필드
+METADATA_FIELDS = (
+    "contentid", "title", "addr1", "addr2", "areacode",
+    "sigungucode", "contenttypeid", "mapx", "mapy",
+    "tel", "firstimage", "zipcode", "cat1", "cat2", "cat3",
+    "modifiedtime", "createdtime"
+)
+
+# 필드 값 튜플 -> 텍스트/메타데이터 메모이즈 크기 (전체 관광지 수 수준)
+FIELD_CACHE_SIZE = 100_000
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _build_text(title, addr1, addr2, cat1, cat2, cat3, tel) -> str:
+    """검색 최적화된 텍스트 생성 (같은 필드 값이면 캐시된 문자열 재사용)"""
+    parts = []
+
+    # 제목 (최우선)
+    title = title.strip()
+    if title:
+        parts.append(f"제목: {title}")
+
+    # 주소 정보
+    addr1 = addr1.strip()
+    if addr1:
+        full_addr = f"{addr1} {addr2.strip()}".strip()
+        parts.append(f"주소: {full_addr}")
+
+    # 카테고리 계층
+    categories = [cat.strip() for cat in (cat1, cat2, cat3) if cat.strip()]
+    if categories:
+        parts.append(f"분류: {' > '.join(categories)}")
+
+    # 연락처
+    tel = tel.strip()
+    if tel:
+        parts.append(f"전화: {tel}")
+
+    return " | ".join(parts)
+
+
+@lru_cache(maxsize=FIELD_CACHE_SIZE)
+def _build_metadata(values: Tuple) -> Dict:
+    """METADATA_FIELDS 순서의 값 튜플 -> 정제된 메타데이터 (캐시 공유 객체이므로 호출 측에서 복사)"""
+    metadata = {}
+    for field, value in zip(METADATA_FIELDS, values):
+        if value and str(value).strip():  # 빈 값 제외
+            metadata[field] = str(value).strip()
+
+    # 검색 시 매번 문자열을 파싱하지 않도록 검증된 숫자 좌표를 함께 저장
+    lat = parse_coordinate(metadata.get("mapy"), 90.0)
+    lon = parse_coordinate(metadata.get("mapx"), 180.0)
+    if lat is not None and lon is not None:
+        metadata[LAT_KEY] = lat
+        metadata[LON_KEY] = lon
+
+    return metadata
+
+
+class RateLimiter:
+    """스레드 간 공유하는 최소 요청 간격 제한 (초당 rate개)"""
+
+    def __init__(self, rate_per_sec: float):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            wait_sec = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait_sec > 0:
+            time.sleep(wait_sec)
 
 
 class KTOIngestionService:
@@ -16,29 +106,53 @@ class KTOIngestionService:
         self.service_key = settings.KTO_SERVICE_KEY
         self.collection = vector_db.get_collection()
         self.items_per_page = 1000
+        self.rate_limiter = RateLimiter(settings.KTO_FETCH_RATE_PER_SEC)
+        # 검색 서버의 위치 인덱스가 좌표 변경(개수가 같은 upsert 포함)을 알아채도록 갱신하는 파일
+        self.geo_version_path = geo_version_path(
+            settings.VECTOR_DB_PATH, settings.VECTOR_DB_COLLECTION)
+        # 이미 같은 내용으로 저장되어 있어 임베딩/저장을 건너뛴 항목 수
+        self.skipped_count = 0
 
         if not self.service_key:
             raise ValueError("KTO_SERVICE_KEY가 설정되지 않았습니다.")
 
-    def get_total_count(self) -> int:
-        """전체 데이터 개수 조회"""
-        params = {
+        # 페이지마다 TCP/TLS 연결을 새로 맺지 않도록 keep-alive 세션 재사용
+        # (동시 요청 스레드 수만큼 풀 크기 확보, 재시도는 fetch_page_data에서 처리)
+        pool_size = max(16, settings.KTO_FETCH_WORKERS)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=Retry(total=0))
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.base_params = {
             "serviceKey": self.service_key,
-            "numOfRows": 1,
-            "pageNo": 1,
             "MobileOS": "AND",
             "MobileApp": "train",
             "_type": "json"
         }
 
+    def close(self) -> None:
+        """HTTP 세션(커넥션 풀) 정리"""
+        self.session.close()
+
+    def __enter__(self) -> "KTOIngestionService":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def get_total_count(self) -> int:
+        """전체 데이터 개수 조회"""
+        params = {**self.base_params, "numOfRows": 1, "pageNo": 1}
+
         try:
-            response = requests.get(
+            response = self.session.get(
                 self.base_url,
                 params=params,
                 timeout=settings.REQUEST_TIMEOUT
             )
             response.raise_for_status()
-            data = response.json()
+            data = json_loads(response.content)
             return int(data["response"]["body"]["totalCount"])
         except Exception as e:
             print(f"전체 개수 조회 실패: {e}")
@@ -46,24 +160,18 @@ class KTOIngestionService:
 
     def fetch_page_data(self, page_no: int, num_rows: int = 100) -> List[Dict]:
         """페이지별 데이터 가져오기 (재시도 로직 포함)"""
-        params = {
-            "serviceKey": self.service_key,
-            "numOfRows": num_rows,
-            "pageNo": page_no,
-            "MobileOS": "AND",
-            "MobileApp": "train",
-            "_type": "json"
-        }
+        params = {**self.base_params, "numOfRows": num_rows, "pageNo": page_no}
 
         for attempt in range(settings.MAX_RETRIES):
+            self.rate_limiter.acquire()
             try:
-                response = requests.get(
+                response = self.session.get(
                     self.base_url,
                     params=params,
                     timeout=settings.REQUEST_TIMEOUT
                 )
                 response.raise_for_status()
-                data = response.json()
+                data = json_loads(response.content)
 
                 # 응답 데이터 정규화
                 items = data["response"]["body"].get(
@@ -85,56 +193,82 @@ class KTOIngestionService:
 
         return []
 
+    def _fetch_pages_concurrent(
+        self,
+        pages: Iterable[int],
+        workers: int = 8
+    ) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        여러 페이지를 스레드 풀로 동시에 요청하고 완료되는 순서대로 (page_no, items) 반환
+        동시 요청은 workers개, 대기 중인 결과는 workers * 2개까지만 (메모리 제한)
+        다음 페이지를 먼저 제출한 뒤 yield 하므로 호출 측이 임베딩하는 동안에도 요청은 계속 진행
+        (bounded queue를 둔 생산자/소비자 구조와 같은 효과)
+        """
+        page_iter = iter(pages)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+
+            def submit_next() -> None:
+                page_no = next(page_iter, None)
+                if page_no is not None:
+                    future = executor.submit(self.fetch_page_data, page_no, self.items_per_page)
+                    pending[future] = page_no
+
+            for _ in range(workers * 2):
+                submit_next()
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_no = pending.pop(future)
+                    submit_next()
+                    yield page_no, future.result()
+
     def create_searchable_text(self, item: Dict) -> str:
         """검색 최적화된 텍스트 생성"""
-        parts = []
-
-        # 제목 (최우선)
-        title = item.get("title", "").strip()
-        if title:
-            parts.append(f"제목: {title}")
-
-        # 주소 정보
-        addr1 = item.get("addr1", "").strip()
-        addr2 = item.get("addr2", "").strip()
-        if addr1:
-            full_addr = f"{addr1} {addr2}".strip()
-            parts.append(f"주소: {full_addr}")
-
-        # 카테고리 계층
-        categories = []
-        for i in range(1, 4):
-            cat = item.get(f"cat{i}", "").strip()
-            if cat:
-                categories.append(cat)
-
-        if categories:
-            parts.append(f"분류: {' > '.join(categories)}")
-
-        # 연락처
-        tel = item.get("tel", "").strip()
-        if tel:
-            parts.append(f"전화: {tel}")
-
-        return " | ".join(parts)
+        get = item.get
+        return _build_text(
+            get("title", ""), get("addr1", ""), get("addr2", ""),
+            get("cat1", ""), get("cat2", ""), get("cat3", ""), get("tel", ""))
 
     def prepare_metadata(self, item: Dict) -> Dict:
         """메타데이터 정제"""
-        important_fields = [
-            "contentid", "title", "addr1", "addr2", "areacode",
-            "sigungucode", "contenttypeid", "mapx", "mapy",
-            "tel", "firstimage", "zipcode", "cat1", "cat2", "cat3",
-            "modifiedtime", "createdtime"
-        ]
+        metadata = _build_metadata(tuple([item.get(field, "") for field in METADATA_FIELDS])).copy()
 
-        metadata = {}
-        for field in important_fields:
-            value = item.get(field, "")
-            if value and str(value).strip():  # 빈 값 제외
-                metadata[field] = str(value).strip()
+        # 모델/실행 백엔드가 바뀌면 내용이 같아도 다시 임베딩하도록 기록
+        metadata[EMBEDDING_MODEL_KEY] = vector_db.embedding_model_id
 
         return metadata
 
+    def _filter_unchanged(
+        self,
+        ids: List[str],
+        documents: List[str],
+        metadatas: List[Dict]
+    ) -> Tuple[List[str], List[str], List[Dict]]:
+        """
+        컬렉션에 문서/메타데이터(modifiedtime, 임베딩 모델 포함)가 똑같이 저장된 항목 제외
+        재적재 시 바뀌지 않은 항목은 임베딩 계산과 upsert를 모두 생략
+        """
+        existing = self.collection.get(ids=ids, include=["documents", "metadatas"])
+        stored = {
+            item_id: (document, metadata)
+            for item_id, document, metadata in zip(
+                existing.get("ids") or [],
+                existing.get("documents") or [],
+                existing.get("metadatas") or [])
+        }
+        changed = [
+            i for i, item_id in enumerate(ids)
+            if stored.get(item_id) != (documents[i], metadatas[i])
+        ]
+        self.skipped_count += len(ids) - len(changed)
+        return (
+            [ids[i] for i in changed],
+            [documents[i] for i in changed],
+            [metadatas[i] for i in changed],
+        )
+
     def process_batch(self, items: List[Dict]) -> bool:
         """배치 단위 처리 및 저장"""
         if not items:
@@ -144,30 +278,36 @@ class KTOIngestionService:
             ids = []
             documents = []
             metadatas = []
-            embeddings = []
 
+            create_searchable_text = self.create_searchable_text
+            prepare_metadata = self.prepare_metadata
             for item in items:
                 content_id = item.get("contentid")
                 if not content_id:
                     continue
 
-                # 데이터 준비
-                doc_text = self.create_searchable_text(item)
-                if not doc_text.strip():
+                # 데이터 준비 (각 부분을 strip 후 조합하므로 빈 문자열만 거르면 됨)
+                doc_text = create_searchable_text(item)
+                if not doc_text:
                     continue
 
                 ids.append(str(content_id))
                 documents.append(doc_text)
-                metadatas.append(self.prepare_metadata(item))
+                metadatas.append(prepare_metadata(item))
 
-                # 임베딩 생성
-                if settings.EMBEDDING_TYPE == "korean":
-                    embedding = vector_db.generate_embedding(doc_text)
-                    embeddings.append(embedding)
+            if not ids:
+                return True
 
+            ids, documents, metadatas = self._filter_unchanged(ids, documents, metadatas)
             if not ids:
                 return True
 
+            # 배치 전체 임베딩을 encode 한 번으로 생성 (문서별 모델 호출 대신)
+            embeddings = []
+            if settings.EMBEDDING_TYPE == "korean":
+                embeddings = vector_db.generate_embeddings(
+                    documents, batch_size=EMBEDDING_BATCH_SIZE)
+
             # ChromaDB에 저장
             if embeddings and settings.EMBEDDING_TYPE == "korean":
                 self.collection.upsert(
@@ -184,6 +324,7 @@ class KTOIngestionService:
                     metadatas=metadatas
                 )
 
+            mark_coordinates_changed(self.geo_version_path)
             return True
 
         except Exception as e:
@@ -200,6 +341,7 @@ class KTOIngestionService:
         print(f"총 페이지: {total_pages}페이지")
         print(f"임베딩 방식: {settings.EMBEDDING_TYPE}")
         print(f"배치 크기: {settings.BATCH_SIZE}")
+        print(f"동시 요청: {settings.KTO_FETCH_WORKERS}개 (초당 최대 {settings.KTO_FETCH_RATE_PER_SEC}회)")
         print("=" * 60)
 
         # 기존 데이터 확인
@@ -212,16 +354,16 @@ class KTOIngestionService:
                 self.collection = vector_db.get_collection()
                 print("기존 데이터 삭제 완료\n")
 
-        # 데이터 처리
-        buffer = []
+        # 데이터 처리 (앞에서 꺼내고 실패 시 앞에 되돌리므로 리스트 slice 복사 대신 deque)
+        buffer = deque()
         processed_count = 0
         failed_pages = []
 
         with tqdm(total=total_count, desc="데이터 처리", unit="개") as pbar:
-            for page_no in range(1, total_pages + 1):
-                # API 요청
-                items = self.fetch_page_data(page_no, self.items_per_page)
-
+            # 페이지 요청은 스레드 풀에서 동시에 (간격은 rate_limiter), 임베딩/저장은 이 스레드에서
+            pages = self._fetch_pages_concurrent(
+                range(1, total_pages + 1), workers=settings.KTO_FETCH_WORKERS)
+            for page_no, items in pages:
                 if not items:
                     failed_pages.append(page_no)
                     continue
@@ -230,22 +372,19 @@ class KTOIngestionService:
 
                 # 배치 크기에 도달하면 처리
                 while len(buffer) >= settings.BATCH_SIZE:
-                    batch = buffer[:settings.BATCH_SIZE]
-                    buffer = buffer[settings.BATCH_SIZE:]
+                    batch = [buffer.popleft() for _ in range(settings.BATCH_SIZE)]
 
                     if self.process_batch(batch):
                         processed_count += len(batch)
                         pbar.update(len(batch))
                     else:
                         # 실패한 배치 재시도를 위해 버퍼에 다시 추가
-                        buffer = batch + buffer
+                        buffer.extendleft(reversed(batch))
                         time.sleep(5)
 
-                # API 요청 간격 (rate limiting 방지)
-                time.sleep(0.2)
-
         # 남은 데이터 처리
         if buffer:
+            buffer = list(buffer)
             if self.process_batch(buffer):
                 processed_count += len(buffer)
 
@@ -253,6 +392,7 @@ class KTOIngestionService:
         final_count = self.collection.count()
         print(f"\n처리 완료!")
         print(f"성공: {processed_count:,}개")
+        print(f"변경 없음(임베딩 생략): {self.skipped_count:,}개")
         print(f"DB 저장: {final_count:,}개")
         if failed_pages:
             print(f"실패한 페이지: {len(failed_pages)}개 - {failed_pages[:10]}...")
@@ -0,0 +1,150 @@
+# app/services/openai_result_cache.py
+"""
+OpenAI 지식 기반 추천(하이브리드 검색 3단계) 결과 캐시 (SQLite)
+- scope: 반올림 좌표(소수 2자리 ≈ 1km) + 선호도 + 반경 + 추천 개수 (프롬프트를 결정하는 값)
+- 1차: sha256(scope + 정규화 쿼리) 정확 일치
+- 2차(의미 캐시): 같은 scope 안에서 쿼리 임베딩 코사인 유사도가 임계값 이상인 항목 재사용
+- 값은 OpenAI가 돌려준 추천 목록(JSON bytes) -> 거리/결과 객체는 요청 좌표로 다시 계산
+- 캐시는 최선 노력: SQLite 오류는 경고만 남기고 미스로 처리
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.responses import json_dumps, json_loads
+from app.services.rag_cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+# 의미 캐시 비교 대상: scope별 최근 항목 수
+SEMANTIC_SCAN_LIMIT = 256
+
+
+class OpenAIResultCache:
+    """scope + 쿼리(정확/의미 일치) -> OpenAI 추천 목록 캐시 (스레드 안전)"""
+
+    def __init__(
+        self,
+        path: str,
+        ttl_sec: float = 7 * 86400,
+        similarity_threshold: float = 0.93,
+        coord_decimals: int = 2,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+    ):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # asyncio.to_thread 워커 여러 개에서 접근하므로 연결 하나를 락으로 보호
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS openai_result_cache ("
+            "key TEXT PRIMARY KEY, scope TEXT NOT NULL, emb BLOB, "
+            "payload BLOB NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_openai_result_cache_scope "
+            "ON openai_result_cache (scope, created_at)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self.ttl_sec = ttl_sec
+        self.similarity_threshold = similarity_threshold
+        self.coord_decimals = coord_decimals
+        self.embed_fn = embed_fn
+        self.stats = {"hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def make_scope(self, lat: float, lon: float, preference: Optional[str],
+                   max_distance_km: float, n_results: int) -> str:
+        return (f"{round(lat, self.coord_decimals)}|{round(lon, self.coord_decimals)}|"
+                f"{preference or ''}|{max_distance_km}|{n_results}")
+
+    @staticmethod
+    def make_key(scope: str, query: str) -> str:
+        return hashlib.sha256(f"{scope}|{query}".encode("utf-8")).hexdigest()
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None or not query:
+            return None
+        try:
+            arr = np.asarray(self.embed_fn(query), dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"캐시용 임베딩 생성 실패: {e}")
+            return None
+        norm = float(np.linalg.norm(arr)) if arr.size else 0.0
+        if norm == 0.0:
+            return None
+        return arr / norm
+
+    def get(self, scope: str, query: str) -> Optional[List[Dict[str, Any]]]:
+        query = normalize_query(query or "")
+        key = self.make_key(scope, query)
+        min_created = time.time() - self.ttl_sec
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT payload FROM openai_result_cache WHERE key = ? AND created_at >= ?",
+                    (key, min_created),
+                ).fetchone()
+            if row is not None:
+                self.stats["hits"] += 1
+                return json_loads(row[0])
+
+            emb = self._embed(query)
+            if emb is not None:
+                with self._lock:
+                    rows = self._conn.execute(
+                        "SELECT emb, payload FROM openai_result_cache "
+                        "WHERE scope = ? AND created_at >= ? AND emb IS NOT NULL "
+                        "ORDER BY created_at DESC LIMIT ?",
+                        (scope, min_created, SEMANTIC_SCAN_LIMIT),
+                    ).fetchall()
+                rows = [(vec, payload) for vec, payload in rows if len(vec) == emb.nbytes]
+                if rows:
+                    sims = np.stack([np.frombuffer(vec, dtype=np.float32) for vec, _ in rows]) @ emb
+                    best = int(np.argmax(sims))
+                    if sims[best] >= self.similarity_threshold:
+                        self.stats["semantic_hits"] += 1
+                        return json_loads(rows[best][1])
+        except sqlite3.Error as e:
+            logger.warning(f"OpenAI 결과 캐시 조회 실패: {e}")
+
+        self.stats["misses"] += 1
+        return None
+
+    def set(self, scope: str, query: str, recommendations: List[Dict[str, Any]]) -> None:
+        query = normalize_query(query or "")
+        emb = self._embed(query)
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO openai_result_cache "
+                    "(key, scope, emb, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (self.make_key(scope, query), scope,
+                     emb.tobytes() if emb is not None else None,
+                     json_dumps(recommendations), now),
+                )
+                # 만료 항목 정리
+                self._conn.execute(
+                    "DELETE FROM openai_result_cache WHERE created_at < ?",
+                    (now - self.ttl_sec,),
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"OpenAI 결과 캐시 저장 실패: {e}")
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
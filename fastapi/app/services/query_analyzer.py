@@ -4,19 +4,45 @@ AI 기반 여행 쿼리 분석 서비스
 """
 
 import logging
-import json
+import re
 from typing import Dict, List, Optional
-from openai import OpenAI
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.clients import async_openai_client
+from app.core.responses import json_loads
+from app.services.rag_cache import normalize_query
 
 logger = logging.getLogger(__name__)
 
+# AI 분석 실패 시 키워드 휴리스틱: (키워드, 권장 반경 km, 선호도), 앞 규칙이 우선
+FALLBACK_RULES = (
+    (("도시를 떠나", "교외", "근교"), 50, "nature"),
+    (("힐링", "휴식", "조용"), 30, "relaxation"),
+    (("맛집", "카페", "음식"), 15, "food"),
+)
+FALLBACK_DEFAULT = (20, "nature")
+
+# 키워드 -> 규칙 순번, 전체 키워드를 정규식 하나로 컴파일해 쿼리를 한 번만 훑음
+# (lookahead로 겹치는 위치의 키워드도 모두 찾고, 그중 가장 앞 규칙을 적용)
+_FALLBACK_KEYWORD_RULE = {
+    keyword.lower(): index
+    for index, (keywords, _, _) in enumerate(FALLBACK_RULES)
+    for keyword in keywords
+}
+_FALLBACK_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, _FALLBACK_KEYWORD_RULE)) + "))")
+
 
 class QueryAnalyzer:
     """자연어 쿼리 분석 및 검색 파라미터 최적화 서비스"""
 
     def __init__(self):
+        # 같은 쿼리/위치의 반복 요청은 OpenAI 호출 없이 이전 분석 결과 재사용
+        self._cache = TTLCache(
+            maxsize=settings.QUERY_ANALYSIS_CACHE_MAXSIZE,
+            ttl_sec=settings.QUERY_ANALYSIS_CACHE_TTL_SEC
+        )
         try:
             if not settings.OPENAI_API_KEY:
                 logger.warning(
@@ -24,7 +50,7 @@ class QueryAnalyzer:
                 self.available = False
                 self.client = None
             else:
-                self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+                self.client = async_openai_client
                 self.available = True
                 logger.info("✅ QueryAnalyzer 초기화 성공")
         except Exception as e:
@@ -32,7 +58,7 @@ class QueryAnalyzer:
             self.available = False
             self.client = None
 
-    def analyze_travel_intent(
+    async def analyze_travel_intent(
         self,
         user_query: str,
         current_location: Dict[str, float]
@@ -58,6 +84,17 @@ class QueryAnalyzer:
         if not self.available:
             return self._get_fallback_analysis(user_query)
 
+        decimals = settings.QUERY_ANALYSIS_CACHE_COORD_DECIMALS
+        cache_key = (
+            normalize_query(user_query),
+            round(current_location['latitude'], decimals),
+            round(current_location['longitude'], decimals),
+        )
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            logger.info(f"⚡ 쿼리 분석 캐시 적중: {user_query}")
+            return cached
+
         system_prompt = """당신은 여행 검색 의도 분석 전문가입니다.
         사용자의 자연어 쿼리를 분석하여 최적의 검색 전략을 JSON으로 제안하세요.
 
@@ -102,7 +139,7 @@ class QueryAnalyzer:
         검색에 효과적인 구체적 키워드들 """
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="gpt-4o-mini",
                 messages=[
                     {"role": "system", "content": system_prompt},
@@ -113,7 +150,7 @@ class QueryAnalyzer:
             )
 
             content = response.choices[0].message.content
-            analysis = json.loads(content)
+            analysis = json_loads(content)
 
             logger.info(f"✅ 쿼리 분석 완료:")
             logger.info(f"  - 원본: {user_query}")
@@ -122,6 +159,8 @@ class QueryAnalyzer:
             logger.info(f"  - 추론 선호도: {analysis.get('inferred_preference')}")
             logger.info(f"  - 근거: {analysis.get('reasoning', 'N/A')}")
 
+            # 실패 시의 기본값(fallback)은 캐시하지 않음
+            self._cache.set(cache_key, analysis)
             return analysis
 
         except Exception as e:
@@ -130,20 +169,14 @@ class QueryAnalyzer:
 
     def _get_fallback_analysis(self, query: str) -> Dict:
         """AI 분석 실패 시 기본값 반환"""
-        query_lower = query.lower()
-
-        if any(keyword in query_lower for keyword in ["도시를 떠나", "교외", "근교"]):
-            radius = 50
-            preference = "nature"
-        elif any(keyword in query_lower for keyword in ["힐링", "휴식", "조용"]):
-            radius = 30
-            preference = "relaxation"
-        elif any(keyword in query_lower for keyword in ["맛집", "카페", "음식"]):
-            radius = 15
-            preference = "food"
+        matched = [
+            _FALLBACK_KEYWORD_RULE[match.group(1)]
+            for match in _FALLBACK_KEYWORD_RE.finditer(query.lower())
+        ]
+        if matched:
+            _, radius, preference = FALLBACK_RULES[min(matched)]
         else:
-            radius = 20
-            preference = "nature"
+            radius, preference = FALLBACK_DEFAULT
 
         return {
             "optimized_queries": [query],
@@ -0,0 +1,150 @@
+# app/services/rag_cache.py
+"""
+RAG 응답 캐시
+- 1차: (정규화 쿼리 + 필터) sha256 키 정확 일치 -> Vector 검색 + OpenAI 호출 생략
+- 2차(의미 캐시): 같은 필터 범위(scope) 안에서 쿼리 임베딩 코사인 유사도가 임계값 이상이면 재사용
+- KTO 데이터 재적재 시 invalidate()로 버전을 올려 기존 키를 모두 무효화
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import unicodedata
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    캐시 키/임베딩 입력용 쿼리 정규화
+    NFKC(전각/반각 통일) -> 소문자 -> 구두점을 공백으로 -> 공백 정리
+    """
+    query = unicodedata.normalize("NFKC", query).lower()
+    query = _PUNCTUATION_RE.sub(" ", query)
+    return _WHITESPACE_RE.sub(" ", query).strip()
+
+
+class RAGResponseCache:
+    """정확 일치 + 임베딩 유사도 기반 RAG 응답 캐시 (프로세스 내 메모리)"""
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl_sec: float = 300.0,
+        similarity_threshold: float = 0.93,
+        semantic_index_size: int = 256,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+    ):
+        self._responses = TTLCache(maxsize=maxsize, ttl_sec=ttl_sec)
+        # 정규화 쿼리 -> 정규화된 임베딩 (get에서 계산한 것을 set에서 재사용)
+        self._embeddings = TTLCache(maxsize=maxsize, ttl_sec=ttl_sec)
+        # scope(필터 조합) -> 최근 (임베딩, 응답 키) 목록
+        self._semantic_index: Dict[str, Deque[Tuple[np.ndarray, str]]] = {}
+        self.similarity_threshold = similarity_threshold
+        self.semantic_index_size = semantic_index_size
+        self.embed_fn = embed_fn
+        self.version = 0
+        self.stats = {"hits": 0, "semantic_hits": 0, "misses": 0}
+
+    def make_key(self, params: Dict[str, Any]) -> str:
+        payload = json.dumps({"v": self.version, **params},
+                             sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def invalidate(self) -> None:
+        """버전을 올려 기존 키를 모두 무효화 (KTO 재적재 후 호출)"""
+        self.version += 1
+        self._responses.clear()
+        self._semantic_index.clear()
+
+    async def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        cached = self._embeddings.get(query)
+        if cached is not None:
+            return cached
+        try:
+            # 임베딩 모델 호출은 동기/CPU 작업이라 워커 스레드에서 실행
+            vec = await asyncio.to_thread(self.embed_fn, query)
+        except Exception as e:
+            logger.warning(f"캐시용 임베딩 생성 실패: {e}")
+            return None
+        if not vec:
+            return None
+        arr = np.asarray(vec, dtype=np.float32)
+        norm = float(np.linalg.norm(arr))
+        if norm == 0.0:
+            return None
+        arr /= norm
+        self._embeddings.set(query, arr)
+        return arr
+
+    async def get(self, key: str, query: Optional[str] = None, scope: Optional[str] = None) -> Optional[Any]:
+        value = self._responses.get(key)
+        if value is not None:
+            self.stats["hits"] += 1
+            return value
+
+        entries = self._semantic_index.get(scope) if scope is not None else None
+        if query and entries:
+            emb = await self._embed(query)
+            if emb is not None:
+                sims = np.stack([e for e, _ in entries]) @ emb
+                best = int(np.argmax(sims))
+                if sims[best] >= self.similarity_threshold:
+                    value = self._responses.get(entries[best][1])
+                    if value is not None:
+                        self.stats["semantic_hits"] += 1
+                        return value
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, value: Any, query: Optional[str] = None, scope: Optional[str] = None) -> None:
+        self._responses.set(key, value)
+        if not query or scope is None:
+            return
+        emb = await self._embed(query)
+        if emb is None:
+            return
+        entries = self._semantic_index.setdefault(
+            scope, deque(maxlen=self.semantic_index_size))
+        entries.append((emb, key))
+
+    def get_stats(self) -> Dict[str, int]:
+        return {**self.stats, "size": len(self._responses), "version": self.version}
+
+
+def _default_embed_fn() -> Optional[Callable[[str], List[float]]]:
+    # Vector DB(임베딩 모델)는 KTO가 활성화된 경우에만 로드
+    if not settings.is_kto_enabled:
+        return None
+    try:
+        from app.core.vector_db import vector_db
+    except ImportError as e:
+        logger.warning(f"의미 캐시 비활성화 (임베딩 모델 로드 실패): {e}")
+        return None
+    return vector_db.generate_embedding
+
+
+# 전역 인스턴스
+rag_cache = RAGResponseCache(
+    maxsize=settings.RESPONSE_CACHE_MAXSIZE,
+    ttl_sec=settings.RESPONSE_CACHE_TTL_SEC,
+    similarity_threshold=settings.RAG_CACHE_SIMILARITY_THRESHOLD,
+    semantic_index_size=settings.RAG_CACHE_SEMANTIC_INDEX_SIZE,
+    embed_fn=_default_embed_fn(),
+)
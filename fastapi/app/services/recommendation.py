@@ -7,20 +7,37 @@ AI 여행 추천 서비스 - 완전 통합 버전
 """
 
 import openai
+import asyncio
 import json
 import logging
 import math
+from dataclasses import asdict
 from typing import List, Dict, Optional, Union
 from datetime import datetime
 from fastapi import HTTPException
-from openai import OpenAI
 
 from app.core.config import settings, OPENAI_API_KEY
+from app.core.clients import openai_client, async_openai_client
+from app.core.responses import json_loads
 from app.schemas.travel import UserRequest
 
+# 시작 후 바뀌지 않는 값이라 모듈 상수로 고정 (요청마다 property 호출하지 않음)
+KTO_ENABLED = settings.is_kto_enabled
+OPENAI_ENABLED = bool(settings.OPENAI_API_KEY)
+
+# 주요 도시별 경계: (지역 코드, lat_min, lat_max, lon_min, lon_max), 겹치면 앞쪽 우선
+REGION_BOXES = (
+    ("1", 37.428, 37.701, 126.764, 127.183),   # 서울특별시
+    ("6", 35.000, 35.362, 128.850, 129.300),   # 부산광역시
+    ("39", 33.100, 33.570, 126.150, 126.950),  # 제주특별자치도
+    ("2", 37.260, 37.650, 126.400, 126.850),   # 인천광역시
+    ("4", 35.650, 36.000, 128.450, 128.750),   # 대구광역시
+    ("3", 36.200, 36.450, 127.300, 127.550),   # 대전광역시
+)
+
 # 조건부 import - KTO 기능이 활성화된 경우에만 Vector 검색 기능 로드
 try:
-    if settings.is_kto_enabled:
+    if KTO_ENABLED:
         from app.services.tourism_search import tourism_search
         from app.services.hybrid_search import hybrid_search_service
         from app.schemas.search import LocationBasedRequest
@@ -51,13 +68,14 @@ class RecommendationService:
 
     def __init__(self):
         """서비스 초기화"""
-        # 최신 OpenAI 클라이언트 사용
-        self.openai_client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # 프로세스 공유 OpenAI 클라이언트 (커넥션 풀 재사용)
+        self.openai_client = openai_client
+        self.async_openai_client = async_openai_client
 
         # Vector 검색 서비스 설정
         self.search_service = tourism_search if VECTOR_SEARCH_AVAILABLE else None
         self.hybrid_service = hybrid_search_service if VECTOR_SEARCH_AVAILABLE else None
-        self.vector_enabled = VECTOR_SEARCH_AVAILABLE and settings.is_kto_enabled
+        self.vector_enabled = VECTOR_SEARCH_AVAILABLE and KTO_ENABLED
 
         # 초기화 상태 로깅
         if self.vector_enabled:
@@ -116,8 +134,8 @@ class RecommendationService:
             content_type = self._map_travel_type_to_content_type(
                 request.travel_type)
 
-            # Vector 검색 실행
-            search_results = self.search_service.search(
+            # Vector 검색 실행 (임베딩은 배치로 묶고, Chroma 조회는 워커 스레드에서 실행)
+            search_results = await self.search_service.asearch(
                 query=search_query,
                 n_results=8,
                 area_code=area_code,
@@ -187,26 +205,8 @@ class RecommendationService:
 
     def _estimate_area_code(self, latitude: float, longitude: float) -> Optional[str]:
         """위도/경도 기반 지역 코드 추정 (개선된 버전)"""
-        # 주요 도시별 경계 정의
-        regions = {
-            # 서울특별시
-            "1": {"lat_range": (37.428, 37.701), "lon_range": (126.764, 127.183)},
-            # 부산광역시
-            "6": {"lat_range": (35.000, 35.362), "lon_range": (128.850, 129.300)},
-            # 제주특별자치도
-            "39": {"lat_range": (33.100, 33.570), "lon_range": (126.150, 126.950)},
-            # 인천광역시
-            "2": {"lat_range": (37.260, 37.650), "lon_range": (126.400, 126.850)},
-            # 대구광역시
-            "4": {"lat_range": (35.650, 36.000), "lon_range": (128.450, 128.750)},
-            # 대전광역시
-            "3": {"lat_range": (36.200, 36.450), "lon_range": (127.300, 127.550)},
-        }
-
-        for area_code, bounds in regions.items():
-            lat_min, lat_max = bounds["lat_range"]
-            lon_min, lon_max = bounds["lon_range"]
-
+        # 주요 도시 경계는 모듈 상수 (요청마다 dict를 새로 만들지 않음)
+        for area_code, lat_min, lat_max, lon_min, lon_max in REGION_BOXES:
             if lat_min <= latitude <= lat_max and lon_min <= longitude <= lon_max:
                 return area_code
 
@@ -313,9 +313,9 @@ class RecommendationService:
         return enhanced_prompt
 
     async def _call_openai_api(self, prompt: str) -> Dict:
-        """OpenAI API 호출"""
+        """OpenAI API 호출 (AsyncOpenAI - 응답 대기 중 다른 요청 처리 가능)"""
         try:
-            response = self.openai_client.chat.completions.create(
+            response = await self.async_openai_client.chat.completions.create(
                 model=settings.OPENAI_MODEL,
                 messages=[
                     {
@@ -340,7 +340,7 @@ class RecommendationService:
         """OpenAI 응답 파싱 및 검증"""
         try:
             response_content = response.choices[0].message.content
-            data = json.loads(response_content)
+            data = json_loads(response_content)
 
             recommendations = data.get("recommendations", [])
 
@@ -426,7 +426,7 @@ class RecommendationService:
 
         try:
             # 1단계: 하이브리드 검색으로 최적 후보 추출
-            hybrid_results = self.hybrid_service.search(request)
+            hybrid_results = await self.hybrid_service.search(request)
 
             if not hybrid_results:
                 return {
@@ -492,7 +492,7 @@ class RecommendationService:
             logger.error(f"OpenAI RAG 생성 실패: {e}")
             # Fallback: 하이브리드 검색 결과만 반환
             return {
-                "hybrid_search_results": [r.dict() for r in hybrid_results] if 'hybrid_results' in locals() else [],
+                "hybrid_search_results": [asdict(r) for r in hybrid_results] if 'hybrid_results' in locals() else [],
                 "ai_recommendations": [],
                 "note": "AI 추천 생성에 실패했지만, 검색 결과는 정상적으로 제공됩니다.",
                 "fallback_mode": True
@@ -673,6 +673,51 @@ class RecommendationService:
                 "error": str(e)
             }
 
+    async def aget_travel_recommendations_by_query(
+        self,
+        user_query: str,
+        preferences: dict = None
+    ) -> Dict:
+        """
+        get_travel_recommendations_by_query의 async 버전
+        - 컨텍스트용 검색과 상세 검색을 동시에 실행 (같은 쿼리 임베딩은 한 배치로 계산)
+        """
+        if not self.vector_enabled:
+            return {
+                "user_query": user_query,
+                "recommendations": [],
+                "message": "Vector 검색이 비활성화되어 있습니다. 위치 기반 추천을 사용해주세요."
+            }
+
+        try:
+            context_results, detailed_results = await asyncio.gather(
+                self.search_service.asearch(user_query, n_results=8),
+                self.search_service.asearch(
+                    query=user_query,
+                    n_results=15,
+                    area_code=preferences.get(
+                        "area_code") if preferences else None,
+                    content_type=preferences.get(
+                        "content_type") if preferences else None
+                )
+            )
+
+            return {
+                "user_query": user_query,
+                "context": self.search_service.format_chat_context(context_results),
+                "recommendations": detailed_results.get("results", []),
+                "total_found": detailed_results.get("total_results", 0),
+                "filters_applied": detailed_results.get("filters_applied", {})
+            }
+
+        except Exception as e:
+            logger.error(f"쿼리 기반 추천 실패: {e}")
+            return {
+                "user_query": user_query,
+                "recommendations": [],
+                "error": str(e)
+            }
+
     def search_similar_places(self, query: str, filters: dict = None) -> Dict:
         """유사한 장소 검색 (Vector DB 직접 검색)"""
         if not self.vector_enabled:
@@ -689,12 +734,49 @@ class RecommendationService:
             n_results=filters.get("n_results", 10) if filters else 10
         )
 
+    async def asearch_similar_places(self, query: str, filters: dict = None) -> Dict:
+        """search_similar_places의 async 버전 (임베딩 배치 + 워커 스레드 검색)"""
+        if not self.vector_enabled:
+            return {
+                "query": query,
+                "results": [],
+                "message": "Vector 검색이 비활성화되어 있습니다."
+            }
+
+        return await self.search_service.asearch(
+            query=query,
+            area_code=filters.get("area_code") if filters else None,
+            content_type=filters.get("content_type") if filters else None,
+            n_results=filters.get("n_results", 10) if filters else 10
+        )
+
+    async def astart(self) -> None:
+        """앱 시작 시 임베딩 배처 시작 + 모델 워밍업 + ANN 인덱스 확인 (event loop 안에서 호출)"""
+        if self.vector_enabled and self.search_service:
+            self.search_service.embedding_batcher.start()
+            # 첫 요청 전에 임베딩 모델을 한 번 실행하고 컬렉션/HNSW 인덱스를 로드해 상태를 기록
+            try:
+                await asyncio.to_thread(self.search_service.warmup)
+                index_info = await asyncio.to_thread(self.search_service.describe_index)
+            except Exception as e:
+                logger.warning("ANN 인덱스 확인 실패: %s", e)
+                return
+            if index_info["num_vectors"] == 0:
+                logger.warning("Vector DB 컬렉션이 비어 있습니다 (KTO 데이터 적재 필요)")
+            else:
+                logger.info("ANN 인덱스 준비 완료: %s", index_info)
+
+    async def aclose(self) -> None:
+        """앱 종료 시 임베딩 배처 정리"""
+        if self.vector_enabled and self.search_service:
+            await self.search_service.embedding_batcher.stop()
+
     def get_service_status(self) -> Dict:
         """서비스 상태 정보"""
         status = {
-            "openai_enabled": bool(settings.OPENAI_API_KEY),
+            "openai_enabled": OPENAI_ENABLED,
             "vector_search_enabled": self.vector_enabled,
-            "kto_data_available": settings.is_kto_enabled,
+            "kto_data_available": KTO_ENABLED,
             "embedding_type": settings.EMBEDDING_TYPE if self.vector_enabled else None,
             "total_tourism_data": 0
         }
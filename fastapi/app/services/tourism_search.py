@@ -1,13 +1,90 @@
-from typing import List, Dict, Optional
+import asyncio
+from typing import List, Dict, Optional, Tuple
 from app.core.config import settings
 from app.core.vector_db import vector_db
 
 
+class EmbeddingBatcher:
+    """
+    동시에 들어온 쿼리 임베딩 요청을 짧은 시간(max_wait_sec) 모아서 한 번의 encode로 처리
+    - start()는 실행 중인 event loop 안에서 호출 (앱 lifespan)
+    - 시작 전이면 배치 없이 워커 스레드에서 바로 계산
+    """
+
+    def __init__(self, max_batch_size: int = 32, max_wait_sec: float = 0.01):
+        self.max_batch_size = max_batch_size
+        self.max_wait_sec = max_wait_sec
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        # 처리되지 못한 요청은 취소
+        while not self._queue.empty():
+            _, fut = self._queue.get_nowait()
+            if not fut.done():
+                fut.cancel()
+        self._task = None
+        self._queue = None
+
+    async def process(self, text: str) -> list:
+        if self._task is None:
+            return await asyncio.to_thread(vector_db.generate_embedding, text)
+        fut = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, fut))
+        return await fut
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future]]:
+        # 첫 요청이 올 때까지 기다린 뒤, max_wait_sec 동안 또는 max_batch_size까지 추가로 모음
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait_sec
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                embeddings = await asyncio.to_thread(vector_db.generate_embeddings, texts)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            for (_, fut), embedding in zip(batch, embeddings):
+                if not fut.done():
+                    fut.set_result(embedding)
+
+
 class TourismSearchService:
     """관광지 검색 전용 서비스"""
 
     def __init__(self):
         self.collection = vector_db.get_collection()
+        self.embedding_batcher = EmbeddingBatcher(
+            max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE,
+            max_wait_sec=settings.EMBEDDING_BATCH_MAX_WAIT_MS / 1000
+        )
 
     def search(
         self,
@@ -18,7 +95,54 @@ class TourismSearchService:
         include_distances: bool = True
     ) -> Dict:
         """의미 기반 관광지 검색"""
+        query_embedding = None
+        if settings.EMBEDDING_TYPE == "korean":
+            try:
+                query_embedding = vector_db.generate_embedding(query)
+            except Exception as e:
+                return self._search_error(query, e)
+        return self._search_with_embedding(
+            query, query_embedding, n_results, area_code, content_type, include_distances)
 
+    async def asearch(
+        self,
+        query: str,
+        n_results: int = 10,
+        area_code: Optional[str] = None,
+        content_type: Optional[str] = None,
+        include_distances: bool = True
+    ) -> Dict:
+        """search()의 async 버전 - 임베딩은 배치로 묶어 계산, Chroma 조회는 워커 스레드에서 실행"""
+        query_embedding = None
+        if settings.EMBEDDING_TYPE == "korean":
+            try:
+                query_embedding = await self.embedding_batcher.process(query)
+            except Exception as e:
+                return self._search_error(query, e)
+        return await asyncio.to_thread(
+            self._search_with_embedding,
+            query, query_embedding, n_results, area_code, content_type, include_distances
+        )
+
+    @staticmethod
+    def _search_error(query: str, e: Exception) -> Dict:
+        print(f"검색 실패: {e}")
+        return {
+            "query": query,
+            "total_results": 0,
+            "results": [],
+            "error": str(e)
+        }
+
+    def _search_with_embedding(
+        self,
+        query: str,
+        query_embedding: Optional[list],
+        n_results: int,
+        area_code: Optional[str],
+        content_type: Optional[str],
+        include_distances: bool
+    ) -> Dict:
         # 필터 조건 구성
         where_filter = {}
         if area_code:
@@ -28,8 +152,7 @@ class TourismSearchService:
 
         try:
             # 검색 실행
-            if settings.EMBEDDING_TYPE == "korean":
-                query_embedding = vector_db.generate_embedding(query)
+            if query_embedding is not None:
                 results = self.collection.query(
                     query_embeddings=[query_embedding],
                     n_results=n_results,
@@ -69,18 +192,15 @@ class TourismSearchService:
             }
 
         except Exception as e:
-            print(f"검색 실패: {e}")
-            return {
-                "query": query,
-                "total_results": 0,
-                "results": [],
-                "error": str(e)
-            }
+            return self._search_error(query, e)
 
     def get_recommendations_for_chat(self, user_query: str, n_results: int = 3) -> str:
         """AI 채팅용 컨텍스트 생성"""
-        search_results = self.search(user_query, n_results)
+        return self.format_chat_context(self.search(user_query, n_results))
 
+    @staticmethod
+    def format_chat_context(search_results: Dict) -> str:
+        """검색 결과를 AI 채팅용 컨텍스트 문자열로 변환"""
         if not search_results["results"]:
             return "관련 관광지 정보를 찾을 수 없습니다."
 
@@ -102,10 +222,20 @@ class TourismSearchService:
 
         return "\n".join(context_parts)
 
+    def warmup(self) -> None:
+        """임베딩 모델 워밍업 (앱 시작 시 호출)"""
+        vector_db.warmup()
+
+    def describe_index(self) -> Dict:
+        """컬렉션 ANN 인덱스 정보 (index_type, num_vectors, index_params)"""
+        return vector_db.describe_index(self.collection)
+
     def get_stats(self) -> Dict:
-        """검색 서비스 통계"""
+        """검색 서비스 통계 (ANN 인덱스 정보 포함)"""
+        index_info = self.describe_index()
         return {
-            "total_items": self.collection.count(),
+            "total_items": index_info["num_vectors"],
+            **index_info,
             "embedding_type": settings.EMBEDDING_TYPE,
             "collection_name": settings.VECTOR_DB_COLLECTION
         }
@@ -2,21 +2,31 @@ import numpy as np
 import pandas as pd
 
 
-def time_features(ts: pd.DatetimeIndex) -> np.ndarray:
-    # [is_twt, is_peak, hour_sin, hour_cos]
-    dow = ts.weekday
-    is_twt = np.isin(dow, [1, 2, 3]).astype(np.float32)
-
-    minutes = ts.hour.to_numpy() * 60 + ts.minute.to_numpy()
+def _build_minute_lut() -> np.ndarray:
+    # 하루 중 분(0~1439) -> [is_peak, hour_sin, hour_cos]
+    minutes = np.arange(24 * 60)
     peak = ((minutes >= 7*60) & (minutes <= 9*60+30)
             ) | ((minutes >= 17*60) & (minutes <= 19*60+30))
-    is_peak = peak.astype(np.float32)
 
     frac_day = minutes / (24.0 * 60.0)
-    hour_sin = np.sin(2 * np.pi * frac_day).astype(np.float32)
-    hour_cos = np.cos(2 * np.pi * frac_day).astype(np.float32)
+    return np.stack([
+        peak.astype(np.float32),
+        np.sin(2 * np.pi * frac_day).astype(np.float32),
+        np.cos(2 * np.pi * frac_day).astype(np.float32),
+    ], axis=1)
+
 
-    return np.stack([is_twt, is_peak, hour_sin, hour_cos], axis=1)
+_MINUTE_LUT = _build_minute_lut()                              # (1440, 3)
+_TWT_LUT = np.array([0, 1, 1, 1, 0, 0, 0], dtype=np.float32)   # Tue/Wed/Thu
+
+
+def time_features(ts: pd.DatetimeIndex) -> np.ndarray:
+    # [is_twt, is_peak, hour_sin, hour_cos]
+    minutes = ts.hour.to_numpy() * 60 + ts.minute.to_numpy()
+    out = np.empty((len(ts), 4), dtype=np.float32)
+    out[:, 0] = _TWT_LUT[np.asarray(ts.weekday)]
+    out[:, 1:] = _MINUTE_LUT[minutes]
+    return out
 
 
 def build_model_input(delay_norm_window: np.ndarray, ts_window: pd.DatetimeIndex) -> np.ndarray:
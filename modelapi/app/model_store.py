@@ -69,6 +69,8 @@ class ModelStore:
                        map_location=self.device)
         )
         self.model.eval()
+        # cuDNN fused LSTM 커널용으로 가중치를 연속 메모리로 정리
+        self.model.lstm.flatten_parameters()
 
     def segment_id(self, segment: str) -> int | None:
         return self.artifacts.segment_to_id.get(segment)
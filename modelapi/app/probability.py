@@ -1,14 +1,10 @@
-import math
-import numpy as np
+import torch
 
 
-def normal_cdf(z: np.ndarray) -> np.ndarray:
-    return 0.5 * (1.0 + np.vectorize(math.erf)(z / math.sqrt(2.0)))
-
-
-def mixture_cdf(x_norm: float, pi: np.ndarray, mu: np.ndarray, sigma: np.ndarray) -> float:
-    z = (x_norm - mu) / np.clip(sigma, 1e-6, None)
-    return float(np.sum(pi * normal_cdf(z)))
+def mixture_cdf_torch(x_norm: float, pi: torch.Tensor, mu: torch.Tensor, sigma: torch.Tensor) -> torch.Tensor:
+    # device 위에서 계산 (pi/mu/sigma를 각각 host로 옮기지 않도록)
+    z = (x_norm - mu) / sigma.clamp(min=1e-6)
+    return (pi * torch.special.ndtr(z)).sum(dim=-1)
 
 
 def clamp01(x: float) -> float:
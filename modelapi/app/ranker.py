@@ -6,7 +6,7 @@ import torch
 from .settings import settings
 from .features import floor_to_bucket, build_model_input
 from .buckets import fetch_lookback_bucket_delays
-from .probability import mixture_cdf, clamp01
+from .probability import mixture_cdf_torch, clamp01
 
 RISKY = {"NAT013271", "NAT040257"}  # 동대구, 전주
 
@@ -59,16 +59,13 @@ def prob_leg_on_time(
     xb = torch.from_numpy(X).to(store.device)
     seg_id = torch.tensor([sid], dtype=torch.long, device=store.device)
 
-    with torch.no_grad():
-        pi, mu, sigma = store.model(xb, seg_id)
-
-    pi = pi.cpu().numpy()[0]
-    mu = mu.cpu().numpy()[0]
-    sigma = sigma.cpu().numpy()[0]
-
     slack_min = max(0.0, (deadline - planned_arrival).total_seconds() / 60.0)
     x_norm = (slack_min - mean) / max(std, 1e-8)
-    p = clamp01(mixture_cdf(float(x_norm), pi, mu, sigma))
+
+    with torch.no_grad():
+        pi, mu, sigma = store.model(xb, seg_id)
+        # CDF까지 device에서 계산하고 스칼라 하나만 동기화
+        p = clamp01(mixture_cdf_torch(float(x_norm), pi[0], mu[0], sigma[0]).item())
 
     explain = {
         "segment": segment,